@@ -0,0 +1,107 @@
+"""
+Benchmark node list row rendering for a large mesh.
+
+Compares the old per-redraw row building in draw_node_list (DB name lookup, flag checks and
+padding for every node) against the cached rows from contact.ui.node_rows.
+
+    python -m benchmarks.bench_node_rows --nodes 5000 --redraws 20
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+import contact.ui.default_config as config
+from contact.ui.node_rows import NodeRowCache
+from contact.utilities.db_handler import ensure_node_table_exists, get_name_from_database
+from contact.utilities.singleton import interface_state
+
+
+def make_nodes(count: int) -> dict:
+    nodes = {}
+    for num in range(1, count + 1):
+        nodes[num] = {
+            "num": num,
+            "user": {
+                "longName": f"Mesh Node {num:05d}",
+                "shortName": f"{num % 10000:04d}",
+                "hwModel": "HELTEC_V3",
+                "publicKey": "key" if num % 3 else "",
+            },
+            "isFavorite": num % 50 == 0,
+            "isIgnored": num % 97 == 0,
+            "lastHeard": int(time.time()) - num,
+        }
+    return nodes
+
+
+def populate_db(nodes: dict) -> None:
+    ensure_node_table_exists()
+    with sqlite3.connect(config.db_file_path) as db_connection:
+        db_connection.executemany(
+            f'INSERT OR REPLACE INTO "{interface_state.myNodeNum}_nodedb" (user_id, long_name, short_name) VALUES (?, ?, ?)',
+            [(num, node["user"]["longName"], node["user"]["shortName"]) for num, node in nodes.items()],
+        )
+
+
+def uncached_rows(nodes: dict, width: int) -> None:
+    # Mirrors the row building draw_node_list did before the row cache
+    for node_num, node in nodes.items():
+        secure = "user" in node and "publicKey" in node["user"] and node["user"]["publicKey"]
+        node_str = f"{'🔐' if secure else '🔓'} {get_name_from_database(node_num, 'long')}".ljust(width - 2)[
+            : width - 2
+        ]
+        color = "node_list"
+        if "isFavorite" in node and node["isFavorite"]:
+            color = "node_favorite"
+        if "isIgnored" in node and node["isIgnored"]:
+            color = "node_ignored"
+
+
+def cached_rows(cache: NodeRowCache, nodes: dict, width: int) -> None:
+    for node_num, node in nodes.items():
+        cache.get_row(node_num, node, width)
+
+
+def timed(label: str, redraws: int, func, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(redraws):
+        func(*args)
+    elapsed = (time.perf_counter() - start) / redraws
+    print(f"{label:<28} {elapsed * 1000:9.2f} ms/redraw")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=5000)
+    parser.add_argument("--redraws", type=int, default=20)
+    parser.add_argument("--width", type=int, default=40)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config.db_file_path = os.path.join(tmp_dir, "client.db")
+        interface_state.myNodeNum = 1
+
+        nodes = make_nodes(args.nodes)
+        populate_db(nodes)
+        print(f"{args.nodes} nodes, pane width {args.width}")
+
+        baseline = timed("uncached", args.redraws, uncached_rows, nodes, args.width)
+
+        cache = NodeRowCache(get_name_from_database)
+        cold = timed("cached (cold)", 1, cached_rows, cache, nodes, args.width)
+        warm = timed("cached (warm)", args.redraws, cached_rows, cache, nodes, args.width)
+
+        # A favorite toggle and a nodeinfo update should only rebuild their own rows
+        nodes[2]["isFavorite"] = True
+        cache.invalidate(3)
+        timed("cached (2 rows changed)", 1, cached_rows, cache, nodes, args.width)
+
+        print(f"speedup (warm vs uncached): {baseline / warm:.1f}x, cold fill {cold * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark of init_nodedb, the node database sync run on every connect.
+
+Fills a simulated interface with N nodes and times the first sync into an empty client.db, a
+second sync with nothing changed, and a sync after a share of the nodes changed names. For
+comparison the same node db is also written the old way, one update_node_info_in_db per node.
+
+    python -m benchmarks.bench_nodedb_sync --nodes 1500 --changed 0.05
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import contact.ui.default_config as config
+from contact.utilities.db_handler import init_nodedb, update_node_info_in_db
+from contact.utilities.sim_interface import SimInterface
+from contact.utilities.singleton import interface_state
+
+
+def per_node_sync() -> float:
+    started = time.perf_counter()
+    for node in list(interface_state.interface.nodes.values()):
+        update_node_info_in_db(
+            user_id=node["num"],
+            long_name=node["user"].get("longName", ""),
+            short_name=node["user"].get("shortName", ""),
+            hw_model=node["user"].get("hwModel", ""),
+            is_licensed=node["user"].get("isLicensed", "0"),
+            role=node["user"].get("role", "CLIENT"),
+            public_key=node["user"].get("publicKey", ""),
+        )
+    return time.perf_counter() - started
+
+
+def report(label: str, stats: dict) -> None:
+    print(
+        f"{label:<22} {stats['seconds'] * 1000:9.1f} ms  "
+        f"{stats['inserted']:>5} inserted  {stats['updated']:>5} updated  {stats['unchanged']:>5} unchanged"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=1500, help="Nodes in the simulated node db (default: 1500).")
+    parser.add_argument("--changed", type=float, default=0.05, help="Share of nodes renamed before the last sync.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        interface = SimInterface(rate=0, node_count=args.nodes, seed=1)
+        try:
+            interface_state.interface = interface
+            interface_state.myNodeNum = interface.myInfo.my_node_num
+
+            config.db_file_path = os.path.join(workdir, "per_node.db")
+            print(f"{'per-node upserts':<22} {per_node_sync() * 1000:9.1f} ms")
+
+            config.db_file_path = os.path.join(workdir, "bulk.db")
+            report("bulk, empty db", init_nodedb())
+            report("bulk, unchanged", init_nodedb())
+
+            nodes = list(interface.nodes.values())
+            for node in random.Random(1).sample(nodes, int(len(nodes) * args.changed)):
+                node["user"]["longName"] += " (renamed)"
+            report("bulk, some renamed", init_nodedb())
+        finally:
+            interface.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+End-to-end benchmark of the receive pipeline.
+
+Drives rx_handler.on_receive with synthetic TEXT_MESSAGE_APP, NODEINFO_APP, TELEMETRY_APP and
+POSITION_APP packets against a temporary client.db, with stand-ins for the curses windows so the
+draw code runs without a terminal. Packets are generated by the simulator interface and decoded
+by meshtastic exactly as live packets are, before timing starts.
+
+Reports packets/sec, p50/p99 latency per packet (overall and per port), the share of time spent
+in db_handler and allocations. Results can be saved as a baseline and later runs compared to it:
+
+    python -m benchmarks.bench_rx_pipeline --packets 2000 --save-baseline rx_baseline.json
+    python -m benchmarks.bench_rx_pipeline --packets 2000 --baseline rx_baseline.json --threshold 0.1
+
+The comparison exits with status 1 if throughput drops or p99 latency grows by more than the
+threshold.
+"""
+
+import argparse
+import curses
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Any, Callable, Dict, List
+
+from meshtastic import publishingThread
+from pubsub import pub
+
+import contact.ui.default_config as config
+import contact.ui.contact_ui as contact_ui
+import contact.utilities.db_handler as db_handler
+from contact.message_handlers.rx_handler import on_receive
+from contact.utilities.db_handler import init_nodedb, load_messages_from_db
+from contact.utilities.sim_interface import SimInterface
+from contact.utilities.singleton import ui_state, interface_state, app_state
+from contact.utilities.utils import get_channels, get_node_list
+
+DB_FUNCTIONS = [
+    "save_message_to_db",
+    "maybe_store_nodeinfo_in_db",
+    "update_node_info_in_db",
+    "get_name_from_database",
+    "is_chat_archived",
+]
+
+
+class FakeWindow:
+    """Stand-in for a curses window or pad: tracks its size and swallows drawing calls."""
+
+    def __init__(self, height: int = 1, width: int = 1, *args: Any) -> None:
+        self.height = height
+        self.width = width
+        self.writes = 0
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def getyx(self):
+        return 0, 0
+
+    def getbegyx(self):
+        return 0, 0
+
+    def resize(self, height: int, width: int) -> None:
+        self.height, self.width = height, width
+
+    def addstr(self, *args: Any) -> None:
+        self.writes += 1
+
+    def __getattr__(self, name: str) -> Callable[..., None]:
+        return lambda *args, **kwargs: None
+
+
+def install_fake_curses() -> None:
+    curses.newwin = FakeWindow
+    curses.newpad = FakeWindow
+    curses.curs_set = lambda visibility: None
+    curses.color_pair = lambda pair: 0
+    curses.doupdate = lambda: None
+
+
+class DBTimer:
+    """Wraps the db_handler entry points, counting only the outermost call when they nest."""
+
+    def __init__(self) -> None:
+        self.seconds = 0.0
+        self.calls = 0
+        self._depth = 0
+
+    def wrap(self, function: Callable) -> Callable:
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            self._depth += 1
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.seconds += time.perf_counter() - start
+                    self.calls += 1
+
+        return timed
+
+    def install(self) -> None:
+        for name in DB_FUNCTIONS:
+            original = getattr(db_handler, name)
+            wrapped = self.wrap(original)
+            for module in list(sys.modules.values()):
+                if getattr(module, name, None) is original:
+                    setattr(module, name, wrapped)
+            if contact_ui.node_rows._name_lookup is original:
+                contact_ui.node_rows._name_lookup = wrapped
+
+
+def make_packets(sim: SimInterface, count: int) -> List[Dict[str, Any]]:
+    """Decode `count` generated packets through meshtastic and collect the dicts it publishes."""
+    packets = []
+
+    def collect(packet: Dict[str, Any], interface: Any) -> None:
+        if interface is sim:
+            packets.append(packet)
+
+    pub.subscribe(collect, "meshtastic.receive")
+    for _ in range(count):
+        sim.inject(sim.generate_packet())
+    drained = threading.Event()
+    publishingThread.queueWork(drained.set)
+    drained.wait()
+    pub.unsubscribe(collect, "meshtastic.receive")
+    return packets
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def run(packets: List[Dict[str, Any]], interface: Any, db_timer: DBTimer) -> Dict[str, Any]:
+    latencies = []
+    by_port: Dict[str, List[float]] = defaultdict(list)
+
+    db_timer.seconds = 0.0
+    db_timer.calls = 0
+    started = time.perf_counter()
+    for packet in packets:
+        start = time.perf_counter()
+        on_receive(packet, interface)
+        elapsed = time.perf_counter() - start
+        latencies.append(elapsed)
+        by_port[packet.get("decoded", {}).get("portnum", "ENCRYPTED")].append(elapsed)
+    total = time.perf_counter() - started
+
+    latencies.sort()
+    ports = {}
+    for port, values in sorted(by_port.items()):
+        values.sort()
+        ports[port] = {
+            "count": len(values),
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+        }
+
+    return {
+        "packets": len(packets),
+        "packets_per_sec": len(packets) / total if total else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "db_share": db_timer.seconds / total if total else 0.0,
+        "db_calls": db_timer.calls,
+        "ports": ports,
+    }
+
+
+def measure_allocations(packets: List[Dict[str, Any]], interface: Any) -> Dict[str, float]:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for packet in packets:
+        on_receive(packet, interface)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, "filename")
+    retained = sum(stat.size_diff for stat in stats)
+    blocks = sum(stat.count_diff for stat in stats)
+    return {
+        "peak_kib": peak / 1024,
+        "retained_bytes_per_packet": retained / len(packets) if packets else 0.0,
+        "retained_blocks_per_packet": blocks / len(packets) if packets else 0.0,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    regressions = []
+    if results["packets_per_sec"] < baseline["packets_per_sec"] * (1 - threshold):
+        regressions.append(
+            f"throughput {results['packets_per_sec']:.0f}/s vs baseline {baseline['packets_per_sec']:.0f}/s"
+        )
+    if results["p99_ms"] > baseline["p99_ms"] * (1 + threshold):
+        regressions.append(f"p99 {results['p99_ms']:.3f} ms vs baseline {baseline['p99_ms']:.3f} ms")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--packets", type=int, default=2000)
+    parser.add_argument("--nodes", type=int, default=200)
+    parser.add_argument("--mix", default="text=4,position=3,telemetry=3,nodeinfo=1")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--packet-log", action="store_true", help="Keep the packet log pane open while receiving")
+    parser.add_argument("--save-baseline", metavar="FILE")
+    parser.add_argument("--baseline", metavar="FILE")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed regression as a fraction")
+    args = parser.parse_args()
+
+    install_fake_curses()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config.db_file_path = os.path.join(tmp_dir, "client.db")
+        config.notification_sound = "False"
+        app_state.lock = threading.Lock()
+
+        sim = SimInterface(rate=0, node_count=args.nodes, port_mix=args.mix, seed=args.seed)
+        interface_state.interface = sim
+        interface_state.myNodeNum = sim.my_node_num
+        ui_state.channel_list = get_channels()
+        ui_state.node_list = get_node_list()
+        ui_state.display_log = args.packet_log
+        init_nodedb()
+        load_messages_from_db()
+        contact_ui.handle_resize(FakeWindow(50, 200), True)
+
+        try:
+            packets = make_packets(sim, args.packets)
+            db_timer = DBTimer()
+            db_timer.install()
+
+            results = run(packets, sim, db_timer)
+            results.update(measure_allocations(packets[: min(len(packets), 500)], sim))
+        finally:
+            sim.close()
+
+    print(f"{results['packets']} packets, {args.nodes} nodes, mix {args.mix}")
+    print(f"throughput      {results['packets_per_sec']:10.0f} packets/s")
+    print(f"latency p50     {results['p50_ms']:10.3f} ms")
+    print(f"latency p99     {results['p99_ms']:10.3f} ms")
+    print(f"db time share   {results['db_share'] * 100:10.1f} %  ({results['db_calls']} calls)")
+    print(f"peak traced     {results['peak_kib']:10.1f} KiB")
+    print(f"retained/packet {results['retained_bytes_per_packet']:10.1f} bytes")
+    for port, stats in results["ports"].items():
+        print(f"  {port:<20} {stats['count']:6d}  p50 {stats['p50_ms']:8.3f} ms  p99 {stats['p99_ms']:8.3f} ms")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"REGRESSION beyond {args.threshold:.0%}: " + "; ".join(regressions))
+            sys.exit(1)
+        print(f"Within {args.threshold:.0%} of baseline")
+
+
+if __name__ == "__main__":
+    main()
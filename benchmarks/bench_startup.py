@@ -0,0 +1,140 @@
+"""
+Cold-start benchmark.
+
+Starts the client in fresh interpreters and measures, from process launch:
+
+  - time to splash: until contact.__main__ and everything it imports are loaded, which is all
+    that runs before draw_splash
+  - time to first frame: until the main UI has drawn once against a simulated radio, with the
+    curses windows stubbed out as in bench_rx_pipeline
+
+One extra run under `python -X importtime` lists the slowest imports, and the benchmark fails if
+any of the lazily loaded stacks (the map renderer, yaml) were imported during startup. Either
+time exceeding its budget also fails the run:
+
+    python -m benchmarks.bench_startup --runs 5 --splash-budget 500 --frame-budget 1000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Stacks that only some sessions use, and which must stay off the startup path
+LAZY_MODULES = ["contact.utilities.show_map", "staticmaps", "s2sphere", "libsixel", "PIL", "yaml"]
+
+CHILD = """
+import json, os, sys, tempfile, time
+import contact.__main__ as app
+splash = time.time()
+
+from benchmarks.bench_rx_pipeline import FakeWindow, install_fake_curses
+import contact.ui.default_config as config
+import contact.ui.contact_ui as contact_ui
+from contact.utilities.sim_interface import SimInterface
+from contact.utilities.singleton import interface_state
+
+install_fake_curses()
+with tempfile.TemporaryDirectory() as tmp_dir:
+    config.db_file_path = os.path.join(tmp_dir, "client.db")
+    sim = SimInterface(rate=0, node_count={nodes}, seed=1)
+    try:
+        interface_state.interface = sim
+        app.initialize_globals()
+        contact_ui.handle_resize(FakeWindow(50, 200), True)
+        first_frame = time.time()
+    finally:
+        sim.close()
+
+lazy = [name for name in {lazy_modules!r} if name in sys.modules]
+print(json.dumps({{"splash": splash, "first_frame": first_frame, "lazy": lazy}}))
+"""
+
+
+def child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, env.get("PYTHONPATH")]))
+    return env
+
+
+def measure_once(nodes: int) -> Tuple[float, float, List[str]]:
+    """Launch one client process; returns (ms to splash, ms to first frame, lazy modules loaded)."""
+    code = CHILD.format(nodes=nodes, lazy_modules=LAZY_MODULES)
+    launched = time.time()
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_ROOT, env=child_env(), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Startup run failed:\n{result.stderr}")
+
+    marks = json.loads(result.stdout.strip().splitlines()[-1])
+    return (marks["splash"] - launched) * 1000, (marks["first_frame"] - launched) * 1000, marks["lazy"]
+
+
+def import_profile() -> List[Tuple[str, int, int]]:
+    """(module, self us, cumulative us) for every import done by `import contact.__main__`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import contact.__main__"],
+        cwd=REPO_ROOT,
+        env=child_env(),
+        capture_output=True,
+        text=True,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--nodes", type=int, default=200, help="Nodes in the simulated radio's node db")
+    parser.add_argument("--top", type=int, default=15, help="How many of the slowest imports to list")
+    parser.add_argument("--splash-budget", type=float, default=500, help="Allowed median ms to splash")
+    parser.add_argument("--frame-budget", type=float, default=1000, help="Allowed median ms to first frame")
+    args = parser.parse_args()
+
+    modules = import_profile()
+    print(f"Slowest imports (self time) of {len(modules)} loaded by contact.__main__:")
+    for name, self_us, cumulative_us in sorted(modules, key=lambda item: item[1], reverse=True)[: args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {cumulative_us / 1000:8.1f} ms cumulative  {name}")
+
+    splash_times = []
+    frame_times = []
+    lazy_loaded = set()
+    for _ in range(args.runs):
+        splash_ms, frame_ms, lazy = measure_once(args.nodes)
+        splash_times.append(splash_ms)
+        frame_times.append(frame_ms)
+        lazy_loaded.update(lazy)
+
+    splash = statistics.median(splash_times)
+    frame = statistics.median(frame_times)
+    print(f"time to splash       {splash:8.1f} ms median  (min {min(splash_times):.1f}, budget {args.splash_budget:.0f})")
+    print(f"time to first frame  {frame:8.1f} ms median  (min {min(frame_times):.1f}, budget {args.frame_budget:.0f})")
+
+    failures = []
+    if lazy_loaded:
+        failures.append("imported at startup: " + ", ".join(sorted(lazy_loaded)))
+    if splash > args.splash_budget:
+        failures.append(f"time to splash {splash:.1f} ms over budget")
+    if frame > args.frame_budget:
+        failures.append(f"time to first frame {frame:.1f} ms over budget")
+    if failures:
+        print("FAILED: " + "; ".join(failures))
+        sys.exit(1)
+    print("Within startup budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark message wrapping on realistic mesh chat.
+
+Compares the previous wrap_text/text_width (per-character east_asian_width, string
+concatenation) against the current grapheme-aware implementation in contact.ui.nav_utils,
+and checks that plain ASCII messages still wrap to exactly the same lines.
+
+    python -m benchmarks.bench_wrap_text --messages 5000 --width 60
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import Callable, List
+from unicodedata import east_asian_width
+
+import contact.ui.default_config  # noqa: F401  (nav_utils needs config loaded first)
+from contact.ui.nav_utils import text_width, wrap_text
+
+
+def legacy_text_width(text: str) -> int:
+    return sum(2 if east_asian_width(c) in "FW" else 1 for c in text)
+
+
+def legacy_wrap_text(text: str, wrap_width: int) -> List[str]:
+    # wrap_text as it was before grapheme support
+    whitespace = "\t\n\x0b\x0c\r "
+    whitespace_trans = dict.fromkeys(map(ord, whitespace), ord(" "))
+    text = text.translate(whitespace_trans)
+
+    words = re.findall(r"\S+|\s+", text)
+    wrapped_lines = []
+    line_buffer = ""
+    line_length = 0
+    wrap_width -= 2
+
+    for word in words:
+        word_length = legacy_text_width(word)
+
+        if word_length > wrap_width:
+            if line_buffer:
+                wrapped_lines.append(line_buffer.strip())
+                line_buffer = ""
+                line_length = 0
+            for i in range(0, word_length, wrap_width):
+                wrapped_lines.append(word[i : i + wrap_width])
+            continue
+
+        if line_length + word_length > wrap_width and word.strip():
+            wrapped_lines.append(line_buffer.strip())
+            line_buffer = ""
+            line_length = 0
+
+        line_buffer += word
+        line_length += word_length
+
+    if line_buffer:
+        wrapped_lines.append(line_buffer.strip())
+
+    return wrapped_lines
+
+
+WORDS = "the mesh is up node relay check in copy that heading to the ridge battery low signal good anyone on".split()
+
+
+def ascii_chat(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 40)))
+
+
+def telemetry(rng: random.Random) -> str:
+    return (
+        f"🔋 {rng.randint(1, 100)}% ⚡ {rng.uniform(3.3, 4.2):.2f}V 🌡️ {rng.uniform(-10, 40):.1f}°C "
+        f"📶 SNR {rng.uniform(-20, 10):.1f}dB 👍🏽 all good"
+    )
+
+
+def cjk(rng: random.Random) -> str:
+    return "".join(rng.choice("你好世界今天天气很好我们在山上网络正常") for _ in range(rng.randint(5, 60)))
+
+
+def zwj_emoji(rng: random.Random) -> str:
+    emoji = ["👨‍👩‍👧‍👦", "🏳️‍🌈", "🇺🇸", "🇩🇪", "🧑‍💻", "❤️"]
+    return " ".join(rng.choice(emoji) * rng.randint(1, 6) for _ in range(rng.randint(2, 10)))
+
+
+def long_urls(rng: random.Random) -> str:
+    path = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789/") for _ in range(rng.randint(40, 200)))
+    return f"map link https://example.org/{path} see you there"
+
+
+CORPORA = {
+    "ascii chat": ascii_chat,
+    "telemetry + emoji": telemetry,
+    "cjk": cjk,
+    "zwj emoji": zwj_emoji,
+    "long urls": long_urls,
+}
+
+
+def timed(func: Callable[[str, int], List[str]], messages: List[str], width: int, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for message in messages:
+            func(message, width)
+    return (time.perf_counter() - start) / (rounds * len(messages))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--width", type=int, default=60)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{args.messages} messages per corpus, pane width {args.width}")
+    print(f"{'corpus':<20} {'legacy us':>10} {'current us':>11} {'speedup':>8}")
+
+    for name, generate in CORPORA.items():
+        rng = random.Random(args.seed)
+        messages = [generate(rng) for _ in range(args.messages)]
+
+        if name in ("ascii chat", "long urls"):
+            for message in messages:
+                assert wrap_text(message, args.width) == legacy_wrap_text(message, args.width), message
+                assert text_width(message) == legacy_text_width(message), message
+
+        legacy = timed(legacy_wrap_text, messages, args.width, args.rounds)
+        current = timed(wrap_text, messages, args.width, args.rounds)
+        print(f"{name:<20} {legacy * 1e6:10.2f} {current * 1e6:11.2f} {legacy / current:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,10 +15,10 @@ import curses
 import io
 import logging
 import os
-import subprocess
 import sys
 import threading
 import traceback
+from typing import Any, Callable, List, Optional
 
 # Third-party
 from pubsub import pub
@@ -26,16 +26,27 @@ from pubsub import pub
 # Local application
 import contact.ui.default_config as config
 from contact.message_handlers.rx_handler import on_receive
-from contact.settings import set_region
+from contact.message_handlers.tx_handler import ack_tracker, restore_queue
+from contact.settings import open_settings, set_region
 from contact.ui.colors import setup_colors
-from contact.ui.contact_ui import main_ui
+from contact.ui.contact_ui import main_ui, node_rows, redraw_all, show_link_status
+from contact.ui.render import renderer
 from contact.ui.splash import draw_splash
 from contact.utilities.arg_parser import setup_parser
+from contact.utilities.capture import capture, replay_capture
+from contact.utilities.daemon import run_daemon
+from contact.utilities.daemon_interface import DaemonInterface
 from contact.utilities.db_handler import init_nodedb, load_messages_from_db
 from contact.utilities.input_handlers import get_list_input
 from contact.utilities.interfaces import initialize_interface
-from contact.utilities.utils import get_channels, get_nodeNum, get_node_list
+from contact.utilities.perf import perf_stats
+from contact.utilities.profiler import install_signal_toggle, profiler
+from contact.utilities.session_cache import connection_key, load_session, save_session
+from contact.utilities.sessions import radio_sessions
+from contact.utilities.supervisor import ConnectionSupervisor
+from contact.utilities.utils import get_channels, get_nodeNum, get_node_list, refresh_node_list
 from contact.utilities.singleton import ui_state, interface_state, app_state
+from contact.ui.ui_state import RadioSession
 
 # ------------------------------------------------------------------------------
 # Environment & Logging Setup
@@ -53,6 +64,8 @@ logging.basicConfig(
 
 app_state.lock = threading.Lock()
 
+replay_results = {}
+
 # ------------------------------------------------------------------------------
 # Main Program Logic
 # ------------------------------------------------------------------------------
@@ -74,33 +87,139 @@ def initialize_globals() -> None:
     ui_state.single_pane_mode = config.single_pane_mode.lower() == "true"
     pub.subscribe(on_receive, "meshtastic.receive")
 
+    if not app_state.link_status:  # A cached session's nodes are already in the db
+        init_nodedb()
+    load_messages_from_db()
+    restore_queue()
+
+
+def attach_live_interface(interface: object) -> None:
+    """Replace the cached session with the live connection and merge in what changed since."""
+    cached_node_num = interface_state.myNodeNum
+    interface_state.interface = interface
+    app_state.daemon_attached = isinstance(interface, DaemonInterface)
+    interface_state.myNodeNum = get_nodeNum()
 
+    if interface_state.myNodeNum != cached_node_num:
+        # A different radio on the same port, whose messages are stored under its own node number
+        ui_state.channel_list = []
+        ui_state.all_messages = {}
+        ui_state.selected_channel = 0
+        ui_state.selected_message = 0
+        get_channels()
+        load_messages_from_db()
+        restore_queue()
+    else:
+        get_channels()
+    refresh_node_list()
+    ui_state.selected_node = min(ui_state.selected_node, max(0, len(ui_state.node_list) - 1))
     init_nodedb()
-    load_messages_from_db()
+    node_rows.invalidate()  # Rows were rendered with the names cached from the last session
+
+    if interface.localNode.localConfig.lora.region == 0:
+        logging.warning("Region is unset, set it under Settings > Radio Settings > Lora")
+    app_state.link_status = ""
+
+
+def supervise_connection(
+    session: RadioSession, connect: Callable[[], Any], session_key: Optional[str]
+) -> ConnectionSupervisor:
+    """Reconnect whenever the session's link drops, swapping the new interface in without restarting the UI."""
+
+    def on_connected(interface: object) -> None:
+        with app_state.lock, radio_sessions.shown(session):
+            try:
+                attach_live_interface(interface)
+            except Exception as e:
+                logging.error(f"Error switching {session.label} to the new connection: {e}")
+            if radio_sessions.on_screen():
+                redraw_all()
+        save_session(interface, session_key)
+
+    def on_status(status: str) -> None:
+        with app_state.lock, radio_sessions.shown(session):
+            app_state.link_status = status
+            if radio_sessions.on_screen():
+                show_link_status()
+
+    return ConnectionSupervisor(connect, on_connected, on_status)
+
+
+def connect_extra_radios(targets: List[str]) -> List[ConnectionSupervisor]:
+    """Open a session for each --radio target, connecting in the background. Returns their supervisors."""
+    from contact.utilities.provision import open_target  # Only with --radio, kept off the startup path
+
+    supervisors = []
+    for target in targets:
+        session = radio_sessions.add(target)
+        session.link_status = f"Connecting to {target}..."
+        supervisor = supervise_connection(session, lambda target=target: open_target(target), None)
+        supervisor.reconnect()
+        supervisors.append(supervisor)
+    return supervisors
+
+
+def start_replay(args: object) -> None:
+    """Feed a capture file through on_receive in the background."""
+
+    def run() -> None:
+        try:
+            replay_results.update(replay_capture(interface_state.interface, args.replay, args.replay_speed))
+        except (OSError, ValueError) as e:
+            logging.error(f"Replay of {args.replay} failed: {e}")
+
+    threading.Thread(target=run, name="replay", daemon=True).start()
 
 
 def main(stdscr: curses.window) -> None:
     """Main entry point for the curses UI."""
 
     output_capture = io.StringIO()
+    supervisors = []
+    primary = None
     try:
         setup_colors()
         draw_splash(stdscr)
 
         args = setup_parser().parse_args()
-
-        if getattr(args, "settings", False):
-            subprocess.run([sys.executable, "-m", "contact.settings"], check=True)
-            return
+        session_key = connection_key(args)
+        cached_interface = load_session(session_key)
 
         logging.info("Initializing interface...")
         with app_state.lock:
-            interface_state.interface = initialize_interface(args)
+            if cached_interface:
+                # Draw from the last session straight away, the radio connects in the background
+                interface_state.interface = cached_interface
+                app_state.link_status = "Syncing with the radio..."
+            else:
+                interface_state.interface = initialize_interface(args)
+                app_state.daemon_attached = isinstance(interface_state.interface, DaemonInterface)
 
-            if interface_state.interface.localNode.localConfig.lora.region == 0:
-                prompt_region_if_unset(args)
+                if interface_state.interface.localNode.localConfig.lora.region == 0:
+                    prompt_region_if_unset(args)
 
+        if args.settings:
+            # Settings run on the connection just opened, not a relaunched contact.settings with its own
+            with contextlib.redirect_stdout(output_capture), contextlib.redirect_stderr(output_capture):
+                open_settings(stdscr, interface_state.interface)
+            return
+
+        with app_state.lock:
+            primary = radio_sessions.add(session_key or ("sim" if args.sim else "radio"))
             initialize_globals()
+
+            if args.capture:
+                capture.open(args.capture, interface_state.myNodeNum)
+            if args.replay:
+                start_replay(args)
+            if not args.replay:
+                supervisor = supervise_connection(primary, lambda: initialize_interface(args), session_key)
+                if cached_interface:
+                    supervisor.reconnect()  # The first connection, made while the UI shows the cached session
+                else:
+                    supervisor.watch(interface_state.interface)
+                supervisors.append(supervisor)
+                supervisors.extend(connect_extra_radios(args.radio))
             logging.info("Starting main UI")
 
         try:
@@ -112,6 +231,21 @@ def main(stdscr: curses.window) -> None:
             logging.error("Traceback:\n%s", traceback.format_exc())
             logging.error("Console output:\n%s", console_output)
             return
+        finally:
+            for supervisor in supervisors:
+                supervisor.stop()
+            if primary:
+                save_session(radio_sessions.interface_of(primary), session_key)
+            # Each interface's heartbeat timer would otherwise keep the process alive after the UI exits
+            for session in radio_sessions.sessions:
+                interface = radio_sessions.interface_of(session)
+                if interface is not None:
+                    interface.close()
+            capture.close()
+            profiler.stop()
+            perf_stats.log_summary()
+            logging.info(ack_tracker.summary())
+            logging.info(renderer.summary())
 
     except Exception:
         raise
@@ -120,12 +254,39 @@ def main(stdscr: curses.window) -> None:
 def start() -> None:
     """Entry point for the application."""
 
+    # The subcommands are imported when run, their modules are slow to load and the UI doesn't need them
+    if sys.argv[1:2] == ["provision"]:
+        from contact.utilities.provision import run_provision
+
+        sys.exit(run_provision(sys.argv[2:]))
+
+    if sys.argv[1:2] == ["config"]:
+        from contact.utilities.config_store import run_config_command
+
+        sys.exit(run_config_command(sys.argv[2:]))
+
+    if sys.argv[1:2] == ["topology"]:
+        from contact.utilities.topology import run_topology_command
+
+        sys.exit(run_topology_command(sys.argv[2:]))
+
     if "--help" in sys.argv or "-h" in sys.argv:
         setup_parser().print_help()
         sys.exit(0)
 
+    args = setup_parser().parse_args()
+    install_signal_toggle()
+    if args.daemon:
+        run_daemon(args)
+        return
+
     try:
         curses.wrapper(main)
+        if replay_results:
+            print(
+                f"Replayed {replay_results['packets']} packets in {replay_results['seconds']:.2f}s "
+                f"({replay_results['rate']:.1f} packets/s)"
+            )
     except KeyboardInterrupt:
         logging.info("User exited with Ctrl+C")
         sys.exit(0)
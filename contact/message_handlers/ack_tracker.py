@@ -0,0 +1,144 @@
+"""
+Sent messages waiting for their ACK. Each is tracked under a message id of its own and holds its
+line in all_messages by reference, so neither a resend (new packet id) nor messages added or reloaded
+around it lose track of it. A message with no ACK or NAK within ACK_TIMEOUT expires, timed by a hashed
+timer wheel, so the tracker stays bounded however many ACKs are lost.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+ACK_TIMEOUT = 90.0  # seconds, well past the firmware's own retransmissions and their NAK
+WHEEL_TICK = 1.0  # seconds per slot
+WHEEL_SLOTS = 64
+
+
+@dataclass
+class TrackedMessage:
+    packet_id: int  # of the latest send
+    session: Any  # the RadioSession that sent it
+    channel_id: Union[str, int]
+    text: str
+    timestamp: int  # of its row in the messages table
+    entry: Tuple[str, str]  # its line in all_messages[channel_id]
+    message_id: int = 0  # assigned when first tracked
+    resends: int = 0
+    payload: Optional[str] = None  # as for QueuedMessage
+    group: Any = None
+
+
+class TimerWheel:
+    """
+    Timers in WHEEL_SLOTS buckets of WHEEL_TICK seconds. Adding and cancelling are O(1), and each
+    tick only looks at the timers in one bucket. Timers further out than one turn wait out the
+    remaining turns in their bucket.
+    """
+
+    def __init__(self, tick: float = WHEEL_TICK, slots: int = WHEEL_SLOTS) -> None:
+        self.tick = tick
+        self.slots: List[Dict[int, int]] = [{} for _ in range(slots)]  # key -> turns left
+        self._where: Dict[int, int] = {}  # key -> slot
+        self._current = int(time.monotonic() / tick)
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def add(self, key: int, delay: float) -> None:
+        self.cancel(key)
+        if not self._where:
+            # Nothing moved the wheel while it was empty, e.g. since it was made at import
+            self._current = max(self._current, int(time.monotonic() / self.tick))
+        ticks = max(1, int(delay / self.tick + 0.5))
+        slot = (self._current + ticks) % len(self.slots)
+        self.slots[slot][key] = (ticks - 1) // len(self.slots)
+        self._where[key] = slot
+
+    def cancel(self, key: int) -> None:
+        slot = self._where.pop(key, None)
+        if slot is not None:
+            self.slots[slot].pop(key, None)
+
+    def advance(self, now: Optional[float] = None) -> List[int]:
+        """Move the wheel up to `now`, returning the keys whose timers ran out."""
+        target = int((time.monotonic() if now is None else now) / self.tick)
+        expired = []
+        # After a long stall a single turn visits every slot
+        for tick in range(max(self._current + 1, target - len(self.slots) + 1), target + 1):
+            bucket = self.slots[tick % len(self.slots)]
+            for key, turns in list(bucket.items()):
+                if turns:
+                    bucket[key] = turns - 1
+                else:
+                    del bucket[key]
+                    del self._where[key]
+                    expired.append(key)
+        self._current = max(self._current, target)
+        return expired
+
+
+class AckTracker:
+    """Sent messages by packet id until their ACK or NAK arrives, or they expire and go to `on_expired`."""
+
+    def __init__(self, on_expired: Callable[[TrackedMessage], None], timeout: float = ACK_TIMEOUT) -> None:
+        self.on_expired = on_expired
+        self.timeout = timeout
+        self.counters = {"acked": 0, "nakd": 0, "expired": 0, "resent": 0}
+        self._wheel = TimerWheel()
+        self._messages: Dict[int, TrackedMessage] = {}  # packet id -> message
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def track(self, message: TrackedMessage) -> None:
+        """Wait for the ACK of message.packet_id, the message's first send or a resend after it expired."""
+        with self._lock:
+            if message.message_id:
+                message.resends += 1
+                self.counters["resent"] += 1
+            else:
+                message.message_id = next(self._ids)
+            self._messages[message.packet_id] = message
+            self._wheel.add(message.packet_id, self.timeout)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ack-expiry", daemon=True)
+                self._thread.start()
+
+    def resolve(self, packet_id: int, ack_type: str) -> Optional[TrackedMessage]:
+        """The message an ACK or NAK is for, no longer tracked. None if it is not (or no longer) tracked."""
+        with self._lock:
+            message = self._messages.pop(packet_id, None)
+            if message is None:
+                return None
+            self._wheel.cancel(packet_id)
+            self.counters["nakd" if ack_type == "Nak" else "acked"] += 1
+            return message
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._messages)
+
+    def expire(self, now: Optional[float] = None) -> List[TrackedMessage]:
+        with self._lock:
+            expired = [self._messages.pop(key) for key in self._wheel.advance(now) if key in self._messages]
+            self.counters["expired"] += len(expired)
+        return expired
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self._wheel.tick)
+            for message in self.expire():
+                try:
+                    self.on_expired(message)
+                except Exception as e:
+                    logging.error(f"Error handling expired message {message.message_id}: {e}")
+
+    def summary(self) -> str:
+        counters = self.counters
+        return (
+            f"ACK {self.pending()} pending, {counters['acked']} ok, {counters['nakd']} nak, "
+            f"{counters['expired']} expired, {counters['resent']} resent"
+        )
@@ -0,0 +1,172 @@
+"""
+Texts longer than one packet go out as numbered parts, each starting with a marker:
+
+    [2/3#5f0a] ...the second part
+
+5f0a tags the message, so parts from different messages don't mix. Parts are cut at spaces where
+possible and joined back together exactly. The Reassembler holds the parts received until all have
+arrived, or until CHUNK_TIMEOUT passes with no new part, when what arrived is stored with the gaps marked.
+"""
+
+import hashlib
+import itertools
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from meshtastic.protobuf import mesh_pb2
+
+from contact.message_handlers.ack_tracker import TimerWheel
+
+PAYLOAD_LIMIT = mesh_pb2.Constants.DATA_PAYLOAD_LEN  # bytes of text in one packet
+CHUNK_TIMEOUT = 180.0  # seconds without a new part before a message is stored incomplete
+RECENT_MESSAGES = 256  # completed messages remembered, so a repeated part doesn't start them again
+CHUNK_MARKER = re.compile(r"\[(\d+)/(\d+)#([0-9a-f]{4})\] (.*)", re.DOTALL)
+
+
+@dataclass
+class ChunkGroup:
+    """The parts of one long sent message, which share its line in all_messages and its row in the db."""
+
+    channel_id: Union[str, int]
+    text: str
+    entry: Tuple[str, str]
+    total: int
+    sent: int = 0
+    acked: int = 0
+    failed: bool = False
+
+
+def chunk_tag(timestamp: int, text: str) -> str:
+    # The same for a message queued again after a restart, so receivers can drop parts they already have
+    return hashlib.sha1(f"{timestamp}:{text}".encode("utf-8")).hexdigest()[:4]
+
+
+def split_text(text: str, size: int) -> List[str]:
+    """Pieces of at most `size` UTF-8 bytes that join back into `text`, cut after a space where there is one."""
+    pieces = []
+    while text:
+        cut = len(text)
+        encoded = text.encode("utf-8")
+        if len(encoded) > size:
+            cut = len(encoded[:size].decode("utf-8", "ignore"))
+            space = text.rfind(" ", 0, cut)
+            if space >= cut // 2:
+                cut = space + 1
+        pieces.append(text[:cut])
+        text = text[cut:]
+    return pieces
+
+
+def split_message(text: str, tag: str, limit: int = PAYLOAD_LIMIT) -> List[str]:
+    """The payloads to send `text` as: the text itself if it fits in one packet, else its numbered parts."""
+    if len(text.encode("utf-8")) <= limit:
+        return [text]
+    total = 9
+    while True:
+        # Sized for a marker as long as the last one, which needs another pass if the count gains a digit
+        bodies = split_text(text, limit - len(f"[{total}/{total}#{tag}] ".encode("utf-8")))
+        if len(str(len(bodies))) <= len(str(total)):
+            break
+        total = len(bodies)
+    return [f"[{index}/{len(bodies)}#{tag}] {body}" for index, body in enumerate(bodies, 1)]
+
+
+def parse_chunk(text: str) -> Optional[Tuple[str, int, int, str]]:
+    """(tag, index, total, body) if `text` is one part of a long message."""
+    match = CHUNK_MARKER.fullmatch(text)
+    if not match:
+        return None
+    index, total = int(match.group(1)), int(match.group(2))
+    if not 1 <= index <= total:
+        return None
+    return match.group(3), index, total, match.group(4)
+
+
+@dataclass
+class PartialMessage:
+    key: Tuple  # (radio, from, to, channel, tag)
+    session: Any  # the RadioSession that received it
+    packet: Dict[str, Any]  # the first part received, reused to store the whole
+    total: int
+    parts: Dict[int, str] = field(default_factory=dict)
+
+    def text(self) -> str:
+        return "".join(
+            self.parts.get(index, f" [part {index}/{self.total} missing] ") for index in range(1, self.total + 1)
+        )
+
+
+class Reassembler:
+    """Collects the parts of long messages. Incomplete ones go to `on_timeout` as one packet, gaps marked."""
+
+    def __init__(self, on_timeout: Callable[[Any, Dict[str, Any]], None], timeout: float = CHUNK_TIMEOUT) -> None:
+        self.on_timeout = on_timeout
+        self.timeout = timeout
+        self._wheel = TimerWheel()
+        self._keys: Dict[Tuple, int] = {}  # PartialMessage.key -> wheel key
+        self._partial: Dict[int, PartialMessage] = {}
+        self._done: "OrderedDict[Tuple, None]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(
+        self, session: Any, node_num: int, packet: Dict[str, Any], chunk: Tuple[str, int, int, str]
+    ) -> Optional[str]:
+        """Add a received part, returning the whole text once every part is in."""
+        tag, index, total, body = chunk
+        key = (node_num, packet["from"], packet["to"], packet.get("channel", 0), tag)
+        with self._lock:
+            if key in self._done:
+                return None
+            wheel_key = self._keys.get(key)
+            if wheel_key is None:
+                wheel_key = self._keys[key] = next(self._ids)
+                self._partial[wheel_key] = PartialMessage(key=key, session=session, packet=packet, total=total)
+            partial = self._partial[wheel_key]
+            partial.parts[index] = body
+            if len(partial.parts) < partial.total:
+                self._wheel.add(wheel_key, self.timeout)  # Restarted by every part
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="chunk-expiry", daemon=True)
+                    self._thread.start()
+                return None
+
+            self._wheel.cancel(wheel_key)
+            del self._keys[key]
+            del self._partial[wheel_key]
+            self._done[key] = None
+            if len(self._done) > RECENT_MESSAGES:
+                self._done.popitem(last=False)
+        return partial.text()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._partial)
+
+    def expire(self, now: Optional[float] = None) -> List[PartialMessage]:
+        with self._lock:
+            expired = [self._partial.pop(wheel_key) for wheel_key in self._wheel.advance(now)]
+            for partial in expired:
+                del self._keys[partial.key]
+                self._done[partial.key] = None
+            while len(self._done) > RECENT_MESSAGES:
+                self._done.popitem(last=False)
+        return expired
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self._wheel.tick)
+            for partial in self.expire():
+                logging.warning(f"Storing a long message with {partial.total - len(partial.parts)} parts missing")
+                packet = dict(partial.packet)
+                packet["decoded"] = dict(packet["decoded"], payload=partial.text().encode("utf-8"))
+                try:
+                    self.on_timeout(partial.session, packet)
+                except Exception as e:
+                    logging.error(f"Error storing incomplete message: {e}")
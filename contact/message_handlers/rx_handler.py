@@ -15,7 +15,13 @@ from contact.ui.contact_ui import (
     draw_messages_window,
     draw_channel_list,
     add_notification,
+    draw_function_win,
+    node_rows,
 )
+from contact.message_handlers.chunking import Reassembler, parse_chunk
+from contact.utilities.capture import capture
+from contact.utilities.perf import timed
+from contact.utilities.sessions import radio_sessions
 from contact.utilities.db_handler import (
     save_message_to_db,
     maybe_store_nodeinfo_in_db,
@@ -67,6 +73,7 @@ def play_sound():
         logging.error(f"Unexpected error: {e}")
 
 
+@timed
 def on_receive(packet: Dict[str, Any], interface: Any) -> None:
     """
     Handles an incoming packet from a Meshtastic interface.
@@ -76,78 +83,119 @@ def on_receive(packet: Dict[str, Any], interface: Any) -> None:
         interface: The Meshtastic interface instance that received the packet.
     """
     with app_state.lock:
-        # Update packet log
-        ui_state.packet_buffer.append(packet)
-        if len(ui_state.packet_buffer) > 20:
-            # Trim buffer to 20 packets
-            ui_state.packet_buffer = ui_state.packet_buffer[-20:]
-
-        if ui_state.display_log:
-            draw_packetlog_win()
-
-            if ui_state.current_window == 4:
-                menu_state.need_redraw = True
-        try:
-            if "decoded" not in packet:
-                return
-
-            # Assume any incoming packet could update the last seen time for a node
-            changed = refresh_node_list()
-            if changed:
-                draw_node_list()
-
-            if packet["decoded"]["portnum"] == "NODEINFO_APP":
-                if "user" in packet["decoded"] and "longName" in packet["decoded"]["user"]:
+        session = radio_sessions.session_for(interface)
+        if radio_sessions.is_primary(session):
+            capture.record(packet)  # A capture replays as one radio
+
+        if radio_sessions.is_active(session):
+            handle_packet(packet)
+            return
+
+        # From a radio not shown: update its state without drawing
+        with radio_sessions.shown(session):
+            handle_packet(packet)
+        if packet.get("decoded", {}).get("portnum") == "TEXT_MESSAGE_APP":
+            session.unread += 1
+            draw_function_win()
+
+
+def handle_packet(packet: Dict[str, Any]) -> None:
+    """Apply a packet to the chat state in the singletons, drawing what changed if that radio is shown."""
+    visible = radio_sessions.on_screen()
+    # Update packet log
+    ui_state.packet_buffer.append(packet)
+    if len(ui_state.packet_buffer) > 20:
+        # Trim buffer to 20 packets
+        ui_state.packet_buffer = ui_state.packet_buffer[-20:]
+
+    if ui_state.display_log and visible:
+        draw_packetlog_win()
+
+        if ui_state.current_window == 4:
+            menu_state.need_redraw = True
+    try:
+        if "decoded" not in packet:
+            return
+
+        # Assume any incoming packet could update the last seen time for a node
+        changed = refresh_node_list()
+        if changed and visible:
+            draw_node_list()
+
+        if packet["decoded"]["portnum"] == "NODEINFO_APP":
+            if "user" in packet["decoded"] and "longName" in packet["decoded"]["user"]:
+                # An attached daemon stores received packets itself
+                if not app_state.daemon_attached:
                     maybe_store_nodeinfo_in_db(packet)
+                node_rows.invalidate(packet["from"])
 
-            elif packet["decoded"]["portnum"] == "TEXT_MESSAGE_APP":
+        elif packet["decoded"]["portnum"] == "TEXT_MESSAGE_APP":
 
-                if config.notification_sound == "True":
-                    play_sound()
+            message_bytes = packet["decoded"]["payload"]
+            message_string = message_bytes.decode("utf-8")
 
-                message_bytes = packet["decoded"]["payload"]
-                message_string = message_bytes.decode("utf-8")
+            chunk = parse_chunk(message_string)
+            if chunk:
+                # One part of a long message, stored once the rest are in
+                session = radio_sessions.current()
+                message_string = reassembler.add(session, interface_state.myNodeNum, packet, chunk)
+                if message_string is None:
+                    return
 
-                refresh_channels = False
-                refresh_messages = False
+            if config.notification_sound == "True":
+                play_sound()
 
-                if packet.get("channel"):
-                    channel_number = packet["channel"]
+            refresh_channels = False
+            refresh_messages = False
+
+            if packet.get("channel"):
+                channel_number = packet["channel"]
+            else:
+                channel_number = 0
+
+            if packet["to"] == interface_state.myNodeNum:
+                if packet["from"] in ui_state.channel_list:
+                    pass
                 else:
-                    channel_number = 0
-
-                if packet["to"] == interface_state.myNodeNum:
-                    if packet["from"] in ui_state.channel_list:
-                        pass
-                    else:
-                        ui_state.channel_list.append(packet["from"])
-                        if packet["from"] not in ui_state.all_messages:
-                            ui_state.all_messages[packet["from"]] = []
+                    ui_state.channel_list.append(packet["from"])
+                    if packet["from"] not in ui_state.all_messages:
+                        ui_state.all_messages[packet["from"]] = []
+                    if not app_state.daemon_attached:
                         update_node_info_in_db(packet["from"], chat_archived=False)
-                        refresh_channels = True
+                    refresh_channels = True
 
-                    channel_number = ui_state.channel_list.index(packet["from"])
+                channel_number = ui_state.channel_list.index(packet["from"])
 
-                channel_id = ui_state.channel_list[channel_number]
+            channel_id = ui_state.channel_list[channel_number]
 
-                if channel_id != ui_state.channel_list[ui_state.selected_channel]:
-                    add_notification(channel_number)
-                    refresh_channels = True
-                else:
-                    refresh_messages = True
+            if channel_id != ui_state.channel_list[ui_state.selected_channel] or not visible:
+                add_notification(channel_number)
+                refresh_channels = True
+            else:
+                refresh_messages = True
 
-                # Add received message to the messages list
-                message_from_id = packet["from"]
-                message_from_string = get_name_from_database(message_from_id, type="short") + ":"
+            # Add received message to the messages list
+            message_from_id = packet["from"]
+            message_from_string = get_name_from_database(message_from_id, type="short") + ":"
 
-                add_new_message(channel_id, f"{config.message_prefix} {message_from_string} ", message_string)
+            add_new_message(channel_id, f"{config.message_prefix} {message_from_string} ", message_string)
 
-                if refresh_channels:
-                    draw_channel_list()
-                if refresh_messages:
-                    draw_messages_window(True)
+            if refresh_channels and visible:
+                draw_channel_list()
+            if refresh_messages and visible:
+                draw_messages_window(True)
 
+            if not app_state.daemon_attached:
                 save_message_to_db(channel_id, message_from_id, message_string)
 
-        except KeyError as e:
-            logging.error(f"Error processing packet: {e}")
+    except KeyError as e:
+        logging.error(f"Error processing packet: {e}")
+
+
+def on_chunks_timeout(session: Any, packet: Dict[str, Any]) -> None:
+    """Store a long message whose missing parts never came."""
+    with app_state.lock, radio_sessions.shown(session):
+        handle_packet(packet)
+
+
+reassembler = Reassembler(on_chunks_timeout)
@@ -1,6 +1,6 @@
-from typing import Any, Dict
+import logging
+from typing import Any, Dict, Tuple
 
-import google.protobuf.json_format
 from meshtastic import BROADCAST_NUM
 from meshtastic.protobuf import mesh_pb2, portnums_pb2
 
@@ -10,14 +10,41 @@ from contact.utilities.db_handler import (
     get_name_from_database,
     is_chat_archived,
     update_node_info_in_db,
+    load_queued_messages,
+)
+from contact.message_handlers.ack_tracker import AckTracker, TrackedMessage
+from contact.message_handlers.chunking import ChunkGroup, chunk_tag, split_message
+from contact.message_handlers.tx_queue import (
+    RETRY_DELAY,
+    TX_INTERVAL,
+    QueuedMessage,
+    TxQueue,
+    pacing_interval,
+    radio_has_room,
 )
 import contact.ui.default_config as config
 
-from contact.utilities.singleton import ui_state, interface_state
+from contact.utilities.sessions import radio_sessions
+from contact.utilities.singleton import ui_state, interface_state, app_state
 
 from contact.utilities.utils import add_new_message
 
-ack_naks: Dict[str, Dict[str, Any]] = {}  # requestId -> {channel, messageIndex, timestamp}
+def update_message_line(message: Any, prefix: str) -> None:
+    """Give a sent message's line in all_messages a new prefix, wherever the line is now."""
+    owner = message.group or message  # The parts of a long message share its line
+    messages = ui_state.all_messages.get(owner.channel_id, [])
+    for index in range(len(messages) - 1, -1, -1):
+        if messages[index] is owner.entry:
+            owner.entry = (prefix, owner.text)
+            messages[index] = owner.entry
+            return
+
+
+def redraw_if_shown(channel_id: Any) -> None:
+    from contact.ui.contact_ui import draw_messages_window
+
+    if radio_sessions.on_screen() and channel_id == ui_state.channel_list[ui_state.selected_channel]:
+        draw_messages_window()
 
 
 # Note "onAckNak" has special meaning to the API, thus the nonstandard naming convention
@@ -26,15 +53,6 @@ def onAckNak(packet: Dict[str, Any]) -> None:
     """
     Handles incoming ACK/NAK response packets.
     """
-    from contact.ui.contact_ui import draw_messages_window
-
-    request = packet["decoded"]["requestId"]
-    if request not in ack_naks:
-        return
-
-    acknak = ack_naks.pop(request)
-    message = ui_state.all_messages[acknak["channel"]][acknak["messageIndex"]][1]
-
     confirm_string = " "
     ack_type = None
     if packet["decoded"]["routing"]["errorReason"] == "NONE":
@@ -48,22 +66,66 @@ def onAckNak(packet: Dict[str, Any]) -> None:
         confirm_string = config.nak_str
         ack_type = "Nak"
 
-    ui_state.all_messages[acknak["channel"]][acknak["messageIndex"]] = (
-        config.sent_message_prefix + confirm_string + ": ",
-        message,
-    )
+    message = ack_tracker.resolve(packet["decoded"]["requestId"], ack_type)
+    if message is None:
+        return
+
+    if message.group:
+        # A long message is confirmed once every part is, and failed as soon as one part fails
+        if message.group.failed:
+            return
+        if ack_type == "Nak":
+            message.group.failed = True
+        else:
+            message.group.acked += 1
+            if message.group.acked < message.group.total:
+                return
+
+    update_message_line(message, config.sent_message_prefix + confirm_string + ": ")
+    update_ack_nak(message.channel_id, message.timestamp, message.text, ack_type)
+    redraw_if_shown(message.channel_id)
+
+
+def on_ack_timeout(message: TrackedMessage) -> None:
+    """No ACK or NAK came for a sent message: queue it again if ack_resends allows, else mark it failed."""
+    with app_state.lock, radio_sessions.shown(message.session):
+        if message.group and message.group.failed:
+            return
+        if message.resends < int(config.ack_resends):
+            logging.info(f"No ACK for message {message.message_id}, sending it again")
+            if message.group is None:
+                update_message_line(message, config.sent_message_prefix + config.queued_str + ": ")
+                update_ack_nak(message.channel_id, message.timestamp, message.text, "Queued")
+            tx_queue.put(
+                QueuedMessage(
+                    session=message.session,
+                    node_num=interface_state.myNodeNum,
+                    channel_id=message.channel_id,
+                    text=message.text,
+                    timestamp=message.timestamp,
+                    entry=message.entry,
+                    tracked=message,
+                    payload=message.payload,
+                    group=message.group,
+                )
+            )
+        else:
+            logging.info(f"No ACK for message {message.message_id}")
+            if message.group:
+                message.group.failed = True
+            update_message_line(message, config.sent_message_prefix + config.nak_str + ": ")
+            update_ack_nak(message.channel_id, message.timestamp, message.text, "Expired")
+        redraw_if_shown(message.channel_id)
 
-    update_ack_nak(acknak["channel"], acknak["timestamp"], message, ack_type)
 
-    channel_number = ui_state.channel_list.index(acknak["channel"])
-    if ui_state.channel_list[channel_number] == ui_state.channel_list[ui_state.selected_channel]:
-        draw_messages_window()
+ack_tracker = AckTracker(on_ack_timeout)
 
 
 def on_response_traceroute(packet: Dict[str, Any]) -> None:
     """
     Handle traceroute response packets and render the route visually in the UI.
     """
+    from google.protobuf.json_format import MessageToDict
     from contact.ui.contact_ui import draw_channel_list, draw_messages_window, add_notification
 
     refresh_channels = False
@@ -73,7 +135,7 @@ def on_response_traceroute(packet: Dict[str, Any]) -> None:
 
     route_discovery = mesh_pb2.RouteDiscovery()
     route_discovery.ParseFromString(packet["decoded"]["payload"])
-    msg_dict = google.protobuf.json_format.MessageToDict(route_discovery)
+    msg_dict = MessageToDict(route_discovery)
 
     msg_str = "Traceroute to:\n"
 
@@ -149,7 +211,7 @@ def on_response_traceroute(packet: Dict[str, Any]) -> None:
     channel_number = ui_state.channel_list.index(packet["from"])
     channel_id = ui_state.channel_list[channel_number]
 
-    if channel_id == ui_state.channel_list[ui_state.selected_channel]:
+    if channel_id == ui_state.channel_list[ui_state.selected_channel] and radio_sessions.on_screen():
         refresh_messages = True
     else:
         add_notification(channel_number)
@@ -159,44 +221,122 @@ def on_response_traceroute(packet: Dict[str, Any]) -> None:
 
     add_new_message(channel_id, f"{config.message_prefix} {message_from_string}", msg_str)
 
-    if refresh_channels:
+    if refresh_channels and radio_sessions.on_screen():
         draw_channel_list()
     if refresh_messages:
         draw_messages_window(True)
 
     save_message_to_db(channel_id, packet["from"], msg_str)
 
-def send_message(message: str, destination: int = BROADCAST_NUM, channel: int = 0) -> None:
+def send_message(message: str, channel: int = 0) -> None:
     """
-    Sends a chat message using the selected channel.
+    Queues a chat message on the selected channel. tx_queue sends it once the radio has room,
+    until then it shows as queued.
     """
-    myid = interface_state.myNodeNum
-    send_on_channel = 0
     channel_id = ui_state.channel_list[channel]
-    if isinstance(channel_id, int):
+    add_new_message(channel_id, config.sent_message_prefix + config.queued_str + ": ", message)
+    timestamp = save_message_to_db(channel_id, interface_state.myNodeNum, message, ack_type="Queued")
+    queue_message(channel_id, message, timestamp, ui_state.all_messages[channel_id][-1])
+
+
+def queue_message(channel_id: Any, message: str, timestamp: int, entry: Tuple[str, str]) -> None:
+    """Hand a message to tx_queue, as numbered parts if it is too long for one packet."""
+    payloads = split_message(message, chunk_tag(timestamp, message))
+    group = ChunkGroup(channel_id, message, entry, len(payloads)) if len(payloads) > 1 else None
+    for payload in payloads:
+        tx_queue.put(
+            QueuedMessage(
+                session=radio_sessions.current(),
+                node_num=interface_state.myNodeNum,
+                channel_id=channel_id,
+                text=message,
+                timestamp=timestamp,
+                entry=entry,
+                payload=payload if group else None,
+                group=group,
+            )
+        )
+
+
+def restore_queue() -> None:
+    """Queue again the messages the last session of this radio left unsent."""
+    queued_prefix = config.sent_message_prefix + config.queued_str + ": "
+    taken = set()
+    for channel_id, timestamp, message in load_queued_messages():
+        messages = ui_state.all_messages.get(channel_id, [])
+        matches = [i for i, entry in enumerate(messages) if entry == (queued_prefix, message)]
+        index = next((i for i in matches if (channel_id, i) not in taken), None)
+        if index is None:
+            continue
+        taken.add((channel_id, index))
+        queue_message(channel_id, message, timestamp, messages[index])
+    if taken:
+        logging.info(f"Queued {len(taken)} messages left unsent by the last session")
+
+
+def transmit_queued(item: QueuedMessage) -> Tuple[bool, float]:
+    """
+    Send a queued message if its radio is connected and has room. Returns whether the message left
+    the queue and the seconds before that radio's next send.
+    """
+    with app_state.lock, radio_sessions.shown(item.session):
+        interface = interface_state.interface
+        if interface_state.myNodeNum != item.node_num:
+            # Another radio on the same connection, the message stays queued in the old radio's tables
+            logging.warning(f"Radio changed, leaving message to {item.channel_id} queued")
+            return True, 0.0
+        if app_state.link_status or not interface.isConnected.is_set():
+            return False, RETRY_DELAY
+        if not radio_has_room(interface):
+            return False, TX_INTERVAL
+
+        destination = BROADCAST_NUM
         send_on_channel = 0
-        destination = channel_id
-    elif isinstance(channel_id, str):
-        send_on_channel = channel
-
-    sent_message_data = interface_state.interface.sendText(
-        text=message,
-        destinationId=destination,
-        wantAck=True,
-        wantResponse=False,
-        onResponse=onAckNak,
-        channelIndex=send_on_channel,
-    )
+        if isinstance(item.channel_id, int):
+            destination = item.channel_id
+        elif item.channel_id in ui_state.channel_list:
+            send_on_channel = ui_state.channel_list.index(item.channel_id)
+        else:
+            logging.warning(f"Channel {item.channel_id} is gone, leaving its message queued")
+            return True, 0.0
+
+        sent_message_data = interface.sendText(
+            text=item.payload or item.text,
+            destinationId=destination,
+            wantAck=True,
+            wantResponse=False,
+            onResponse=radio_sessions.bind(onAckNak, item.session),
+            channelIndex=send_on_channel,
+        )
+
+        if item.group is None:
+            update_message_line(item, config.sent_message_prefix + config.ack_unknown_str + ": ")
+            update_ack_nak(item.channel_id, item.timestamp, item.text, None)
+        elif not item.tracked:
+            item.group.sent += 1
+            # A long message counts as sent once its last part is, unless a part failed already
+            if item.group.sent == item.group.total and not item.group.failed:
+                update_message_line(item, config.sent_message_prefix + config.ack_unknown_str + ": ")
+                update_ack_nak(item.channel_id, item.timestamp, item.text, None)
+        message = item.tracked or TrackedMessage(
+            packet_id=0,
+            session=item.session,
+            channel_id=item.channel_id,
+            text=item.text,
+            timestamp=item.timestamp,
+            entry=item.entry,
+            payload=item.payload,
+            group=item.group,
+        )
+        message.packet_id = sent_message_data.id
+        message.entry = item.entry
+        ack_tracker.track(message)
 
-    add_new_message(channel_id, config.sent_message_prefix + config.ack_unknown_str + ": ", message)
+        redraw_if_shown(item.channel_id)
+        return True, pacing_interval(interface)
 
-    timestamp = save_message_to_db(channel_id, myid, message)
 
-    ack_naks[sent_message_data.id] = {
-        "channel": channel_id,
-        "messageIndex": len(ui_state.all_messages[channel_id]) - 1,
-        "timestamp": timestamp,
-    }
+tx_queue = TxQueue(transmit_queued)
 
 
 def send_traceroute() -> None:
@@ -213,7 +353,7 @@ def send_traceroute() -> None:
         destinationId=channel_id,
         portNum=portnums_pb2.PortNum.TRACEROUTE_APP,
         wantResponse=True,
-        onResponse=on_response_traceroute,
+        onResponse=radio_sessions.bind(on_response_traceroute),
         channelIndex=0,
         hopLimit=3,
     )
@@ -0,0 +1,108 @@
+"""
+Outgoing texts wait here until their radio has room for them, instead of all going to the radio at once
+and overflowing its TX queue. Each radio sends its texts in order, spaced by pacing_interval, which
+stretches as the channel and our own airtime fill up. Queued texts are stored as "Queued" rows in the
+message tables, so they survive a restart.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+TX_INTERVAL = 2.5  # seconds between texts on a quiet channel
+TX_MAX_INTERVAL = 30.0
+CHANNEL_UTIL_BUSY = 25.0  # percent, above this the firmware holds back its own traffic
+AIR_UTIL_TX_LIMIT = 10.0  # percent of the last hour, the EU868 duty cycle
+TX_QUEUE_RESERVE = 2  # radio TX queue slots left free for ACKs, position and telemetry
+RETRY_DELAY = 5.0  # seconds, while the radio is not connected or a send failed
+
+
+@dataclass
+class QueuedMessage:
+    session: Any  # the RadioSession sending it
+    node_num: int
+    channel_id: Union[str, int]
+    text: str
+    timestamp: int  # of its row in the messages table
+    entry: Tuple[str, str]  # its line in all_messages[channel_id]
+    tracked: Any = None  # the TrackedMessage, when resending after no ACK came
+    payload: Optional[str] = None  # what is sent, if only one part of a long text (see chunking)
+    group: Any = None  # the ChunkGroup of such a part
+
+
+def pacing_interval(interface: Any) -> float:
+    """Seconds before the radio's next text, from the channel utilization and airUtilTx it last reported."""
+    metrics = (interface.getMyNodeInfo() or {}).get("deviceMetrics", {})
+    load = max(
+        metrics.get("channelUtilization", 0.0) / CHANNEL_UTIL_BUSY,
+        metrics.get("airUtilTx", 0.0) / AIR_UTIL_TX_LIMIT,
+    )
+    # Quiet up to half the limit, then doubling for every eighth of it
+    return min(TX_MAX_INTERVAL, TX_INTERVAL * 2 ** max(0.0, 8 * (load - 0.5)))
+
+
+def radio_has_room(interface: Any) -> bool:
+    status = getattr(interface, "queueStatus", None)
+    return status is None or status.free > TX_QUEUE_RESERVE  # No queueStatus from older firmware
+
+
+class TxQueue:
+    """
+    Hands queued messages to `send` one at a time, per radio in the order queued. `send` returns
+    whether the message is done with (sent, or dropped) and the seconds until that radio's next send.
+    """
+
+    def __init__(self, send: Callable[[QueuedMessage], Tuple[bool, float]]) -> None:
+        self.send = send
+        self._items: List[QueuedMessage] = []
+        self._ready_at: Dict[int, float] = {}  # id(session) -> monotonic time of its next send
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def put(self, item: QueuedMessage) -> None:
+        with self._cond:
+            self._items.append(item)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="tx-queue", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+    def _next_ready(self, now: float) -> Tuple[Optional[QueuedMessage], Optional[float]]:
+        """The oldest message whose radio may send now, else the seconds until one may."""
+        wait = None
+        seen = set()
+        for item in self._items:
+            key = id(item.session)
+            if key in seen:
+                continue
+            seen.add(key)
+            ready_at = self._ready_at.get(key, 0.0)
+            if ready_at <= now:
+                return item, None
+            wait = ready_at - now if wait is None else min(wait, ready_at - now)
+        return None, wait
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                item, wait = self._next_ready(time.monotonic())
+                while item is None:
+                    self._cond.wait(wait)
+                    item, wait = self._next_ready(time.monotonic())
+
+            try:
+                done, delay = self.send(item)
+            except Exception as e:
+                logging.error(f"Error sending queued message: {e}")
+                done, delay = False, RETRY_DELAY
+
+            with self._cond:
+                if done:
+                    self._items.remove(item)
+                self._ready_at[id(item.session)] = time.monotonic() + delay
@@ -14,14 +14,21 @@ from contact.utilities.arg_parser import setup_parser
 from contact.utilities.interfaces import initialize_interface
 
 
+def open_settings(stdscr: curses.window, interface: object) -> None:
+    """Run the settings menu on an already connected interface."""
+    curses.curs_set(0)
+    stdscr.keypad(True)
+    stdscr.clear()
+    stdscr.refresh()
+    settings_menu(stdscr, interface)
+
+
 def main(stdscr: curses.window) -> None:
     output_capture = io.StringIO()
     try:
         with contextlib.redirect_stdout(output_capture), contextlib.redirect_stderr(output_capture):
             setup_colors()
             draw_splash(stdscr)
-            curses.curs_set(0)
-            stdscr.keypad(True)
 
             parser = setup_parser()
             args = parser.parse_args()
@@ -33,9 +40,7 @@ def main(stdscr: curses.window) -> None:
                     set_region(interface)
                     interface.close()
                     interface = initialize_interface(args)
-            stdscr.clear()
-            stdscr.refresh()
-            settings_menu(stdscr, interface)
+            open_settings(stdscr, interface)
 
     except Exception as e:
         console_output = output_capture.getvalue()
@@ -45,13 +50,13 @@ def main(stdscr: curses.window) -> None:
         raise
 
 
-logging.basicConfig(  # Run `tail -f client.log` in another terminal to view live
-    filename=config.log_file_path,
-    level=logging.WARNING,  # DEBUG, INFO, WARNING, ERROR, CRITICAL)
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
-
 if __name__ == "__main__":
+    # Only when run on its own: imported by the client, its INFO logging setup applies
+    logging.basicConfig(  # Run `tail -f client.log` in another terminal to view live
+        filename=config.log_file_path,
+        level=logging.WARNING,  # DEBUG, INFO, WARNING, ERROR, CRITICAL)
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
     log_file = config.log_file_path
     log_f = open(log_file, "a", buffering=1)  # Enable line-buffering for immediate log writes
 
@@ -4,22 +4,31 @@ import time
 import traceback
 from typing import Union
 
-from contact.utilities.utils import get_channels, get_readable_duration, get_time_ago, refresh_node_list
+from contact.utilities.utils import get_channels, refresh_node_list
 from contact.settings import settings_menu
-from contact.message_handlers.tx_handler import send_message, send_traceroute
+from contact.message_handlers.tx_handler import ack_tracker, send_message, send_traceroute
 from contact.utilities.utils import parse_protobuf
 from contact.ui.colors import get_color
 from contact.utilities.db_handler import get_name_from_database, update_node_info_in_db, is_chat_archived
 from contact.utilities.input_handlers import get_list_input
+from contact.utilities.node_search import node_index
+from contact.utilities.perf import perf_stats, timed, timer
+from contact.utilities.profiler import profiler
+from contact.utilities.sessions import radio_sessions
+from contact.utilities.topology import SWEEP_INTERVAL, sweep_targets, topology_sweep
 import contact.ui.default_config as config
 import contact.ui.dialog
+from contact.ui.node_rows import NodeRowCache
+from contact.ui.render import renderer
 from contact.ui.nav_utils import move_main_highlight, draw_main_arrows, get_msg_window_lines, wrap_text
-from contact.utilities.singleton import ui_state, interface_state, menu_state
-import contact.utilities.show_map as map
+from contact.utilities.singleton import ui_state, interface_state, menu_state, app_state
 
 MIN_COL = 1  # "effectively zero" without breaking curses
+PERF_REFRESH_INTERVAL = 0.5  # seconds between redraws of the Ctrl+K performance overlay
+KEY_WAIT_MS = 50  # how long the main loop waits for a key, with app_state.lock free for the radio threads
 root_win = None
 map_mode = False
+node_rows = NodeRowCache(get_name_from_database)
 
 # Draw arrows for a specific window id (0=channel,1=messages,2=nodes).
 def draw_window_arrows(window_id: int) -> None:
@@ -126,6 +135,7 @@ def handle_resize(stdscr: curses.window, firstrun: bool) -> None:
     else:
         for win in [entry_win, channel_win, messages_win, nodes_win, function_win, packetlog_win]:
             win.erase()
+        renderer.invalidate("packetlog")
 
         entry_win.resize(3, width)
 
@@ -170,83 +180,112 @@ def main_ui(stdscr: curses.window) -> None:
     root_win = stdscr
     input_text = ""
     stdscr.keypad(True)
-    get_channels()
-    handle_resize(stdscr, True)
 
-    # Enable non-blocking input mode for the entry window
-    entry_win.nodelay(True)
-
-    while True:
-        # Get user input (non-blocking). It returns -1 if no key is pressed.
+    # Keys are handled and drawn under app_state.lock, so no other radio's state is swapped in meanwhile
+    with radio_sessions.ui_turn():
+        get_channels()
+        handle_resize(stdscr, True)
+
+        # Wait briefly for each key, the radio threads take the lock in between
+        entry_win.timeout(KEY_WAIT_MS)
+        last_perf_draw = 0.0
+
+        while True:
+            # It returns -1 if no key is pressed in time
+            char = read_key(entry_win)
+
+            # --- Process input ONLY if a key was pressed ---
+            if char != -1:
+                if char == curses.KEY_UP:
+                    handle_up()
+                elif char == curses.KEY_DOWN:
+                    handle_down()
+                elif char == curses.KEY_HOME:
+                    handle_home()
+                elif char == curses.KEY_END:
+                    handle_end()
+                elif char == curses.KEY_PPAGE:
+                    handle_pageup()
+                elif char == curses.KEY_NPAGE:
+                    handle_pagedown()
+                elif char == curses.KEY_LEFT or char == curses.KEY_RIGHT:
+                    handle_leftright(char)
+                elif char in (chr(curses.KEY_ENTER), chr(10), chr(13)):
+                    if not map_mode: # Only handle enter if not in map mode
+                        input_text = handle_enter(input_text)
+                elif char == chr(20):  # Ctrl + t for Traceroute
+                    handle_ctrl_t(stdscr)
+                elif char == chr(5):  # Ctrl + E for a traceroute sweep
+                    handle_ctrl_e(stdscr)
+                elif char in (curses.KEY_BACKSPACE, chr(127)):
+                    if not map_mode: # Only handle backspace if not in map mode
+                        input_text = handle_backspace(entry_win, input_text)
+                elif char == "`":  # ` Launch the settings interface
+                    handle_backtick(stdscr)
+                elif char == chr(16):  # Ctrl + P for Packet Log
+                    handle_ctrl_p()
+                elif char == chr(21):  # Ctrl + U for MAP
+                    handle_ctrl_u(stdscr) # Toggles map_mode
+                elif char == curses.KEY_RESIZE:
+                    input_text = ""
+                    handle_resize(stdscr, False)
+                elif char == chr(4):  # Ctrl + D to delete current channel or node
+                    handle_ctrl_d()
+                elif char == chr(31):  # Ctrl + / to search
+                    handle_ctrl_fslash()
+                elif char == chr(6):  # Ctrl + F to toggle favorite
+                    handle_ctrl_f(stdscr)
+                elif char == chr(7):  # Ctrl + G to toggle ignored
+                    handle_ctlr_g(stdscr)
+                elif char == chr(18):  # Ctrl + R to switch radios
+                    handle_ctrl_r(stdscr)
+                elif char == chr(11):  # Ctrl + K to toggle the performance overlay
+                    ui_state.show_perf = not ui_state.show_perf
+                    draw_function_win()
+                elif char == curses.KEY_F9:  # F9 to start/stop the sampling profiler
+                    handle_f9()
+                elif char == chr(27):  # Escape to exit
+                    break
+                else:
+                    if not map_mode and isinstance(char, str):
+                        input_text += char
+
+            # --- Redraw the UI state every loop iteration ---
+            # This prepares the virtual screen with the latest UI state.
+            if not map_mode:
+                input_line = (input_text or "")[-(stdscr.getmaxyx()[1] - 10) :]
+                draw_text_field(entry_win, f"Input: {input_line}", get_color("input"))
+                if ui_state.show_perf and time.monotonic() - last_perf_draw >= PERF_REFRESH_INTERVAL:
+                    draw_perf_stats()
+                    last_perf_draw = time.monotonic()
+                # If other parts of your UI update dynamically (e.g., from a network thread),
+                # you would call their respective draw functions here as well.
+                # Example:
+                # draw_channel_list()
+                # draw_node_list()
+
+            # --- Master screen update, controlled by map_mode ---
+            if not map_mode:
+                # Only update the physical screen if we are NOT in map mode.
+                renderer.end_frame()
+                curses.doupdate()
+
+
+def read_key(win: curses.window) -> Union[str, int]:
+    """A key from `win`, or -1 if none came within its timeout. app_state.lock is free while waiting."""
+    with radio_sessions.waiting():
         try:
-            char = entry_win.get_wch()
+            return win.get_wch()
         except curses.error:
-            char = -1 # No input
-
-        # --- Process input ONLY if a key was pressed ---
-        if char != -1:
-            if char == curses.KEY_UP:
-                handle_up()
-            elif char == curses.KEY_DOWN:
-                handle_down()
-            elif char == curses.KEY_HOME:
-                handle_home()
-            elif char == curses.KEY_END:
-                handle_end()
-            elif char == curses.KEY_PPAGE:
-                handle_pageup()
-            elif char == curses.KEY_NPAGE:
-                handle_pagedown()
-            elif char == curses.KEY_LEFT or char == curses.KEY_RIGHT:
-                handle_leftright(char)
-            elif char in (chr(curses.KEY_ENTER), chr(10), chr(13)):
-                if not map_mode: # Only handle enter if not in map mode
-                    input_text = handle_enter(input_text)
-            elif char == chr(20):  # Ctrl + t for Traceroute
-                handle_ctrl_t(stdscr)
-            elif char in (curses.KEY_BACKSPACE, chr(127)):
-                if not map_mode: # Only handle backspace if not in map mode
-                    input_text = handle_backspace(entry_win, input_text)
-            elif char == "`":  # ` Launch the settings interface
-                handle_backtick(stdscr)
-            elif char == chr(16):  # Ctrl + P for Packet Log
-                handle_ctrl_p()
-            elif char == chr(21):  # Ctrl + U for MAP
-                handle_ctrl_u(stdscr) # Toggles map_mode
-            elif char == curses.KEY_RESIZE:
-                input_text = ""
-                handle_resize(stdscr, False)
-            elif char == chr(4):  # Ctrl + D to delete current channel or node
-                handle_ctrl_d()
-            elif char == chr(31):  # Ctrl + / to search
-                handle_ctrl_fslash()
-            elif char == chr(6):  # Ctrl + F to toggle favorite
-                handle_ctrl_f(stdscr)
-            elif char == chr(7):  # Ctrl + G to toggle ignored
-                handle_ctlr_g(stdscr)
-            elif char == chr(27):  # Escape to exit
-                break
-            else:
-                if not map_mode and isinstance(char, str):
-                    input_text += char
+            return -1
 
-        # --- Redraw the UI state every loop iteration ---
-        # This prepares the virtual screen with the latest UI state.
-        if not map_mode:
-            draw_text_field(entry_win, f"Input: {(input_text or '')[-(stdscr.getmaxyx()[1] - 10):]}", get_color("input"))
-            # If other parts of your UI update dynamically (e.g., from a network thread),
-            # you would call their respective draw functions here as well.
-            # Example:
-            # draw_channel_list()
-            # draw_node_list()
 
-        # --- Master screen update, controlled by map_mode ---
-        if not map_mode:
-            # Only update the physical screen if we are NOT in map mode.
-            curses.doupdate()
-
-        # Prevent the loop from consuming 100% CPU
-        #time.sleep(0.05)
+def wait_key(win: curses.window) -> Union[str, int]:
+    """The next key pressed in `win`."""
+    while True:
+        char = read_key(win)
+        if char != -1:
+            return char
 
 
 def handle_up() -> None:
@@ -386,15 +425,9 @@ def handle_enter(input_text: str) -> str:
         return input_text
 
     elif len(input_text) > 0:
-        # TODO: This is a hack to prevent sending messages too quickly. Let's get errors from the node.
-        now = time.monotonic()
-        if now - ui_state.last_sent_time < 2.5:
-            contact.ui.dialog.dialog("Slow down", "Please wait 2 seconds between messages.")
-            return input_text
-        # Enter key pressed, send user input as message
+        # Enter key pressed, queue user input as message. It is sent once the radio has room, even if offline now
         send_message(input_text, channel=ui_state.selected_channel)
         draw_messages_window(True)
-        ui_state.last_sent_time = now
         entry_win.erase()
 
         if ui_state.current_window == 0:
@@ -407,6 +440,8 @@ def handle_enter(input_text: str) -> str:
 
 def handle_ctrl_t(stdscr: curses.window) -> None:
     """Handle Ctrl + T key events to send a traceroute."""
+    if not radio_ready():
+        return
     send_traceroute()
     curses.curs_set(0)  # Hide cursor
     contact.ui.dialog.dialog(
@@ -417,6 +452,78 @@ def handle_ctrl_t(stdscr: curses.window) -> None:
     handle_resize(stdscr, False)
 
 
+SWEEP_CHOICES = {
+    "Neighbors (direct)": (0, False),
+    "Within 1 hop": (1, False),
+    "Within 2 hops": (2, False),
+    "Within 3 hops": (3, False),
+    "Favorites": (None, True),
+}
+
+
+def handle_ctrl_e(stdscr: curses.window) -> None:
+    """Handle Ctrl + E key events to start or stop a traceroute sweep of the mesh."""
+    if topology_sweep.running():
+        choice = get_list_input(topology_sweep.progress(), None, ["Keep sweeping", "Stop sweep"])
+        if choice == "Stop sweep":
+            topology_sweep.stop()
+        handle_resize(stdscr, False)
+        return
+    if not radio_ready():
+        return
+
+    choice = get_list_input("Traceroute sweep", None, list(SWEEP_CHOICES))
+    if choice in SWEEP_CHOICES:
+        max_hops, favorites = SWEEP_CHOICES[choice]
+        targets = sweep_targets(interface_state.interface, max_hops, favorites)
+        if targets:
+            topology_sweep.on_result = on_sweep_result
+            topology_sweep.start(radio_sessions.current(), targets)
+            text = (
+                f"Tracing {len(targets)} nodes, one every {SWEEP_INTERVAL:.0f} seconds.\n"
+                "Routes are stored, not shown as messages. List them with: contact topology show"
+            )
+        else:
+            text = "No nodes to trace."
+        curses.curs_set(0)
+        contact.ui.dialog.dialog("Traceroute Sweep", text)
+        curses.curs_set(1)
+    handle_resize(stdscr, False)
+
+
+def on_sweep_result(node_num: int, result: str) -> None:
+    """Update the sweep's progress in the help line. Called with app_state.lock held."""
+    if root_win is not None and radio_sessions.on_screen():
+        draw_function_win()
+
+
+def radio_ready() -> bool:
+    """False, after telling the user, while the UI is still running from the cached session."""
+    if not app_state.link_status:
+        return True
+    curses.curs_set(0)
+    contact.ui.dialog.dialog("Not Connected", f"{app_state.link_status}\nThis is available once the radio is connected.")
+    curses.curs_set(1)
+    handle_resize(root_win, False)
+    return False
+
+
+def show_link_status() -> None:
+    """Update the function window after app_state.link_status changed."""
+    if root_win is None:
+        return
+    if app_state.link_status:
+        draw_link_status()
+    else:
+        redraw_all()
+
+
+def redraw_all() -> None:
+    """Redraw every window, e.g. once the live connection has replaced the cached session."""
+    if root_win is not None:
+        handle_resize(root_win, False)
+
+
 def handle_backspace(entry_win: curses.window, input_text: str) -> str:
     """Handle backspace key events to remove the last character from input text."""
     if input_text:
@@ -431,6 +538,8 @@ def handle_backspace(entry_win: curses.window, input_text: str) -> str:
 
 def handle_backtick(stdscr: curses.window) -> None:
     """Handle backtick key events to open the settings menu."""
+    if not radio_ready():
+        return
     curses.curs_set(0)
     previous_window = ui_state.current_window
     ui_state.current_window = 4
@@ -441,6 +550,24 @@ def handle_backtick(stdscr: curses.window) -> None:
     handle_resize(stdscr, False)
 
 
+def handle_ctrl_r(stdscr: curses.window) -> None:
+    """Handle Ctrl + R key events to switch to another connected radio."""
+    if len(radio_sessions.sessions) < 2:
+        curses.curs_set(0)
+        contact.ui.dialog.dialog("Radios", "Only one radio is connected.\nStart with --radio to add more.")
+        curses.curs_set(1)
+        handle_resize(stdscr, False)
+        return
+
+    options = [radio_sessions.describe(session) for session in radio_sessions.sessions]
+    current = options[radio_sessions.sessions.index(radio_sessions.active)]
+    choice = get_list_input("Switch radio", current, options)
+    if choice in options:
+        radio_sessions.activate(radio_sessions.sessions[options.index(choice)])
+        node_rows.invalidate()  # Names come from the new radio's tables
+    handle_resize(stdscr, False)
+
+
 def handle_ctrl_u(stdscr: curses.window) -> None:
     """Handle Ctrl + U key events to toggle Node MAP."""
     global map_mode
@@ -451,6 +578,9 @@ def handle_ctrl_u(stdscr: curses.window) -> None:
     if map_mode:
         # If we have received at least one position, draw the map
         if len(ui_state.map_positions) > 0:
+            # The map stack (staticmaps, PIL, libsixel) is slow to import, so load it on first use
+            import contact.utilities.show_map as map
+
             map.print_map(stdscr)
 
         # Exit map mode and got back to regular screen refresh
@@ -466,9 +596,24 @@ def handle_ctrl_p() -> None:
     else:
         ui_state.display_log = False
         packetlog_win.erase()
+        renderer.invalidate("packetlog")
         draw_messages_window(True)
 
 
+def handle_f9() -> None:
+    """Handle F9 to start or stop the sampling profiler."""
+    path = profiler.toggle()
+    function_win.erase()
+    function_win.box()
+    if profiler.running:
+        message = "Profiling all threads, press F9 again to stop"
+    elif path:
+        message = f"Profile written to {path}"
+    else:
+        message = "Profile could not be written, see the log"
+    draw_centered_text_field(function_win, message[: function_win.getmaxyx()[1] - 4], 0, get_color("commands"))
+
+
 def handle_ctrl_d() -> None:
     if ui_state.current_window == 0:
         if isinstance(ui_state.channel_list[ui_state.selected_channel], int):
@@ -485,7 +630,7 @@ def handle_ctrl_d() -> None:
             draw_channel_list()
             draw_messages_window()
 
-    if ui_state.current_window == 2:
+    if ui_state.current_window == 2 and radio_ready():
         curses.curs_set(0)
         confirmation = get_list_input(
             f"Remove {get_name_from_database(ui_state.node_list[ui_state.selected_node])} from nodedb?",
@@ -502,6 +647,7 @@ def handle_ctrl_d() -> None:
             hexid = f"!{hex(ui_state.node_list[ui_state.selected_node])[2:]}"
             del interface_state.interface.nodes[hexid]
 
+            node_rows.invalidate(ui_state.node_list[ui_state.selected_node])
             ui_state.node_list.pop(ui_state.selected_node)
 
             draw_messages_window()
@@ -519,7 +665,7 @@ def handle_ctrl_fslash() -> None:
 
 def handle_ctrl_f(stdscr: curses.window) -> None:
     """Handle Ctrl + F key events to toggle favorite status of the selected node."""
-    if ui_state.current_window == 2:
+    if ui_state.current_window == 2 and radio_ready():
         selectedNode = interface_state.interface.nodesByNum[ui_state.node_list[ui_state.selected_node]]
 
         curses.curs_set(0)
@@ -555,7 +701,7 @@ def handle_ctrl_f(stdscr: curses.window) -> None:
 
 def handle_ctlr_g(stdscr: curses.window) -> None:
     """Handle Ctrl + G key events to toggle ignored status of the selected node."""
-    if ui_state.current_window == 2:
+    if ui_state.current_window == 2 and radio_ready():
         selectedNode = interface_state.interface.nodesByNum[ui_state.node_list[ui_state.selected_node]]
 
         curses.curs_set(0)
@@ -588,11 +734,11 @@ def draw_channel_list() -> None:
     if ui_state.current_window != 0 and ui_state.single_pane_mode:
         return
 
-    channel_pad.erase()
     win_width = channel_win.getmaxyx()[1]
 
-    channel_pad.resize(len(ui_state.all_messages), channel_win.getmaxyx()[1])
+    channel_pad.resize(max(1, len(ui_state.all_messages)), channel_win.getmaxyx()[1])
 
+    lines = []
     idx = 0
     for channel in ui_state.channel_list:
         # Convert node number to long name if it's an integer
@@ -619,52 +765,50 @@ def draw_channel_list() -> None:
                 remove_notification(ui_state.selected_channel)
             else:
                 color = get_color("channel_selected")
-        channel_pad.addstr(idx, 1, truncated_channel, color)
+        lines.append((truncated_channel, color))
         idx += 1
 
+    renderer.draw_lines("channels", channel_pad, lines, x=1, width=win_width - 3)
+
     paint_frame(channel_win, selected=(ui_state.current_window == 0))
     refresh_pad(0)
     draw_window_arrows(0)
     channel_win.noutrefresh()
 
 
+@timed
 def draw_messages_window(scroll_to_bottom: bool = False) -> None:
     """Update the messages window based on the selected channel and scroll position."""
 
     if ui_state.current_window != 1 and ui_state.single_pane_mode:
         return
 
-    messages_pad.erase()
-
     if not ui_state.channel_list:
+        messages_pad.erase()
+        renderer.invalidate("messages")
         paint_frame(messages_win, selected=(ui_state.current_window == 1))
         messages_win.noutrefresh()
         return
 
     channel = ui_state.channel_list[ui_state.selected_channel]
+    lines = []
+    win_width = messages_win.getmaxyx()[1]
 
     if channel in ui_state.all_messages:
-        messages = ui_state.all_messages[channel]
-
-        msg_line_count = 0
-
-        row = 0
-        for prefix, message in messages:
-            full_message = f"{prefix}{message}"
-            wrapped_lines = wrap_text(full_message, messages_win.getmaxyx()[1] - 2)
-            msg_line_count += len(wrapped_lines)
-            messages_pad.resize(msg_line_count, messages_win.getmaxyx()[1])
-
-            for line in wrapped_lines:
-                if prefix.startswith("--"):
-                    color = get_color("timestamps")
-                elif prefix.startswith(config.sent_message_prefix):
-                    color = get_color("tx_messages")
-                else:
-                    color = get_color("rx_messages")
+        for prefix, message in ui_state.all_messages[channel]:
+            if prefix.startswith("--"):
+                color = get_color("timestamps")
+            elif prefix.startswith(config.sent_message_prefix):
+                color = get_color("tx_messages")
+            else:
+                color = get_color("rx_messages")
+
+            for line in wrap_text(f"{prefix}{message}", win_width - 2):
+                lines.append((line, color))
 
-                messages_pad.addstr(row, 1, line, color)
-                row += 1
+    msg_line_count = len(lines)
+    messages_pad.resize(max(1, msg_line_count), win_width)
+    renderer.draw_lines("messages", messages_pad, lines, x=1)
 
     paint_frame(messages_win, selected=(ui_state.current_window == 1))
 
@@ -685,9 +829,9 @@ def draw_messages_window(scroll_to_bottom: bool = False) -> None:
         menu_state.need_redraw = True
 
 
+@timed
 def draw_node_list() -> None:
     """Update the nodes list window and pad based on the current state."""
-    global nodes_pad
 
     if ui_state.current_window != 2 and ui_state.single_pane_mode:
         return
@@ -697,30 +841,20 @@ def draw_node_list() -> None:
         nodes_win.noutrefresh()
         return
 
-    nodes_pad = curses.newpad(1, 1)
-
     try:
-        nodes_pad.erase()
         box_width = nodes_win.getmaxyx()[1]
         nodes_pad.resize(len(ui_state.node_list) + 1, box_width)
     except Exception as e:
         logging.error(f"Error Drawing Nodes List: {e}")
         logging.error("Traceback: %s", traceback.format_exc())
 
+    nodes_by_num = interface_state.interface.nodesByNum
+    highlight = ui_state.selected_node if ui_state.current_window == 2 else -1
+    lines = []
     for i, node_num in enumerate(ui_state.node_list):
-        node = interface_state.interface.nodesByNum[node_num]
-        secure = "user" in node and "publicKey" in node["user"] and node["user"]["publicKey"]
-        node_str = f"{'🔐' if secure else '🔓'} {get_name_from_database(node_num, 'long')}".ljust(box_width - 2)[
-            : box_width - 2
-        ]
-        color = "node_list"
-        if "isFavorite" in node and node["isFavorite"]:
-            color = "node_favorite"
-        if "isIgnored" in node and node["isIgnored"]:
-            color = "node_ignored"
-        nodes_pad.addstr(
-            i, 1, node_str, get_color(color, reverse=ui_state.selected_node == i and ui_state.current_window == 2)
-        )
+        node_str, color = node_rows.get_row(node_num, nodes_by_num[node_num], box_width)
+        lines.append((node_str, get_color(color, reverse=i == highlight)))
+    renderer.draw_lines("nodes", nodes_pad, lines, x=1, width=box_width - 2)
 
     paint_frame(nodes_win, selected=(ui_state.current_window == 2))
     nodes_win.noutrefresh()
@@ -827,6 +961,7 @@ def scroll_nodes(direction: int) -> None:
     select_node(new_selected_node)
 
 
+@timed
 def draw_packetlog_win() -> None:
     """Draw the packet log window with the latest packets."""
     columns = [10, 10, 15, 30]
@@ -836,7 +971,6 @@ def draw_packetlog_win() -> None:
         return
 
     if ui_state.display_log:
-        packetlog_win.erase()
         height, width = packetlog_win.getmaxyx()
 
         for column in columns[:-1]:
@@ -844,9 +978,7 @@ def draw_packetlog_win() -> None:
 
         # Add headers
         headers = f"{'From':<{columns[0]}} {'To':<{columns[1]}} {'Port':<{columns[2]}} {'Payload':<{width-span}}"
-        packetlog_win.addstr(
-            1, 1, headers[: width - 2], get_color("log_header", underline=True)
-        )  # Truncate headers if they exceed window width
+        lines = [(headers[: width - 2], get_color("log_header", underline=True))]
 
         for i, packet in enumerate(reversed(ui_state.packet_buffer)):
             if i >= height - 3:  # Skip if exceeds the window height
@@ -861,7 +993,8 @@ def draw_packetlog_win() -> None:
             )
             if "decoded" in packet:
                 port = str(packet["decoded"].get("portnum", "")).ljust(columns[2])
-                parsed_payload = parse_protobuf(packet)
+                with timer("parse_protobuf"):  # Decoding each row's payload, apart from the rest of the draw
+                    parsed_payload = parse_protobuf(packet)
             else:
                 port = "NO KEY".ljust(columns[2])
                 parsed_payload = "NO KEY"
@@ -870,9 +1003,9 @@ def draw_packetlog_win() -> None:
             logString = f"{from_id} {to_id} {port} {parsed_payload}"
             logString = logString[: width - 3]
 
-            # Add to the window
-            packetlog_win.addstr(i + 2, 1, logString, get_color("log"))
+            lines.append((logString, get_color("log")))
 
+        renderer.draw_lines("packetlog", packetlog_win, lines, y=1, x=1, width=width - 2)
         paint_frame(packetlog_win, selected=False)
 
     # Restore cursor to input field
@@ -883,6 +1016,10 @@ def draw_packetlog_win() -> None:
 
 def search(win: int) -> None:
     """Search for a node or channel based on user input."""
+    if win == 2:
+        find_node()
+        return
+
     start_idx = ui_state.selected_node
     select_func = select_node
 
@@ -895,7 +1032,7 @@ def search(win: int) -> None:
 
     while True:
         draw_centered_text_field(entry_win, f"Search: {search_text}", 0, get_color("input"))
-        char = entry_win.get_wch()
+        char = wait_key(entry_win)
 
         if char in (chr(27), chr(curses.KEY_ENTER), chr(10), chr(13)):
             break
@@ -930,6 +1067,44 @@ def search(win: int) -> None:
     entry_win.erase()
 
 
+def find_node() -> None:
+    """Ranked fuzzy node finder. Supports filter tokens like hops:<=2, role:ROUTER and heard:<1h."""
+    node_index.refresh(interface_state.interface.nodesByNum)
+
+    search_text = ""
+    matches = []
+    match_idx = 0
+    entry_win.erase()
+
+    while True:
+        positions = {node_num: i for i, node_num in enumerate(ui_state.node_list)}
+        matches = [node_num for node_num in node_index.search(search_text) if node_num in positions]
+
+        if search_text and matches:
+            match_idx %= len(matches)
+            select_node(positions[matches[match_idx]])
+            status = f" ({match_idx + 1}/{len(matches)})"
+        else:
+            status = " (no match)" if search_text else ""
+
+        entry_win.erase()
+        draw_centered_text_field(entry_win, f"Find Node: {search_text}{status}", 0, get_color("input"))
+        char = wait_key(entry_win)
+
+        if char in (chr(27), chr(curses.KEY_ENTER), chr(10), chr(13)):
+            break
+        elif char == "\t":
+            match_idx += 1
+        elif char in (curses.KEY_BACKSPACE, chr(127)):
+            search_text = search_text[:-1]
+            match_idx = 0
+        elif isinstance(char, str):
+            search_text += char
+            match_idx = 0
+
+    entry_win.erase()
+
+
 def draw_node_details() -> None:
     """Draw the details of the selected node in the function window."""
     node = None
@@ -944,48 +1119,8 @@ def draw_node_details() -> None:
     nodestr = ""
     width = function_win.getmaxyx()[1]
 
-    node_details_list = [
-        f"{node['user']['longName']} " if "user" in node and "longName" in node["user"] else "",
-        f"({node['user']['shortName']})" if "user" in node and "shortName" in node["user"] else "",
-        f" | {node['user']['hwModel']}" if "user" in node and "hwModel" in node["user"] else "",
-        f" | {node['user']['role']}" if "user" in node and "role" in node["user"] else "",
-    ]
-
-    if ui_state.node_list[ui_state.selected_node] == interface_state.myNodeNum:
-        node_details_list.extend(
-            [
-                (
-                    f" | Bat: {node['deviceMetrics']['batteryLevel']}% ({node['deviceMetrics']['voltage']}v)"
-                    if "deviceMetrics" in node
-                    and "batteryLevel" in node["deviceMetrics"]
-                    and "voltage" in node["deviceMetrics"]
-                    else ""
-                ),
-                (
-                    f" | Up: {get_readable_duration(node['deviceMetrics']['uptimeSeconds'])}"
-                    if "deviceMetrics" in node and "uptimeSeconds" in node["deviceMetrics"]
-                    else ""
-                ),
-                (
-                    f" | ChUtil: {node['deviceMetrics']['channelUtilization']:.2f}%"
-                    if "deviceMetrics" in node and "channelUtilization" in node["deviceMetrics"]
-                    else ""
-                ),
-                (
-                    f" | AirUtilTX: {node['deviceMetrics']['airUtilTx']:.2f}%"
-                    if "deviceMetrics" in node and "airUtilTx" in node["deviceMetrics"]
-                    else ""
-                ),
-            ]
-        )
-    else:
-        node_details_list.extend(
-            [
-                f" | {get_time_ago(node['lastHeard'])}" if ("lastHeard" in node and node["lastHeard"]) else "",
-                f" | Hops: {node['hopsAway']}" if "hopsAway" in node else "",
-                f" | SNR: {node['snr']}dB" if ("snr" in node and "hopsAway" in node and node["hopsAway"] == 0) else "",
-            ]
-        )
+    node_num = ui_state.node_list[ui_state.selected_node]
+    node_details_list = node_rows.get_details(node_num, node, node_num == interface_state.myNodeNum)
 
     for s in node_details_list:
         if len(nodestr) + len(s) < width - 2:
@@ -1003,11 +1138,21 @@ def draw_help() -> None:
         "   ESC = Quit",
         "   ^P = Packet Log",
         "   ^t = Traceroute",
+        "   ^e = Sweep",
         "   ^d = Archive Chat",
         "   ^f = Favorite",
         "   ^g = Ignore",
         "   ^/ = Search",
     ]
+    if len(radio_sessions.sessions) > 1:
+        radio = radio_sessions.active.label
+        unread = radio_sessions.unread_elsewhere()
+        if unread:
+            radio += f", {unread} new elsewhere"
+        cmds.insert(0, f"[{radio}]   ")
+        cmds.append("   ^r = Radios")
+    if topology_sweep.running():
+        cmds.insert(0, f"[{topology_sweep.progress()}]   ")
     function_str = ""
     for s in cmds:
         if len(function_str) + len(s) < function_win.getmaxyx()[1] - 2:
@@ -1016,8 +1161,33 @@ def draw_help() -> None:
     draw_centered_text_field(function_win, function_str, 0, get_color("commands"))
 
 
+def draw_perf_stats() -> None:
+    """Draw the live hot-path timings in the function window."""
+    function_win.erase()
+    function_win.box()
+    acks = ack_tracker.summary()
+    text = f"{acks} | {perf_stats.overlay_text(function_win.getmaxyx()[1] - 7 - len(acks))}"
+    draw_centered_text_field(function_win, text, 0, get_color("commands"))
+    # The bytes drawn per frame go in the bottom border, the line above is full
+    height, width = function_win.getmaxyx()
+    function_win.addstr(height - 1, 2, f" {renderer.summary()} "[: max(0, width - 4)], get_color("commands"))
+    function_win.noutrefresh()
+
+
+def draw_link_status() -> None:
+    """Show that the radio is not usable yet, e.g. while running from the cached session or reconnecting."""
+    function_win.erase()
+    function_win.box()
+    text = app_state.link_status[: function_win.getmaxyx()[1] - 4]
+    draw_centered_text_field(function_win, text, 0, get_color("commands"))
+
+
 def draw_function_win() -> None:
-    if ui_state.current_window == 2:
+    if ui_state.show_perf:
+        draw_perf_stats()
+    elif app_state.link_status:
+        draw_link_status()
+    elif ui_state.current_window == 2:
         draw_node_details()
     else:
         draw_help()
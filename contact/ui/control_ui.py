@@ -5,10 +5,10 @@ import os
 import sys
 from typing import List
 
-from contact.utilities.save_to_radio import save_changes
+from contact.utilities.save_to_radio import add_pending, pending_key, save_changes
 import contact.ui.default_config as config
-from contact.utilities.config_io import config_export, config_import
-from contact.utilities.control_utils import parse_ini_file, transform_menu_path
+from contact.utilities.config_io import config_import
+from contact.utilities.control_utils import is_repeated_field, transform_menu_path
 from contact.utilities.input_handlers import (
     get_repeated_input,
     get_text_input,
@@ -18,9 +18,10 @@ from contact.utilities.input_handlers import (
 )
 from contact.ui.colors import get_color
 from contact.ui.dialog import dialog
-from contact.ui.menus import generate_menu_from_protobuf
+from contact.ui.menus import generate_menu_from_protobuf, menu_skeletons
 from contact.ui.nav_utils import move_highlight, draw_arrows, update_help_window
 from contact.ui.user_config import json_editor
+from contact.utilities.sessions import radio_sessions
 from contact.utilities.singleton import menu_state
 
 # Setup Variables
@@ -44,14 +45,11 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.abspath(os.path.join(script_dir, os.pardir))
 
 # Paths
-# locals_dir = os.path.dirname(os.path.abspath(sys.argv[0]))  # Current script directory
-translation_file = os.path.join(parent_dir, "localisations", "en.ini")
-
 # config_folder = os.path.join(locals_dir, "node-configs")
 config_folder = os.path.abspath(config.node_configs_file_path)
 
 # Load translations
-field_mapping, help_text = parse_ini_file(translation_file)
+field_mapping, help_text = menu_skeletons.localisation()
 
 
 def display_menu() -> tuple[object, object]:
@@ -180,6 +178,7 @@ def settings_menu(stdscr: object, interface: object) -> None:
     menu_state.menu_path = ["Main Menu"]
 
     modified_settings = {}
+    pending_changes = {}  # Edits kept from menus left without saving, written by the next Save
 
     menu_state.need_redraw = True
     menu_state.show_save_option = False
@@ -196,6 +195,7 @@ def settings_menu(stdscr: object, interface: object) -> None:
                 (len(path) > 2 and ("Radio Settings" in path or "Module Settings" in path))
                 or (len(path) == 2 and "User Settings" in path)
                 or (len(path) == 3 and "Channels" in path)
+                or (len(path) == 1 and bool(pending_changes))
             )
 
             # Display the menu
@@ -205,7 +205,8 @@ def settings_menu(stdscr: object, interface: object) -> None:
             continue  # Skip if menu_win is not initialized
 
         menu_win.timeout(200)  # wait up to 200 ms for a keypress (or less if key is pressed)
-        key = menu_win.getch()
+        with radio_sessions.waiting():
+            key = menu_win.getch()
         if key == -1:
             continue
 
@@ -280,9 +281,10 @@ def settings_menu(stdscr: object, interface: object) -> None:
                 help_win.refresh()
 
             if menu_state.show_save_option and menu_state.selected_index == len(options):
-                save_changes(interface, modified_settings, menu_state)
+                add_pending(pending_changes, menu_state.menu_path, modified_settings)
                 modified_settings.clear()
-                logging.info("Changes Saved")
+                save_pending(interface, pending_changes)
+                menu = rebuild_menu_at_current_path(interface, menu_state)
 
                 if len(menu_state.menu_path) > 1:
                     menu_state.menu_path.pop()
@@ -295,7 +297,10 @@ def settings_menu(stdscr: object, interface: object) -> None:
             selected_option = options[menu_state.selected_index]
 
             if selected_option == "Exit":
-                break
+                if confirm_pending_on_exit(interface, pending_changes):
+                    break
+                menu_state.start_index.pop()
+                continue
 
             elif selected_option == "Export Config File":
 
@@ -308,7 +313,9 @@ def settings_menu(stdscr: object, interface: object) -> None:
                     filename += ".yaml"
 
                 try:
-                    config_text = config_export(interface)
+                    from contact.utilities.config_store import config_store  # Kept off the startup path
+
+                    config_text = config_store.export_yaml(interface)
                     yaml_file_path = os.path.join(config_folder, filename)
 
                     if os.path.exists(yaml_file_path):
@@ -355,7 +362,12 @@ def settings_menu(stdscr: object, interface: object) -> None:
                     file_path = os.path.join(config_folder, filename)
                     overwrite = get_list_input(f"Are you sure you want to load {filename}?", None, ["Yes", "No"])
                     if overwrite == "Yes":
-                        config_import(interface, file_path)
+                        failed = config_import(interface, file_path, show_import_progress)
+                        if failed:
+                            dialog("Config Load Incomplete", "Could not write:\n" + "\n".join(failed))
+                        else:
+                            dialog("Config Loaded", f" {filename} written to the node ")
+                        menu_state.need_redraw = True
                 menu_state.start_index.pop()
                 continue
 
@@ -474,7 +486,7 @@ def settings_menu(stdscr: object, interface: object) -> None:
                         new_value = new_value == "True" or new_value is True
                     menu_state.start_index.pop()
 
-                elif field.label == field.LABEL_REPEATED:  # Handle repeated field - Not currently used
+                elif is_repeated_field(field):  # Handle repeated field - Not currently used
                     new_value = get_repeated_input(current_value)
                     new_value = current_value if new_value is None else new_value.split(", ")
                     menu_state.start_index.pop()
@@ -541,25 +553,24 @@ def settings_menu(stdscr: object, interface: object) -> None:
 
         elif key == curses.KEY_LEFT:
 
-            # If we are at the main menu and there are unsaved changes, prompt to save
-            if len(menu_state.menu_path) == 3 and modified_settings:
-
+            # Leaving a menu with unsaved changes: keep them for the next Save, save everything now, or drop them
+            if modified_settings and pending_key(menu_state.menu_path) == tuple(menu_state.menu_path[1:]):
                 current_section = menu_state.menu_path[-1]
                 save_prompt = get_list_input(
-                    f"You have unsaved changes in {current_section}. Save before exiting?",
+                    f"You have unsaved changes in {current_section}.",
                     None,
-                    ["Yes", "No", "Cancel"],
+                    ["Keep for Save", "Save now", "Discard", "Cancel"],
                     mandatory=True,
                 )
                 if save_prompt == "Cancel":
                     continue  # Stay in the menu without doing anything
-                elif save_prompt == "Yes":
-                    save_changes(interface, modified_settings, menu_state)
-                    logging.info("Changes Saved")
-
+                if save_prompt != "Discard":
+                    add_pending(pending_changes, menu_state.menu_path, modified_settings)
+                if save_prompt == "Save now":
+                    save_pending(interface, pending_changes)
                 modified_settings.clear()
-                menu = rebuild_menu_at_current_path(interface, menu_state)
-                pass
+                if not pending_changes:
+                    menu = rebuild_menu_at_current_path(interface, menu_state)
 
             menu_state.need_redraw = True
 
@@ -587,11 +598,50 @@ def settings_menu(stdscr: object, interface: object) -> None:
                 menu_state.start_index.pop()
 
         elif key == 27:  # Escape key
+            if not confirm_pending_on_exit(interface, pending_changes):
+                menu_state.need_redraw = True
+                continue
             menu_win.erase()
             menu_win.refresh()
             break
 
 
+def save_pending(interface: object, pending_changes: dict) -> None:
+    """Write every pending edit in one settings transaction and report what the node did not confirm."""
+    failed = save_changes(interface, pending_changes)
+    pending_changes.clear()
+    if failed:
+        dialog("Save Incomplete", "The node did not confirm:\n" + "\n".join(failed))
+    else:
+        logging.info("Changes Saved")
+
+
+def confirm_pending_on_exit(interface: object, pending_changes: dict) -> bool:
+    """Offer to save edits kept for Save before leaving the settings. False to stay."""
+    if not pending_changes:
+        return True
+    sections = ", ".join(key[-1] for key in pending_changes)
+    choice = get_list_input(f"Unsaved changes in {sections}.", None, ["Save", "Discard", "Cancel"], mandatory=True)
+    if choice == "Cancel":
+        return False
+    if choice == "Save":
+        save_pending(interface, pending_changes)
+    pending_changes.clear()
+    return True
+
+
+def show_import_progress(done: int, total: int, label: str) -> None:
+    """Show config import progress in a small box over the menu."""
+    text = f" Writing config {done}/{total}: {label} "
+    width = min(curses.COLS, len(text) + 2)
+    win = curses.newwin(3, width, max(0, (curses.LINES - 3) // 2), max(0, (curses.COLS - width) // 2))
+    win.bkgd(get_color("background"))
+    win.attrset(get_color("window_frame"))
+    win.border(0)
+    win.addstr(1, 1, text[: width - 2], get_color("settings_default"))
+    win.refresh()
+
+
 def rebuild_menu_at_current_path(interface, menu_state):
     """Rebuild menus from the device and re-point current_menu to the same path."""
     new_menu = generate_menu_from_protobuf(interface)
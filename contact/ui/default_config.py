@@ -65,6 +65,7 @@ json_file_path = os.path.join(config_root, "config.json")
 log_file_path = os.path.join(config_root, "client.log")
 db_file_path = os.path.join(config_root, "client.db")
 node_configs_file_path = os.path.join(config_root, "node-configs/")
+daemon_socket_path = os.path.join(config_root, "contact.sock")
 
 
 def format_json_single_line_arrays(data: Dict[str, object], indent: int = 4) -> str:
@@ -195,6 +196,8 @@ def initialize_config() -> Dict[str, object]:
         "ack_str": "[✓]",
         "nak_str": "[x]",
         "ack_unknown_str": "[…]",
+        "queued_str": "[◷]",
+        "ack_resends": "0",
         "node_sort": "lastHeard",
         "theme": "dark",
         "COLOR_CONFIG_DARK": COLOR_CONFIG_DARK,
@@ -228,7 +231,7 @@ def assign_config_variables(loaded_config: Dict[str, object]) -> None:
     # Assign values to local variables
 
     global db_file_path, log_file_path, node_configs_file_path, message_prefix, sent_message_prefix
-    global notification_symbol, ack_implicit_str, ack_str, nak_str, ack_unknown_str
+    global notification_symbol, ack_implicit_str, ack_str, nak_str, ack_unknown_str, queued_str, ack_resends
     global node_list_16ths, channel_list_16ths, single_pane_mode
     global theme, COLOR_CONFIG
     global node_sort, notification_sound
@@ -247,6 +250,8 @@ def assign_config_variables(loaded_config: Dict[str, object]) -> None:
     ack_str = loaded_config["ack_str"]
     nak_str = loaded_config["nak_str"]
     ack_unknown_str = loaded_config["ack_unknown_str"]
+    queued_str = loaded_config["queued_str"]
+    ack_resends = loaded_config["ack_resends"]
     node_sort = loaded_config["node_sort"]
     theme = loaded_config["theme"]
     if theme == "dark":
@@ -278,4 +283,6 @@ if __name__ == "__main__":
     print(f"ACK String: {ack_str}")
     print(f"NAK String: {nak_str}")
     print(f"ACK Unknown String: {ack_unknown_str}")
+    print(f"Queued String: {queued_str}")
+    print(f"ACK Resends: {ack_resends}")
     print(f"Color Config: {COLOR_CONFIG}")
@@ -1,5 +1,6 @@
 import curses
 from contact.ui.colors import get_color
+from contact.utilities.sessions import radio_sessions
 from contact.utilities.singleton import menu_state, ui_state
 
 
@@ -47,7 +48,8 @@ def dialog(title: str, message: str) -> None:
 
     while True:
         win.timeout(200)
-        char = win.getch()
+        with radio_sessions.waiting():
+            char = win.getch()
 
         if menu_state.need_redraw:
             menu_state.need_redraw = False
@@ -1,16 +1,36 @@
 import base64
+import hashlib
 import logging
 import os
+import pickle
 from collections import OrderedDict
 
-from typing import Any, Union, Dict
+from typing import Any, Union, Dict, List, Optional, Tuple
 
+from google.protobuf.descriptor import Descriptor
 from google.protobuf.message import Message
 from meshtastic.protobuf import channel_pb2, config_pb2, module_config_pb2
 
+import contact.ui.default_config as config
+from contact.utilities.control_utils import is_repeated_field, parse_ini_file
 
-locals_dir = os.path.dirname(os.path.abspath(__file__))
+
+locals_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 translation_file = os.path.join(locals_dir, "localisations", "en.ini")
+menu_cache_file = os.path.join(config.config_root, "menu_cache.pickle")
+
+# Bump when the cached layout changes so old pickles are rebuilt
+MENU_CACHE_FORMAT = 1
+
+MENU_MESSAGES = (channel_pb2.ChannelSettings, config_pb2.Config, module_config_pb2.ModuleConfig)
+
+SKIP_FIELDS = [
+    "sessionkey",
+    "ChannelSettings.channel_num",
+    "ChannelSettings.id",
+    "LoRaConfig.ignore_incoming",
+    "DeviceUIConfig.version",
+]
 
 
 def encode_if_bytes(value: Any) -> str:
@@ -20,49 +40,140 @@ def encode_if_bytes(value: Any) -> str:
     return value
 
 
-def extract_fields(
-    message_instance: Message, current_config: Union[Message, Dict[str, Any], None] = None
-) -> Dict[str, Any]:
-    if isinstance(current_config, dict):  # Handle dictionaries
-        return {key: (None, encode_if_bytes(current_config.get(key, "Not Set"))) for key in current_config}
+def menu_shape(descriptor: Descriptor) -> List[Tuple[str, Optional[list]]]:
+    """The menu layout of a message type: (field name, nested layout or None), skipped fields left out."""
+    shape = []
+    for field in descriptor.fields:
+        if any(skip_field in field.full_name for skip_field in SKIP_FIELDS):
+            continue
+        if field.message_type:
+            # Repeated messages (e.g. remote hardware pins) are not editable here and show as empty
+            shape.append((field.name, [] if is_repeated_field(field) else menu_shape(field.message_type)))
+        else:
+            shape.append((field.name, None))
+    return shape
 
-    if not hasattr(message_instance, "DESCRIPTOR"):
-        return {}
 
-    menu = {}
-    fields = message_instance.DESCRIPTOR.fields
-    for field in fields:
-        skip_fields = [
-            "sessionkey",
-            "ChannelSettings.channel_num",
-            "ChannelSettings.id",
-            "LoRaConfig.ignore_incoming",
-            "DeviceUIConfig.version",
-        ]
-        if any(skip_field in field.full_name for skip_field in skip_fields):
-            continue
+def resolve_shape(
+    descriptor: Descriptor, shape: List[Tuple[str, Optional[list]]]
+) -> List[Tuple[str, Any, Optional[list]]]:
+    """Attach the field descriptors to a (pickled) menu layout."""
+    resolved = []
+    for name, nested in shape:
+        field = descriptor.fields_by_name[name]
+        resolved.append((name, field, resolve_shape(field.message_type, nested) if nested is not None else None))
+    return resolved
+
+
+class MenuSkeletonCache:
+    """
+    Menu layouts derived from the protobuf descriptors, plus the en.ini names and help text.
+    Built once per protobuf schema and kept in memory and in a pickle beside the config, so
+    opening settings only fills in the current values.
+    """
+
+    def __init__(self, cache_path: str, ini_path: str) -> None:
+        self.cache_path = cache_path
+        self.ini_path = ini_path
+        self._data: Optional[Dict[str, Any]] = None
+        self._resolved: Dict[str, list] = {}
+
+    def schema_key(self) -> str:
+        digest = hashlib.sha1(str(MENU_CACHE_FORMAT).encode())
+        for message in MENU_MESSAGES:
+            digest.update(message.DESCRIPTOR.file.serialized_pb)
+        stat = os.stat(self.ini_path)
+        digest.update(f"{stat.st_mtime_ns}:{stat.st_size}".encode())
+        return digest.hexdigest()
+
+    def _load(self) -> Dict[str, Any]:
+        if self._data is not None:
+            return self._data
 
-        if field.message_type:  # Nested message
-            nested_instance = getattr(message_instance, field.name)
-            nested_config = getattr(current_config, field.name, None) if current_config else None
-            menu[field.name] = extract_fields(nested_instance, nested_config)
+        key = self.schema_key()
+        try:
+            with open(self.cache_path, "rb") as cache:
+                data = pickle.load(cache)
+            if isinstance(data, dict) and data.get("key") == key:
+                self._data = data
+                return data
+        except FileNotFoundError:
+            pass
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError) as e:
+            logging.warning(f"Rebuilding menu cache {self.cache_path}: {e}")
+
+        field_mapping, help_text = parse_ini_file(self.ini_path)
+        data = {
+            "key": key,
+            "shapes": {message.DESCRIPTOR.full_name: menu_shape(message.DESCRIPTOR) for message in MENU_MESSAGES},
+            "field_mapping": field_mapping,
+            "help_text": help_text,
+        }
+        try:
+            temp_path = f"{self.cache_path}.tmp"
+            with open(temp_path, "wb") as cache:
+                pickle.dump(data, cache, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            logging.warning(f"Could not write menu cache {self.cache_path}: {e}")
+
+        self._data = data
+        return data
+
+    def skeleton(self, descriptor: Descriptor) -> List[Tuple[str, Any, Optional[list]]]:
+        resolved = self._resolved.get(descriptor.full_name)
+        if resolved is None:
+            shape = self._load()["shapes"].get(descriptor.full_name) or menu_shape(descriptor)
+            resolved = self._resolved[descriptor.full_name] = resolve_shape(descriptor, shape)
+        return resolved
+
+    def localisation(self) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """The field name and help text mappings parsed from en.ini."""
+        data = self._load()
+        return data["field_mapping"], data["help_text"]
+
+
+menu_skeletons = MenuSkeletonCache(menu_cache_file, translation_file)
+
+
+def overlay_values(
+    skeleton: List[Tuple[str, Any, Optional[list]]], current_config: Optional[Message]
+) -> Dict[str, Any]:
+    """Fill a cached menu skeleton with the values from `current_config`."""
+    menu = {}
+    for name, field, nested in skeleton:
+        if nested is not None:  # Nested message
+            nested_config = getattr(current_config, name, None) if current_config else None
+            menu[name] = overlay_values(nested, nested_config)
         elif field.enum_type:  # Handle enum fields
-            current_value = getattr(current_config, field.name, "Not Set") if current_config else "Not Set"
+            current_value = getattr(current_config, name, "Not Set") if current_config else "Not Set"
             if isinstance(current_value, int):  # If the value is a number, map it to its name
                 enum_value = field.enum_type.values_by_number.get(current_value)
                 if enum_value:  # Check if the enum value exists
                     current_value_name = f"{enum_value.name}"
                 else:
                     current_value_name = f"Unknown ({current_value})"
-                menu[field.name] = (field, current_value_name)
+                menu[name] = (field, current_value_name)
             else:
-                menu[field.name] = (field, current_value)  # Non-integer values
+                menu[name] = (field, current_value)  # Non-integer values
         else:  # Handle other field types
-            current_value = getattr(current_config, field.name, "Not Set") if current_config else "Not Set"
-            menu[field.name] = (field, encode_if_bytes(current_value))
+            current_value = getattr(current_config, name, "Not Set") if current_config else "Not Set"
+            menu[name] = (field, encode_if_bytes(current_value))
     return menu
 
 
+def extract_fields(
+    message_instance: Message, current_config: Union[Message, Dict[str, Any], None] = None
+) -> Dict[str, Any]:
+    if isinstance(current_config, dict):  # Handle dictionaries
+        return {key: (None, encode_if_bytes(current_config.get(key, "Not Set"))) for key in current_config}
+
+    if not hasattr(message_instance, "DESCRIPTOR"):
+        return {}
+
+    return overlay_values(menu_skeletons.skeleton(message_instance.DESCRIPTOR), current_config)
+
+
 def generate_menu_from_protobuf(interface: object) -> Dict[str, Any]:
     """
     Builds the full settings menu structure from the protobuf definitions.
@@ -1,10 +1,12 @@
 import curses
 import re
-from unicodedata import east_asian_width
+from functools import lru_cache
+from unicodedata import category, east_asian_width
 
 from contact.ui.colors import get_color
+from contact.ui.render import renderer
 from contact.utilities.control_utils import transform_menu_path
-from typing import Any, Optional, List, Dict
+from typing import Any, Optional, Iterator, List, Dict
 from contact.utilities.singleton import interface_state, ui_state
 
 
@@ -320,48 +322,144 @@ def get_wrapped_help_text(
     return wrapped_help
 
 
-def text_width(text: str) -> int:
-    return sum(2 if east_asian_width(c) in "FW" else 1 for c in text)
+WHITESPACE_TRANS = dict.fromkeys(map(ord, "\t\n\x0b\x0c\r "), ord(" "))
+TOKEN_PATTERN = re.compile(r"\S+|\s+")  # Words and runs of spaces
+ZWJ = "\u200d"
+EMOJI_PRESENTATION = "\ufe0f"
 
 
-def wrap_text(text: str, wrap_width: int) -> List[str]:
-    """Wraps text while preserving spaces and breaking long words."""
+@lru_cache(maxsize=4096)
+def is_grapheme_extender(char: str) -> bool:
+    """True for code points that attach to the preceding character instead of starting a new cell."""
+    code = ord(char)
+    return (
+        char == ZWJ
+        or 0xFE00 <= code <= 0xFE0F  # Variation selectors
+        or 0x1F3FB <= code <= 0x1F3FF  # Skin tone modifiers
+        or 0xE0020 <= code <= 0xE007F  # Tag sequences (subdivision flags)
+        or category(char) in ("Mn", "Me")  # Combining marks
+    )
 
-    whitespace = "\t\n\x0b\x0c\r "
-    whitespace_trans = dict.fromkeys(map(ord, whitespace), ord(" "))
-    text = text.translate(whitespace_trans)
 
-    words = re.findall(r"\S+|\s+", text)  # Capture words and spaces separately
-    wrapped_lines = []
-    line_buffer = ""
-    line_length = 0
+def iter_graphemes(text: str) -> Iterator[str]:
+    """Split text into user-perceived characters, keeping ZWJ emoji sequences and flags together."""
+    start = 0
+    length = len(text)
+    while start < length:
+        index = start + 1
+        # Two regional indicators form one flag
+        if 0x1F1E6 <= ord(text[start]) <= 0x1F1FF and index < length and 0x1F1E6 <= ord(text[index]) <= 0x1F1FF:
+            index += 1
+        while index < length:
+            if text[index - 1] == ZWJ:
+                index += 1  # The character after a joiner belongs to the same sequence
+            elif is_grapheme_extender(text[index]):
+                index += 1
+            else:
+                break
+        yield text[start:index]
+        start = index
+
+
+@lru_cache(maxsize=4096)
+def grapheme_width(grapheme: str) -> int:
+    """Terminal cell width of a single grapheme cluster."""
+    if len(grapheme) > 1 and (
+        ZWJ in grapheme or EMOJI_PRESENTATION in grapheme or 0x1F1E6 <= ord(grapheme[0]) <= 0x1F1FF
+    ):
+        return 2
+    if is_grapheme_extender(grapheme[0]):
+        return 0
+    return 2 if east_asian_width(grapheme[0]) in "FW" else 1
+
+
+@lru_cache(maxsize=4096)
+def char_width(char: str) -> int:
+    """Cell width of a lone character, or -1 if it can combine with its neighbours."""
+    if is_grapheme_extender(char) or 0x1F1E6 <= ord(char) <= 0x1F1FF:
+        return -1
+    return 2 if east_asian_width(char) in "FW" else 1
+
+
+def text_width(text: str) -> int:
+    if text.isascii():
+        return len(text)
+    width = 0
+    for char in text:
+        cells = char_width(char)
+        if cells < 0:  # Joiners, modifiers or flags present, so measure whole graphemes
+            return sum(grapheme_width(grapheme) for grapheme in iter_graphemes(text))
+        width += cells
+    return width
+
+
+def split_to_width(word: str, width: int) -> Iterator[str]:
+    """Break a word that is wider than `width` into pieces that fit, without splitting graphemes."""
+    if word.isascii():
+        for i in range(0, len(word), width):
+            yield word[i : i + width]
+        return
+
+    # Plain wide text (CJK) can be cut per character; anything with joiners needs graphemes
+    if all(char_width(char) >= 0 for char in word):
+        units, measure = iter(word), char_width
+    else:
+        units, measure = iter_graphemes(word), grapheme_width
+
+    start = 0
+    end = 0
+    used = 0
+    for grapheme in units:
+        cells = measure(grapheme)
+        if used + cells > width and end > start:
+            yield word[start:end]
+            start = end
+            used = 0
+        end += len(grapheme)
+        used += cells
+    if end > start:
+        yield word[start:end]
+
+
+def iter_wrapped_lines(text: str, wrap_width: int) -> Iterator[str]:
+    """Yield wrapped lines one at a time, preserving spaces and breaking long words."""
     margin = 2  # Left and right margin
-    wrap_width -= margin
+    wrap_width = max(1, wrap_width - margin)
+    ascii_text = text.isascii()
+
+    line_parts: List[str] = []
+    line_length = 0
 
-    for word in words:
-        word_length = text_width(word)
+    for match in TOKEN_PATTERN.finditer(text):
+        word = match.group()
+        is_space = word[0].isspace()
+        if is_space:
+            word = word.translate(WHITESPACE_TRANS)
+        word_length = len(word) if ascii_text else text_width(word)
 
         if word_length > wrap_width:  # Break long words
-            if line_buffer:
-                wrapped_lines.append(line_buffer.strip())
-                line_buffer = ""
+            if line_parts:
+                yield "".join(line_parts).strip()
+                line_parts = []
                 line_length = 0
-            for i in range(0, word_length, wrap_width):
-                wrapped_lines.append(word[i : i + wrap_width])
+            yield from split_to_width(word, wrap_width)
             continue
 
-        if line_length + word_length > wrap_width and word.strip():
-            wrapped_lines.append(line_buffer.strip())
-            line_buffer = ""
+        if line_length + word_length > wrap_width and not is_space:
+            yield "".join(line_parts).strip()
+            line_parts = []
             line_length = 0
 
-        line_buffer += word
+        line_parts.append(word)
         line_length += word_length
 
-    if line_buffer:
-        wrapped_lines.append(line_buffer.strip())
+    if line_parts:
+        yield "".join(line_parts).strip()
+
 
-    return wrapped_lines
+def wrap_text(text: str, wrap_width: int) -> List[str]:
+    """Wraps text while preserving spaces and breaking long words."""
+    return list(iter_wrapped_lines(text, wrap_width))
 
 
 def move_main_highlight(
@@ -404,10 +502,12 @@ def highlight_line(
         color_new = get_color("channel_list", reverse=True) if True else get_color("channel_list", reverse=True)
         menu_pad.chgat(old_idx, 1, menu_pad.getmaxyx()[1] - 4, color_old)
         menu_pad.chgat(new_idx, 1, menu_pad.getmaxyx()[1] - 4, color_new)
+        renderer.mark_dirty("channels", old_idx, new_idx)
 
     elif ui_state.current_window == 2:
         menu_pad.chgat(old_idx, 1, menu_pad.getmaxyx()[1] - 4, get_node_color(old_idx))
         menu_pad.chgat(new_idx, 1, menu_pad.getmaxyx()[1] - 4, get_node_color(new_idx, reverse=True))
+        renderer.mark_dirty("nodes", old_idx, new_idx)
 
     menu_win.refresh()
 
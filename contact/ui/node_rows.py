@@ -0,0 +1,107 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from contact.utilities.utils import get_readable_duration, get_time_ago
+
+# Row key: everything besides the name that changes how a row looks
+RowKey = Tuple[bool, bool, bool]
+
+
+class NodeRowCache:
+    """
+    Pre-rendered node list rows.
+
+    Each entry holds the padded row string and color category for one node. An entry is rebuilt
+    only when the node's nodeinfo is invalidated, its favorite/ignored flag or key status flips,
+    or the pane width changes.
+    """
+
+    def __init__(self, name_lookup: Callable[[int, str], str]) -> None:
+        self._name_lookup = name_lookup
+        self._rows: Dict[int, Tuple[RowKey, str, str]] = {}
+        self._names: Dict[int, str] = {}
+        self._details: Dict[int, Tuple[Tuple[Any, ...], List[str]]] = {}
+        self._width: Optional[int] = None
+
+    def invalidate(self, node_num: Optional[int] = None) -> None:
+        """Drop cached rows for one node (after a nodeinfo update) or for every node."""
+        if node_num is None:
+            self._rows.clear()
+            self._names.clear()
+            self._details.clear()
+            return
+        self._rows.pop(node_num, None)
+        self._names.pop(node_num, None)
+        self._details.pop(node_num, None)
+
+    def get_row(self, node_num: int, node: Dict[str, Any], width: int) -> Tuple[str, str]:
+        """Return the (row string, color category) for a node in a pane `width` columns wide."""
+        if width != self._width:
+            self._rows.clear()
+            self._width = width
+
+        user = node.get("user")
+        key = (
+            bool(user and user.get("publicKey")),
+            bool(node.get("isFavorite")),
+            bool(node.get("isIgnored")),
+        )
+
+        cached = self._rows.get(node_num)
+        if cached is not None and cached[0] == key:
+            return cached[1], cached[2]
+
+        name = self._names.get(node_num)
+        if name is None:
+            name = self._name_lookup(node_num, "long")
+            self._names[node_num] = name
+
+        secure, favorite, ignored = key
+        row = f"{'🔐' if secure else '🔓'} {name}".ljust(width - 2)[: width - 2]
+        color = "node_ignored" if ignored else "node_favorite" if favorite else "node_list"
+
+        self._rows[node_num] = (key, row, color)
+        return row, color
+
+    def get_details(self, node_num: int, node: Dict[str, Any], is_local: bool) -> List[str]:
+        """Return the detail segments shown in the function window for a node."""
+        user = node.get("user") or {}
+        signature = (user.get("longName"), user.get("shortName"), user.get("hwModel"), user.get("role"))
+
+        cached = self._details.get(node_num)
+        if cached is not None and cached[0] == signature:
+            static = cached[1]
+        else:
+            long_name, short_name, hw_model, role = signature
+            static = [
+                f"{long_name} " if long_name is not None else "",
+                f"({short_name})" if short_name is not None else "",
+                f" | {hw_model}" if hw_model is not None else "",
+                f" | {role}" if role is not None else "",
+            ]
+            self._details[node_num] = (signature, static)
+
+        # Telemetry and last-heard change constantly, so they are always rebuilt
+        if is_local:
+            metrics = node.get("deviceMetrics") or {}
+            battery = metrics.get("batteryLevel")
+            voltage = metrics.get("voltage")
+            uptime = metrics.get("uptimeSeconds")
+            channel_util = metrics.get("channelUtilization")
+            air_util = metrics.get("airUtilTx")
+            dynamic = [
+                f" | Bat: {battery}% ({voltage}v)" if battery is not None and voltage is not None else "",
+                f" | Up: {get_readable_duration(uptime)}" if uptime is not None else "",
+                f" | ChUtil: {channel_util:.2f}%" if channel_util is not None else "",
+                f" | AirUtilTX: {air_util:.2f}%" if air_util is not None else "",
+            ]
+        else:
+            last_heard = node.get("lastHeard")
+            hops = node.get("hopsAway")
+            snr = node.get("snr")
+            dynamic = [
+                f" | {get_time_ago(last_heard)}" if last_heard else "",
+                f" | Hops: {hops}" if hops is not None else "",
+                f" | SNR: {snr}dB" if snr is not None and hops == 0 else "",
+            ]
+
+        return static + dynamic
@@ -0,0 +1,156 @@
+import curses
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# (text, attribute) for one row of a pane
+Line = Tuple[str, int]
+
+# Rough cost of moving the cursor to a new row (CSI row;col H)
+CURSOR_MOVE_BYTES = 8
+
+# Placeholder for a row whose on-screen content is unknown
+DIRTY = object()
+
+
+def fit_width(text: str, width: int) -> str:
+    """Cut or pad `text` to exactly `width` terminal cells, so wide characters can't spill into the next row."""
+    if text.isascii():
+        return text[:width].ljust(width)
+    from contact.ui.nav_utils import split_to_width, text_width  # nav_utils imports this module
+
+    cells = text_width(text)
+    if cells > width:
+        text = next(split_to_width(text, width), "") if width > 0 else ""
+        cells = text_width(text)
+        if cells > width:  # A single grapheme wider than the row
+            return " " * max(0, width)
+    return text + " " * (width - cells)
+
+
+class PaneFrame:
+    """The last content written to one window or pad."""
+
+    def __init__(self, win: Any, width: int, height: int) -> None:
+        self.win = win  # Holding the window keeps id() reuse from aliasing a new pad onto an old frame
+        self.width = width
+        # Nothing is known about a fresh pane, so every row starts out dirty
+        self.lines: List[Any] = [DIRTY] * height
+
+
+class DamageRenderer:
+    """
+    Line-level damage tracking for the chat panes.
+
+    Draw functions hand over the complete content of a pane and only the rows that differ
+    from the previous frame are written to curses. Frames are dropped automatically when the
+    window is replaced or changes width, and can be dropped by hand after a window is erased.
+    """
+
+    def __init__(self, history: int = 120) -> None:
+        self._frames: Dict[str, PaneFrame] = {}
+        self._lock = threading.Lock()
+        self._pending_bytes = 0
+        self._pending_lines = 0
+        self.frames: Deque[Tuple[float, int, int]] = deque(maxlen=history)  # (time, bytes, lines)
+        self.total_bytes = 0
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Forget what a pane (or every pane) shows, forcing a full repaint on the next draw."""
+        with self._lock:
+            if name is None:
+                self._frames.clear()
+            else:
+                self._frames.pop(name, None)
+
+    def mark_dirty(self, name: str, *rows: int) -> None:
+        """Flag rows that were changed behind the renderer's back (e.g. with chgat)."""
+        with self._lock:
+            frame = self._frames.get(name)
+            if frame is None:
+                return
+            for row in rows:
+                if 0 <= row < len(frame.lines):
+                    frame.lines[row] = DIRTY
+
+    def draw_lines(self, name: str, win: Any, lines: List[Line], y: int = 0, x: int = 0, width: int = 0) -> int:
+        """
+        Make rows y.. of `win` show `lines`, writing only the rows that changed.
+
+        Rows are padded to `width` so shorter text overwrites longer text without clearing
+        the border. Rows left over from a longer previous frame are blanked. Pads may grow or
+        shrink between frames since curses keeps their content; a width change starts over.
+        Returns the number of rows written.
+        """
+        height, win_width = win.getmaxyx()
+        width = max(0, width or win_width - x)
+        rows = max(0, height - y)
+
+        with self._lock:
+            frame = self._frames.get(name)
+            if frame is None or frame.win is not win or frame.width != win_width:
+                frame = PaneFrame(win, win_width, rows)
+                self._frames[name] = frame
+
+            previous = frame.lines
+            written = 0
+            written_bytes = 0
+
+            for row in range(min(max(len(lines), len(previous)), rows)):
+                line = lines[row] if row < len(lines) else None
+                if row < len(previous) and previous[row] is not DIRTY and previous[row] == line:
+                    continue
+
+                text, attr = line if line is not None else ("", curses.A_NORMAL)
+                text = fit_width(text, width)
+                try:
+                    win.addstr(y + row, x, text, attr)
+                except curses.error:
+                    # Writing the bottom-right cell raises even though the text is drawn
+                    pass
+                written += 1
+                written_bytes += len(text.encode("utf-8")) + CURSOR_MOVE_BYTES
+
+            frame.lines = list(lines[:rows])
+            self._pending_bytes += written_bytes
+            self._pending_lines += written
+
+        return written
+
+    def end_frame(self) -> int:
+        """Close the current frame before curses.doupdate(). Returns the bytes written in it."""
+        with self._lock:
+            frame_bytes, frame_lines = self._pending_bytes, self._pending_lines
+            self._pending_bytes = 0
+            self._pending_lines = 0
+
+        if frame_lines:
+            self.frames.append((time.time(), frame_bytes, frame_lines))
+            self.total_bytes += frame_bytes
+            logging.debug(f"Frame wrote {frame_lines} lines, ~{frame_bytes} bytes")
+        return frame_bytes
+
+    def stats(self) -> Dict[str, float]:
+        """Bytes per frame over the recent history, for measuring link bandwidth."""
+        sizes = [frame_bytes for _, frame_bytes, _ in self.frames]
+        if not sizes:
+            return {"frames": 0, "last": 0, "avg": 0.0, "max": 0, "total": self.total_bytes}
+        return {
+            "frames": len(sizes),
+            "last": sizes[-1],
+            "avg": sum(sizes) / len(sizes),
+            "max": max(sizes),
+            "total": self.total_bytes,
+        }
+
+    def summary(self) -> str:
+        stats = self.stats()
+        return (
+            f"Draw {stats['last']}B last, {stats['avg']:.0f}B avg, {stats['max']}B max, "
+            f"{stats['total'] / 1024:.1f}KiB total"
+        )
+
+
+renderer = DamageRenderer()
@@ -25,7 +25,6 @@ class ChatUIState:
     selected_message: int = 0
     selected_node: int = 0
     current_window: int = 0
-    last_sent_time: float = 0.0
 
     selected_index: int = 0
     start_index: List[int] = field(default_factory=lambda: [0, 0, 0])
@@ -33,6 +32,7 @@ class ChatUIState:
     menu_path: List[str] = field(default_factory=list)
     single_pane_mode: bool = False
     map_positions: list = field(default_factory=list)
+    show_perf: bool = False
 
 @dataclass
 class InterfaceState:
@@ -43,3 +43,26 @@ class InterfaceState:
 @dataclass
 class AppState:
     lock: Any = None
+    daemon_attached: bool = False
+    link_status: str = ""  # why the radio can't be used (cached session, link down), empty while connected
+
+
+@dataclass
+class RadioSession:
+    """A connected radio and its share of the chat state, swapped into the singletons while it is shown."""
+
+    label: str
+    interface: Any = None
+    myNodeNum: int = 0
+    daemon_attached: bool = False
+    link_status: str = ""
+    channel_list: List[str] = field(default_factory=list)
+    all_messages: Dict[str, List[str]] = field(default_factory=dict)
+    notifications: List[str] = field(default_factory=list)
+    packet_buffer: List[str] = field(default_factory=list)
+    node_list: List[str] = field(default_factory=list)
+    selected_channel: int = 0
+    selected_message: int = 0
+    selected_node: int = 0
+    start_index: List[int] = field(default_factory=lambda: [0, 0, 0])
+    unread: int = 0  # messages received while another radio was shown
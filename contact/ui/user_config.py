@@ -7,6 +7,7 @@ from contact.ui.colors import get_color, setup_colors, COLOR_MAP
 import contact.ui.default_config as config
 from contact.ui.nav_utils import move_highlight, draw_arrows
 from contact.utilities.input_handlers import get_list_input
+from contact.utilities.sessions import radio_sessions
 from contact.utilities.singleton import menu_state
 
 
@@ -114,7 +115,8 @@ def edit_value(key: str, current_value: str) -> str:
         edit_win.move(row, col + min(len(user_input) - scroll_offset, input_width))
 
         try:
-            key = edit_win.get_wch()
+            with radio_sessions.waiting():
+                key = edit_win.get_wch()
         except curses.error:
             continue  # window not ready — skip this loop
 
@@ -262,7 +264,8 @@ def json_editor(stdscr: curses.window, menu_state: Any) -> None:
         max_index = len(options) + (1 if menu_state.show_save_option else 0) - 1
 
         menu_win.timeout(200)
-        key = menu_win.getch()
+        with radio_sessions.waiting():
+            key = menu_win.getch()
 
         if key == curses.KEY_UP:
 
@@ -0,0 +1,141 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from meshtastic.protobuf import admin_pb2
+
+from contact.utilities.sessions import radio_sessions
+
+ADMIN_WINDOW = 4  # admin writes in flight before waiting on the oldest ACK
+ADMIN_TIMEOUT = 10.0  # seconds to wait for each ACK
+ADMIN_RETRIES = 2  # extra rounds for writes that were NAKed or timed out
+
+# Progress callback: (writes acknowledged, total writes, label of the last one)
+Progress = Callable[[int, int, str], None]
+
+
+class AdminAckWaiter:
+    """Collects the routing ACK/NAKs (or responses) to admin messages, keyed by packet id."""
+
+    def __init__(self) -> None:
+        self._results: Dict[int, str] = {}
+        self._condition = threading.Condition()
+
+    def onAckNak(self, packet: Dict[str, Any]) -> None:
+        # meshtastic only hands plain ACKs to response callbacks with exactly this name
+        decoded = packet.get("decoded", {})
+        reason = decoded.get("routing", {}).get("errorReason", "NONE")
+        with self._condition:
+            self._results[decoded.get("requestId")] = reason
+            self._condition.notify_all()
+
+    def wait(self, packet_id: int, deadline: float) -> Optional[str]:
+        """The error reason for `packet_id` ("NONE" on success), or None if the deadline passed."""
+        with self._condition:
+            while packet_id not in self._results:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+            return self._results.pop(packet_id)
+
+
+@contextmanager
+def collect_admin_messages(node: Any) -> Iterator[List[admin_pb2.AdminMessage]]:
+    """
+    Capture the admin messages that node methods such as setOwner, setURL or writeConfig would send,
+    so they can be sent through run_admin_writes instead.
+    """
+    messages: List[admin_pb2.AdminMessage] = []
+    send_admin = node._sendAdmin
+
+    def collect(message: admin_pb2.AdminMessage, **kwargs: Any) -> Any:
+        if message.WhichOneof("payload_variant") == "get_config_request":
+            return send_admin(message, **kwargs)  # Session key requests go out as usual
+        messages.append(message)
+        return None
+
+    node._sendAdmin = collect
+    try:
+        yield messages
+    finally:
+        del node._sendAdmin
+
+
+def run_admin_writes(
+    node: Any,
+    writes: List[Tuple[str, admin_pb2.AdminMessage]],
+    progress: Optional[Progress] = None,
+    window: int = ADMIN_WINDOW,
+    timeout: float = ADMIN_TIMEOUT,
+    retries: int = ADMIN_RETRIES,
+) -> List[str]:
+    """
+    Send labelled admin messages to `node`, keeping up to `window` in flight and waiting for each
+    ACK rather than sleeping. Writes that are NAKed or time out are retried on their own.
+    Returns the labels of the writes that still failed.
+    """
+    waiter = AdminAckWaiter()
+    total = len(writes)
+    done = 0
+    pending = list(writes)
+
+    for attempt in range(retries + 1):
+        failed: List[Tuple[str, admin_pb2.AdminMessage]] = []
+        in_flight: deque = deque()
+
+        def settle() -> None:
+            nonlocal done
+            label, message, packet_id, deadline = in_flight.popleft()
+            with radio_sessions.waiting():  # The reader thread may need app_state.lock before it reaches the ACK
+                reason = waiter.wait(packet_id, deadline)
+            if reason == "NONE":
+                done += 1
+                if progress:
+                    progress(done, total, label)
+                return
+            node.iface.responseHandlers.pop(packet_id, None)
+            logging.warning(f"Admin write {label} {'timed out' if reason is None else f'failed: {reason}'}")
+            failed.append((label, message))
+
+        for label, message in pending:
+            while len(in_flight) >= window:
+                settle()
+            packet = node._sendAdmin(message, onResponse=waiter.onAckNak)
+            if packet is None:
+                failed.append((label, message))
+                continue
+            in_flight.append((label, message, packet.id, time.monotonic() + timeout))
+        while in_flight:
+            settle()
+
+        if not failed:
+            return []
+        pending = failed
+        if attempt < retries:
+            logging.info(f"Retrying {len(pending)} admin writes")
+
+    return [label for label, _ in pending]
+
+
+def run_admin_transaction(
+    node: Any,
+    writes: List[Tuple[str, admin_pb2.AdminMessage]],
+    progress: Optional[Progress] = None,
+    window: int = ADMIN_WINDOW,
+) -> List[str]:
+    """run_admin_writes bracketed by begin/commitSettingsTransaction, each confirmed before moving on."""
+    with collect_admin_messages(node) as begin:
+        node.beginSettingsTransaction()
+    failed = run_admin_writes(node, [("begin transaction", message) for message in begin])
+    if failed:
+        return failed + [label for label, _ in writes]
+
+    failed = run_admin_writes(node, writes, progress, window)
+
+    with collect_admin_messages(node) as commit:
+        node.commitSettingsTransaction()
+    return failed + run_admin_writes(node, [("commit transaction", message) for message in commit])
@@ -1,5 +1,8 @@
 from argparse import ArgumentParser
 
+import contact.ui.default_config as config
+from contact.utilities.capture import parse_replay_speed
+
 
 def setup_parser() -> ArgumentParser:
     parser = ArgumentParser(
@@ -32,6 +35,58 @@ def setup_parser() -> ArgumentParser:
     conn.add_argument(
         "--ble", "-b", help="The BLE device MAC address or name to connect to.", nargs="?", default=None, const="any"
     )
+    conn.add_argument(
+        "--attach",
+        "-a",
+        help="Attach to a running contact daemon, optionally at the given socket path.",
+        nargs="?",
+        default=None,
+        const=config.daemon_socket_path,
+        metavar="SOCKET",
+    )
+    conn.add_argument(
+        "--sim",
+        help="Connect to a simulated mesh instead of a radio, for load testing without hardware.",
+        action="store_true",
+    )
+    conn.add_argument(
+        "--replay",
+        help="Replay a capture file recorded with --capture through the UI instead of connecting to a radio.",
+        metavar="FILE",
+    )
+    parser.add_argument(
+        "--replay-speed",
+        help="Replay pace: a multiple of the original speed, or 'max' for as fast as possible (default: 1).",
+        type=parse_replay_speed,
+        default="1",
+    )
+    parser.add_argument("--capture", help="Append every received packet to a capture file.", metavar="FILE")
+    parser.add_argument(
+        "--radio",
+        help="Connect to another radio as well, as serial:PORT, tcp:HOST[:PORT], ble:ADDRESS or sim:SEED. "
+        "Can be given more than once, Ctrl+R switches between radios.",
+        action="append",
+        default=[],
+        metavar="TARGET",
+    )
+    sim = parser.add_argument_group("Simulation", "Traffic generated by --sim.")
+    sim.add_argument("--sim-rate", help="Packets per second (default: 2).", type=float, default=2.0)
+    sim.add_argument("--sim-nodes", help="Number of simulated nodes (default: 50).", type=int, default=50)
+    sim.add_argument(
+        "--sim-mix",
+        help="Port mix as weights, e.g. text=4,position=3,telemetry=3,nodeinfo=1.",
+        default="text=4,position=3,telemetry=3,nodeinfo=1",
+    )
+    sim.add_argument("--sim-seed", help="Seed for the traffic generator (default: 0).", type=int, default=0)
+    sim.add_argument("--sim-trace", help="Replay a recorded trace of JSON lines instead of generating traffic.")
+    parser.add_argument(
+        "--daemon",
+        help="Run headless, keeping the radio connection and message storage running and serving UIs on a local socket.",
+        nargs="?",
+        default=None,
+        const=config.daemon_socket_path,
+        metavar="SOCKET",
+    )
     parser.add_argument(
         "--settings", "--set", "--control", "-c", help="Launch directly into the settings", action="store_true"
     )
@@ -0,0 +1,141 @@
+import logging
+import os
+import struct
+import threading
+import time
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
+
+from google.protobuf.message import DecodeError
+from meshtastic import publishingThread
+from meshtastic.protobuf import mesh_pb2
+
+# Capture file layout:
+#   magic, then the local node number (so DMs replay as DMs)
+#   records of <receive time as double><MeshPacket length> followed by the serialized MeshPacket
+CAPTURE_MAGIC = b"CTCAP\x01"
+CAPTURE_HEADER = struct.Struct("<I")
+CAPTURE_RECORD = struct.Struct("<dI")
+FLUSH_EVERY = 64
+
+
+class CaptureWriter:
+    """Append-only recorder for the packets handed to on_receive."""
+
+    def __init__(self) -> None:
+        self.file: Optional[BinaryIO] = None
+        self.path: Optional[str] = None
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def open(self, path: str, my_node_num: int) -> None:
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not new_file:
+            with open(path, "rb") as existing:
+                if existing.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+                    raise ValueError(f"{path} exists and is not a contact capture file")
+
+        self.file = open(path, "ab")
+        self.path = path
+        if new_file:
+            self.file.write(CAPTURE_MAGIC + CAPTURE_HEADER.pack(my_node_num))
+        logging.info(f"Capturing received packets to {path}")
+
+    def record(self, packet: Dict[str, Any]) -> None:
+        if self.file is None or "raw" not in packet:
+            return
+        data = packet["raw"].SerializeToString()
+        with self._lock:
+            self.file.write(CAPTURE_RECORD.pack(time.time(), len(data)))
+            self.file.write(data)
+            self.count += 1
+            if self.count % FLUSH_EVERY == 0:
+                self.file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self.file is None:
+                return
+            self.file.close()
+            self.file = None
+        logging.info(f"Captured {self.count} packets to {self.path}")
+
+
+def read_capture_header(capture_file: BinaryIO, path: str) -> int:
+    """Check the magic and return the local node number the capture was recorded on."""
+    magic = capture_file.read(len(CAPTURE_MAGIC))
+    header = capture_file.read(CAPTURE_HEADER.size)
+    if magic != CAPTURE_MAGIC or len(header) != CAPTURE_HEADER.size:
+        raise ValueError(f"{path} is not a contact capture file")
+    return CAPTURE_HEADER.unpack(header)[0]
+
+
+def capture_node_num(path: str) -> int:
+    with open(path, "rb") as capture_file:
+        return read_capture_header(capture_file, path)
+
+
+def iter_capture(path: str) -> Iterator[Tuple[float, mesh_pb2.MeshPacket]]:
+    """Yield (receive time, MeshPacket) for every complete record in a capture file."""
+    with open(path, "rb") as capture_file:
+        read_capture_header(capture_file, path)
+        while True:
+            record = capture_file.read(CAPTURE_RECORD.size)
+            if len(record) < CAPTURE_RECORD.size:
+                return
+            timestamp, size = CAPTURE_RECORD.unpack(record)
+            data = capture_file.read(size)
+            if len(data) < size:
+                logging.warning(f"Capture {path} ends with a truncated record")
+                return
+
+            packet = mesh_pb2.MeshPacket()
+            try:
+                packet.ParseFromString(data)
+            except DecodeError as e:
+                logging.error(f"Skipping unreadable record in {path}: {e}")
+                continue
+            yield timestamp, packet
+
+
+def parse_replay_speed(value: str) -> Optional[float]:
+    """Parse --replay-speed: "max" for as fast as possible (None), or a multiple of the original pace."""
+    if value.lower() == "max":
+        return None
+    speed = float(value)
+    if speed <= 0:
+        raise ValueError("Replay speed must be positive or 'max'")
+    return speed
+
+
+def replay_capture(interface: Any, path: str, speed: Optional[float]) -> Dict[str, float]:
+    """
+    Feed a capture back through the interface, and so through on_receive, at `speed` times the
+    original pace (None for as fast as possible). Returns throughput once every packet has
+    been handled.
+    """
+    started = time.perf_counter()
+    first_timestamp = None
+    count = 0
+
+    for timestamp, packet in iter_capture(path):
+        if speed is not None:
+            if first_timestamp is None:
+                first_timestamp = timestamp
+            delay = started + (timestamp - first_timestamp) / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        interface.inject(packet)
+        count += 1
+
+    # Packets are published from meshtastic's publishing thread, so wait for it to drain
+    drained = threading.Event()
+    publishingThread.queueWork(drained.set)
+    drained.wait()
+
+    elapsed = time.perf_counter() - started
+    stats = {"packets": count, "seconds": elapsed, "rate": count / elapsed if elapsed else 0.0}
+    logging.info(f"Replayed {count} packets from {path} in {elapsed:.2f}s ({stats['rate']:.1f} packets/s)")
+    return stats
+
+
+capture = CaptureWriter()
@@ -1,11 +1,12 @@
-import yaml
 import logging
 import time
-from typing import List
-from google.protobuf.json_format import MessageToDict
+from typing import List, Optional
 from meshtastic import mt_config
 from meshtastic.util import camel_to_snake, snake_to_camel, fromStr
 
+from contact.utilities.admin_writes import Progress, collect_admin_messages, run_admin_transaction
+from contact.utilities.control_utils import is_repeated_field
+
 # defs are from meshtastic/python/main
 
 
@@ -89,7 +90,7 @@ def setPref(config, comp_name, raw_val) -> bool:
             return False
 
     # repeating fields need to be handled with append, not setattr
-    if pref.label != pref.LABEL_REPEATED:
+    if not is_repeated_field(pref):
         try:
             if config_type.message_type is not None:
                 config_values = getattr(config_part, config_type.name)
@@ -123,113 +124,117 @@ def setPref(config, comp_name, raw_val) -> bool:
     return True
 
 
-def config_import(interface, filename):
+def config_import(interface, filename, progress: Optional[Progress] = None) -> List[str]:
+    """
+    Write a YAML config to the local node inside one settings transaction. The writes are
+    pipelined and confirmed by ACK, so only the ones that fail are retried. Returns the labels
+    of the writes that could not be applied.
+    """
+    import yaml  # Only needed for config import/export, so kept off the startup path
+
     with open(filename, encoding="utf8") as file:
         configuration = yaml.safe_load(file)
-        closeNow = True
-
-        interface.getNode("^local", False).beginSettingsTransaction()
-
-        if "owner" in configuration:
-            logging.info(f"Setting device owner to {configuration['owner']}")
-            waitForAckNak = True
-            interface.getNode("^local", False).setOwner(configuration["owner"])
-            time.sleep(0.5)
-
-        if "owner_short" in configuration:
-            logging.info(f"Setting device owner short to {configuration['owner_short']}")
-            waitForAckNak = True
-            interface.getNode("^local", False).setOwner(long_name=None, short_name=configuration["owner_short"])
-            time.sleep(0.5)
-
-        if "ownerShort" in configuration:
-            logging.info(f"Setting device owner short to {configuration['ownerShort']}")
-            waitForAckNak = True
-            interface.getNode("^local", False).setOwner(long_name=None, short_name=configuration["ownerShort"])
-            time.sleep(0.5)
-
-        if "channel_url" in configuration:
-            logging.info(f"Setting channel url to {configuration['channel_url']}")
-            interface.getNode("^local").setURL(configuration["channel_url"])
-            time.sleep(0.5)
-
-        if "channelUrl" in configuration:
-            logging.info(f"Setting channel url to {configuration['channelUrl']}")
-            interface.getNode("^local").setURL(configuration["channelUrl"])
-            time.sleep(0.5)
-
-        if "location" in configuration:
-            alt = 0
-            lat = 0.0
-            lon = 0.0
-            localConfig = interface.localNode.localConfig
-
-            if "alt" in configuration["location"]:
-                alt = int(configuration["location"]["alt"] or 0)
-                logging.info(f"Fixing altitude at {alt} meters")
-            if "lat" in configuration["location"]:
-                lat = float(configuration["location"]["lat"] or 0)
-                logging.info(f"Fixing latitude at {lat} degrees")
-            if "lon" in configuration["location"]:
-                lon = float(configuration["location"]["lon"] or 0)
-                logging.info(f"Fixing longitude at {lon} degrees")
-            logging.info("Setting device position")
-            interface.localNode.setFixedPosition(lat, lon, alt)
-            time.sleep(0.5)
-
-        if "config" in configuration:
-            localConfig = interface.getNode("^local").localConfig
-            for section in configuration["config"]:
-                traverseConfig(section, configuration["config"][section], localConfig)
-                interface.getNode("^local").writeConfig(camel_to_snake(section))
-                time.sleep(0.5)
-
-        if "module_config" in configuration:
-            moduleConfig = interface.getNode("^local").moduleConfig
-            for section in configuration["module_config"]:
-                traverseConfig(
-                    section,
-                    configuration["module_config"][section],
-                    moduleConfig,
-                )
-                interface.getNode("^local").writeConfig(camel_to_snake(section))
-                time.sleep(0.5)
-
-        interface.getNode("^local", False).commitSettingsTransaction()
-        logging.info("Writing modified configuration to device")
+
+    failed = apply_configuration(interface, configuration, progress)
+    if failed:
+        logging.error(f"Config import from {filename} could not write: {', '.join(failed)}")
+    return failed
+
+
+def apply_configuration(interface, configuration: dict, progress: Optional[Progress] = None) -> List[str]:
+    """Write a parsed config (as produced by config_snapshot) to the local node, see config_import."""
+    node = interface.getNode("^local", False)
+    writes = []
+
+    def add(label, action, *args, **kwargs):
+        with collect_admin_messages(node) as messages:
+            action(*args, **kwargs)
+        for index, message in enumerate(messages):
+            writes.append((f"{label} {index + 1}/{len(messages)}" if len(messages) > 1 else label, message))
+
+    if "owner" in configuration:
+        logging.info(f"Setting device owner to {configuration['owner']}")
+        add("owner", node.setOwner, configuration["owner"])
+
+    if "owner_short" in configuration:
+        logging.info(f"Setting device owner short to {configuration['owner_short']}")
+        add("owner short", node.setOwner, long_name=None, short_name=configuration["owner_short"])
+
+    if "ownerShort" in configuration:
+        logging.info(f"Setting device owner short to {configuration['ownerShort']}")
+        add("owner short", node.setOwner, long_name=None, short_name=configuration["ownerShort"])
+
+    if "channel_url" in configuration:
+        logging.info(f"Setting channel url to {configuration['channel_url']}")
+        add("channels", node.setURL, configuration["channel_url"])
+
+    if "channelUrl" in configuration:
+        logging.info(f"Setting channel url to {configuration['channelUrl']}")
+        add("channels", node.setURL, configuration["channelUrl"])
+
+    if "location" in configuration:
+        alt = 0
+        lat = 0.0
+        lon = 0.0
+
+        if "alt" in configuration["location"]:
+            alt = int(configuration["location"]["alt"] or 0)
+            logging.info(f"Fixing altitude at {alt} meters")
+        if "lat" in configuration["location"]:
+            lat = float(configuration["location"]["lat"] or 0)
+            logging.info(f"Fixing latitude at {lat} degrees")
+        if "lon" in configuration["location"]:
+            lon = float(configuration["location"]["lon"] or 0)
+            logging.info(f"Fixing longitude at {lon} degrees")
+        logging.info("Setting device position")
+        add("position", node.setFixedPosition, lat, lon, alt)
+
+    if "config" in configuration:
+        localConfig = node.localConfig
+        for section in configuration["config"]:
+            traverseConfig(section, configuration["config"][section], localConfig)
+            add(f"config.{camel_to_snake(section)}", node.writeConfig, camel_to_snake(section))
+
+    if "module_config" in configuration:
+        moduleConfig = node.moduleConfig
+        for section in configuration["module_config"]:
+            traverseConfig(
+                section,
+                configuration["module_config"][section],
+                moduleConfig,
+            )
+            add(f"module_config.{camel_to_snake(section)}", node.writeConfig, camel_to_snake(section))
+
+    logging.info(f"Writing {len(writes)} configuration changes to device")
+    started = time.monotonic()
+    failed = run_admin_transaction(node, writes, progress)
+    if not failed:
+        logging.info(f"Configuration written in {time.monotonic() - started:.1f}s")
+    return failed
 
 
 def config_export(interface) -> str:
     """used in --export-config"""
-    configObj = {}
+    return config_yaml(config_snapshot(interface))
 
-    owner = interface.getLongName()
-    owner_short = interface.getShortName()
-    channel_url = interface.localNode.getURL()
-    myinfo = interface.getMyNodeInfo()
-    pos = myinfo.get("position")
-    lat = None
-    lon = None
-    alt = None
-    if pos:
-        lat = pos.get("latitude")
-        lon = pos.get("longitude")
-        alt = pos.get("altitude")
 
-    if owner:
-        configObj["owner"] = owner
-    if owner_short:
-        configObj["owner_short"] = owner_short
-    if channel_url:
-        if mt_config.camel_case:
-            configObj["channelUrl"] = channel_url
-        else:
-            configObj["channel_url"] = channel_url
-    # lat and lon don't make much sense without the other (so fill with 0s), and alt isn't meaningful without both
-    if lat or lon:
-        configObj["location"] = {"lat": lat or float(0), "lon": lon or float(0)}
-        if alt:
-            configObj["location"]["alt"] = alt
+def config_yaml(configObj: dict) -> str:
+    """A config dictionary (see config_snapshot) as the YAML text written by config_export."""
+    import yaml
+
+    config_txt = "# start of Meshtastic configure yaml\n"  # checkme - "config" (now changed to config_out)
+    # was used as a string here and a Dictionary above
+    config_txt += yaml.dump(configObj)
+
+    # logging.info(config_txt)
+    return config_txt
+
+
+def config_snapshot(interface) -> dict:
+    """The node's owner, channels, position and config as the dictionary config_export writes out."""
+    from google.protobuf.json_format import MessageToDict
+
+    configObj = identity_snapshot(interface)
 
     config = MessageToDict(interface.localNode.localConfig)  # checkme - Used as a dictionary here and a string below
     if config:
@@ -266,9 +271,39 @@ def config_export(interface) -> str:
         else:
             configObj["module_config"] = prefs
 
-    config_txt = "# start of Meshtastic configure yaml\n"  # checkme - "config" (now changed to config_out)
-    # was used as a string here and a Dictionary above
-    config_txt += yaml.dump(configObj)
+    return configObj
 
-    # logging.info(config_txt)
-    return config_txt
+
+def identity_snapshot(interface) -> dict:
+    """The owner, channel URL and position part of config_snapshot, without the config sections."""
+    configObj = {}
+
+    owner = interface.getLongName()
+    owner_short = interface.getShortName()
+    channel_url = interface.localNode.getURL()
+    myinfo = interface.getMyNodeInfo()
+    pos = myinfo.get("position")
+    lat = None
+    lon = None
+    alt = None
+    if pos:
+        lat = pos.get("latitude")
+        lon = pos.get("longitude")
+        alt = pos.get("altitude")
+
+    if owner:
+        configObj["owner"] = owner
+    if owner_short:
+        configObj["owner_short"] = owner_short
+    if channel_url:
+        if mt_config.camel_case:
+            configObj["channelUrl"] = channel_url
+        else:
+            configObj["channel_url"] = channel_url
+    # lat and lon don't make much sense without the other (so fill with 0s), and alt isn't meaningful without both
+    if lat or lon:
+        configObj["location"] = {"lat": lat or float(0), "lon": lon or float(0)}
+        if alt:
+            configObj["location"]["alt"] = alt
+
+    return configObj
@@ -0,0 +1,299 @@
+"""
+Content-addressed store of node config snapshots, kept in a `store` folder under node_configs_file_path:
+
+    objects/ab/cdef....json  one config section as JSON, named by the hash of its content
+    snapshots/<id>.json      section name -> object hash, named by the hash of that mapping
+    index.json               hash of a section's protobuf bytes -> object hash
+    history.jsonl            one line per node whenever its snapshot changes
+
+Identical sections and snapshots are stored once however many nodes or exports share them, and
+a section whose protobuf bytes are already in the index is not converted to a dictionary again,
+so exporting an unchanged node costs one hash per section.
+
+    contact config snapshot TARGET...
+    contact config log [NODE]
+    contact config diff A B
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import contact.ui.default_config as config
+from contact.utilities.config_io import config_snapshot, config_yaml, identity_snapshot
+from contact.utilities.provision import flatten, open_target
+
+SECTION_PREFIXES = ("config", "module_config")
+NODE_SECTION = "node"  # owner, channel URL and position
+
+
+def content_hash(value: Any) -> str:
+    text = json.dumps(value, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def profile_sections(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Split a config dictionary (as from config_snapshot or an exported YAML file) into its sections."""
+    sections = {NODE_SECTION: {key: value for key, value in profile.items() if key not in SECTION_PREFIXES}}
+    for prefix in SECTION_PREFIXES:
+        for name, value in (profile.get(prefix) or {}).items():
+            sections[f"{prefix}.{name}"] = value
+    return sections
+
+
+def assemble(sections: Dict[str, Any]) -> Dict[str, Any]:
+    """The inverse of profile_sections."""
+    profile = dict(sections.get(NODE_SECTION) or {})
+    for name, value in sections.items():
+        prefix, _, key = name.partition(".")
+        if prefix in SECTION_PREFIXES and value is not None:
+            profile.setdefault(prefix, {})[key] = value
+    return profile
+
+
+def node_id(interface) -> str:
+    user = (interface.getMyNodeInfo() or {}).get("user", {})
+    return user.get("id") or f"!{interface.myInfo.my_node_num:08x}"
+
+
+class ConfigStore:
+    def __init__(self, root: Optional[str] = None) -> None:
+        self._root = root
+        self._lock = threading.RLock()
+        self._objects: Dict[str, Any] = {}
+        self._index: Optional[Dict[str, str]] = None
+        self._history: Optional[List[Dict[str, str]]] = None
+        self._exports: Dict[str, str] = {}
+
+    @property
+    def root(self) -> str:
+        # Resolved on use, as node_configs_file_path can change when config.json is loaded
+        return self._root or os.path.join(config.node_configs_file_path, "store")
+
+    def _write(self, path: str, text: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write(text)
+        os.replace(temp_path, path)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], f"{digest[2:]}.json")
+
+    def put(self, value: Any, persist: bool = True) -> str:
+        """Store one section, returning its hash. Content already present is not written again."""
+        digest = content_hash(value)
+        with self._lock:
+            self._objects.setdefault(digest, copy.deepcopy(value))
+            path = self._object_path(digest)
+            if persist and not os.path.exists(path):
+                self._write(path, json.dumps(value, sort_keys=True))
+        return digest
+
+    def get(self, digest: str) -> Any:
+        with self._lock:
+            if digest not in self._objects:
+                with open(self._object_path(digest), encoding="utf-8") as file:
+                    self._objects[digest] = json.load(file)
+            # A copy, so sections with equal content are separate objects (yaml.dump would alias them)
+            return copy.deepcopy(self._objects[digest])
+
+    def index(self) -> Dict[str, str]:
+        if self._index is None:
+            try:
+                with open(os.path.join(self.root, "index.json"), encoding="utf-8") as file:
+                    self._index = json.load(file)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def put_snapshot(self, sections: Dict[str, str]) -> str:
+        snapshot_id = content_hash(sections)
+        path = os.path.join(self.root, "snapshots", f"{snapshot_id}.json")
+        if not os.path.exists(path):
+            self._write(path, json.dumps(sections, sort_keys=True, indent=1))
+        return snapshot_id
+
+    def snapshot_sections(self, snapshot_id: str) -> Dict[str, str]:
+        with open(os.path.join(self.root, "snapshots", f"{snapshot_id}.json"), encoding="utf-8") as file:
+            return json.load(file)
+
+    def capture(self, interface) -> str:
+        """Store the node's current config, returning the snapshot id."""
+        node = interface.localNode
+        section_keys = {}
+        for prefix, container in (("config", node.localConfig), ("module_config", node.moduleConfig)):
+            for field in container.DESCRIPTOR.fields:
+                value = getattr(container, field.name)
+                if field.message_type is not None and container.HasField(field.name):
+                    data = value.SerializeToString(deterministic=True)
+                elif field.message_type is None and value != field.default_value:  # e.g. LocalConfig.version
+                    data = repr(value).encode("utf-8")
+                else:
+                    continue
+                digest = hashlib.sha256(field.full_name.encode("utf-8") + b"\0" + data).hexdigest()
+                section_keys[f"{prefix}.{field.json_name}"] = digest
+
+        with self._lock:
+            index = self.index()
+            missing = [name for name, key in section_keys.items() if key not in index]
+            if missing:
+                # Only sections never seen before go through MessageToDict
+                profile = config_snapshot(interface)
+                for name in missing:
+                    prefix, _, key = name.partition(".")
+                    index[section_keys[name]] = self.put((profile.get(prefix) or {}).get(key))
+                self._write(os.path.join(self.root, "index.json"), json.dumps(index))
+
+            sections = {NODE_SECTION: self.put(identity_snapshot(interface))}
+            for name, key in section_keys.items():
+                if self.get(index[key]) is not None:  # Empty module sections are left out of exports
+                    sections[name] = index[key]
+            return self.put_snapshot(sections)
+
+    def history(self) -> List[Dict[str, str]]:
+        if self._history is None:
+            self._history = []
+            try:
+                with open(os.path.join(self.root, "history.jsonl"), encoding="utf-8") as file:
+                    self._history = [json.loads(line) for line in file if line.strip()]
+            except (OSError, ValueError):
+                pass
+        return self._history
+
+    def node_history(self, node: str) -> List[Dict[str, str]]:
+        return [entry for entry in self.history() if entry["node"] == node]
+
+    def record(self, interface) -> Tuple[str, str, Optional[str]]:
+        """Capture the node's config and add it to the history if it changed. Returns (node, snapshot, previous)."""
+        node = node_id(interface)
+        snapshot_id = self.capture(interface)
+        with self._lock:
+            previous = self.node_history(node)
+            previous_id = previous[-1]["snapshot"] if previous else None
+            if snapshot_id != previous_id:
+                entry = {"time": datetime.now().isoformat(timespec="seconds"), "node": node, "snapshot": snapshot_id}
+                os.makedirs(self.root, exist_ok=True)
+                with open(os.path.join(self.root, "history.jsonl"), "a", encoding="utf-8") as file:
+                    file.write(json.dumps(entry) + "\n")
+                self.history().append(entry)
+        return node, snapshot_id, previous_id
+
+    def export_yaml(self, interface) -> str:
+        """config_export through the store: the YAML is only rebuilt when the snapshot changed."""
+        _, snapshot_id, _ = self.record(interface)
+        with self._lock:
+            if snapshot_id not in self._exports:
+                sections = self.snapshot_sections(snapshot_id)
+                self._exports[snapshot_id] = config_yaml(
+                    assemble({name: self.get(digest) for name, digest in sections.items()})
+                )
+            return self._exports[snapshot_id]
+
+    def resolve(self, ref: str) -> Dict[str, str]:
+        """
+        Section hashes for a snapshot id (or unique prefix), a node id for its latest snapshot,
+        NODE~N for the Nth snapshot before that, or the path of an exported YAML file.
+        """
+        if os.path.isfile(ref):
+            import yaml
+
+            with open(ref, encoding="utf8") as file:
+                profile = yaml.safe_load(file) or {}
+            return {name: self.put(value, persist=False) for name, value in profile_sections(profile).items()}
+
+        node, _, back = ref.partition("~")
+        entries = self.node_history(node)
+        if entries:
+            steps = int(back or 0)
+            if steps >= len(entries):
+                raise ValueError(f"{node} has only {len(entries)} snapshots")
+            return self.snapshot_sections(entries[-1 - steps]["snapshot"])
+
+        snapshot_dir = os.path.join(self.root, "snapshots")
+        names = os.listdir(snapshot_dir) if os.path.isdir(snapshot_dir) else []
+        matches = [name[: -len(".json")] for name in names if name.startswith(ref) and name.endswith(".json")]
+        if len(matches) != 1:
+            raise ValueError(f"{'Ambiguous' if matches else 'Unknown'} snapshot {ref}")
+        return self.snapshot_sections(matches[0])
+
+    def diff(self, old: Dict[str, str], new: Dict[str, str]) -> List[str]:
+        """Changed settings between two sets of section hashes. Sections with equal hashes are not loaded."""
+        changes = []
+        for name in sorted(set(old) | set(new)):
+            if old.get(name) == new.get(name):
+                continue
+            old_flat = flatten(self.get(old[name]) if name in old else {}, name)
+            new_flat = flatten(self.get(new[name]) if name in new else {}, name)
+            for path in sorted(set(old_flat) | set(new_flat)):
+                before = old_flat.get(path, "(unset)")
+                after = new_flat.get(path, "(unset)")
+                if before != after:
+                    changes.append(f"{path}: {before} -> {after}")
+        return changes
+
+
+config_store = ConfigStore()
+
+
+def setup_config_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="contact config", description="Node config snapshots and diffs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    snapshot = commands.add_parser("snapshot", help="Store the current config of one or more nodes.")
+    snapshot.add_argument("targets", nargs="+", help="serial:PORT, tcp:HOST[:PORT], sim:SEED, or a bare port or host.")
+
+    log = commands.add_parser("log", help="List stored snapshots, optionally for one node.")
+    log.add_argument("node", nargs="?", help="Node id, e.g. !1234abcd.")
+
+    diff = commands.add_parser("diff", help="Show the settings that differ between two snapshots.")
+    for name in ("a", "b"):
+        diff.add_argument(name, help="Snapshot id or prefix, node id (latest), NODE~N, or an exported YAML file.")
+    return parser
+
+
+def run_config_command(argv: List[str]) -> int:
+    args = setup_config_parser().parse_args(argv)
+
+    if args.command == "snapshot":
+        status = 0
+        for target in args.targets:
+            interface = None
+            try:
+                interface = open_target(target)
+                node, snapshot_id, previous_id = config_store.record(interface)
+            except Exception as e:
+                print(f"[{target}] error: {e}")
+                status = 1
+                continue
+            finally:
+                if interface is not None:
+                    interface.close()
+            if snapshot_id == previous_id:
+                print(f"[{target}] {node} unchanged at {snapshot_id[:12]}")
+            elif previous_id:
+                changes = config_store.diff(config_store.resolve(previous_id), config_store.resolve(snapshot_id))
+                print(f"[{target}] {node} {previous_id[:12]} -> {snapshot_id[:12]}, {len(changes)} settings changed")
+            else:
+                print(f"[{target}] {node} first snapshot {snapshot_id[:12]}")
+        return status
+
+    if args.command == "log":
+        for entry in config_store.history():
+            if not args.node or entry["node"] == args.node:
+                print(f"{entry['time']}  {entry['node']:<10}  {entry['snapshot'][:12]}")
+        return 0
+
+    try:
+        changes = config_store.diff(config_store.resolve(args.a), config_store.resolve(args.b))
+    except (OSError, ValueError) as e:
+        print(f"contact config diff: {e}")
+        return 2
+    for change in changes:
+        print(change)
+    return 1 if changes else 0
@@ -2,6 +2,13 @@ from typing import Optional, Tuple, Dict, List
 import re
 
 
+def is_repeated_field(field) -> bool:
+    """Whether a protobuf FieldDescriptor is repeated (protobuf 6 replaced .label with .is_repeated)."""
+    if hasattr(field, "is_repeated"):
+        return field.is_repeated
+    return field.label == field.LABEL_REPEATED
+
+
 def parse_ini_file(ini_file_path: str) -> Tuple[Dict[str, str], Dict[str, str]]:
     """Parses an INI file and returns a mapping of keys to human-readable names and help text."""
 
@@ -0,0 +1,315 @@
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+from typing import Any, Dict, List, Optional
+
+from google.protobuf.json_format import ParseDict
+from google.protobuf.message import DecodeError
+from meshtastic.protobuf import mesh_pb2
+from pubsub import pub
+
+import contact.ui.default_config as config
+from contact.message_handlers.chunking import Reassembler, parse_chunk
+from contact.utilities.capture import capture
+from contact.utilities.daemon_interface import daemon_available, recv_frame, send_frame
+from contact.utilities.db_handler import (
+    init_nodedb,
+    is_chat_archived,
+    maybe_store_nodeinfo_in_db,
+    save_message_to_db,
+    update_node_info_in_db,
+)
+from contact.utilities.interfaces import initialize_interface
+from contact.utilities.perf import perf_stats
+from contact.utilities.profiler import profiler
+from contact.utilities.singleton import ui_state, interface_state, app_state
+from contact.utilities.supervisor import ConnectionSupervisor
+from contact.utilities.utils import get_channels, get_nodeNum
+
+
+def strip_raw(value: Any) -> Any:
+    """Copy a node dict without the "raw" protobufs the meshtastic API tucks into it."""
+    if isinstance(value, dict):
+        return {key: strip_raw(item) for key, item in value.items() if key != "raw"}
+    if isinstance(value, list):
+        return [strip_raw(item) for item in value]
+    return value
+
+
+def snapshot_frames(interface: Any, config_id: int) -> List[bytes]:
+    """
+    Build the FromRadio sequence a radio sends in reply to want_config, from the daemon's state.
+    """
+    frames = []
+
+    def add(**fields: Any) -> None:
+        frames.append(mesh_pb2.FromRadio(**fields).SerializeToString())
+
+    if interface.myInfo is not None:
+        add(my_info=interface.myInfo)
+    if interface.metadata is not None:
+        add(metadata=interface.metadata)
+
+    node = interface.localNode
+    for container, config_name in ((node.localConfig, "config"), (node.moduleConfig, "moduleConfig")):
+        for field, value in container.ListFields():
+            section = mesh_pb2.FromRadio()
+            target = getattr(section, config_name)
+            if field.name not in target.DESCRIPTOR.fields_by_name:
+                continue  # e.g. the version counter, which is not a config section
+            getattr(target, field.name).CopyFrom(value)
+            frames.append(section.SerializeToString())
+    for channel in node.channels or []:
+        add(channel=channel)
+
+    for node_dict in list((interface.nodesByNum or {}).values()):
+        try:
+            node_info = ParseDict(strip_raw(node_dict), mesh_pb2.NodeInfo(), ignore_unknown_fields=True)
+        except Exception as e:
+            logging.error(f"Skipping node {node_dict.get('num')} in daemon snapshot: {e}")
+            continue
+        add(node_info=node_info)
+
+    add(config_complete_id=config_id)
+    return frames
+
+
+class DaemonServer:
+    """
+    Shares one radio connection with any number of UIs attached over a Unix socket.
+
+    Attached UIs speak the radio's own ToRadio/FromRadio protocol: want_config is answered from
+    the daemon's state, outgoing packets are queued on the real interface, and everything the
+    radio sends is relayed to every attached UI.
+    """
+
+    # Queue accounting belongs to the daemon's interface, UIs only ever see their own packets fly
+    PRIVATE_VARIANTS = ("queueStatus",)
+
+    def __init__(self, interface: Any, socket_path: str) -> None:
+        self.interface = interface
+        self.socket_path = socket_path
+        self._clients: List[socket.socket] = []
+        self._lock = threading.Lock()
+        self._listener: Optional[socket.socket] = None
+        self._radio_handler = None
+
+    def start(self) -> None:
+        if os.path.exists(self.socket_path):
+            if daemon_available(self.socket_path):
+                raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+            os.remove(self.socket_path)  # Left behind by a daemon that did not shut down cleanly
+
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        listener.listen()
+        self._listener = listener
+
+        # Tee everything the radio sends through to the attached UIs
+        self._radio_handler = self.interface._handleFromRadio
+        self.interface._handleFromRadio = self._handle_from_radio
+
+        threading.Thread(target=self._accept_loop, name="daemon-accept", daemon=True).start()
+        logging.info(f"Daemon listening on {self.socket_path}")
+
+    def switch_interface(self, interface: Any) -> None:
+        """Relay a reconnected radio in place of the one that was lost. Attached UIs stay attached."""
+        self.interface = interface
+        self._radio_handler = interface._handleFromRadio
+        interface._handleFromRadio = self._handle_from_radio
+
+    def close(self) -> None:
+        if self._radio_handler is not None:
+            self.interface._handleFromRadio = self._radio_handler
+            self._radio_handler = None
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+        with self._lock:
+            for client in self._clients:
+                client.close()
+            self._clients.clear()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+    def _handle_from_radio(self, from_radio_bytes: bytes) -> None:
+        self._radio_handler(from_radio_bytes)
+
+        from_radio = mesh_pb2.FromRadio()
+        try:
+            from_radio.ParseFromString(from_radio_bytes)
+        except DecodeError:
+            return
+        if from_radio.WhichOneof("payload_variant") not in self.PRIVATE_VARIANTS:
+            self.broadcast(from_radio_bytes)
+
+    def broadcast(self, payload: bytes) -> None:
+        with self._lock:
+            for client in list(self._clients):
+                try:
+                    send_frame(client, payload)
+                except OSError as e:
+                    logging.info(f"Dropping attached UI: {e}")
+                    self._clients.remove(client)
+                    client.close()
+
+    def _accept_loop(self) -> None:
+        while self._listener is not None:
+            try:
+                client, _ = self._listener.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._serve, args=(client,), name="daemon-client", daemon=True).start()
+
+    def _serve(self, client: socket.socket) -> None:
+        try:
+            while True:
+                frame = recv_frame(client)
+                if frame is None:
+                    break
+
+                to_radio = mesh_pb2.ToRadio()
+                to_radio.ParseFromString(frame)
+                variant = to_radio.WhichOneof("payload_variant")
+
+                if variant == "want_config_id":
+                    self._attach(client, to_radio.want_config_id)
+                elif variant == "disconnect":
+                    break
+                elif variant == "heartbeat":
+                    continue  # The daemon keeps its own heartbeat with the radio
+                else:
+                    self.interface._sendToRadio(to_radio)
+        except (OSError, DecodeError) as e:
+            logging.error(f"Error serving attached UI: {e}")
+        finally:
+            with self._lock:
+                if client in self._clients:
+                    self._clients.remove(client)
+            client.close()
+            logging.info("UI detached")
+
+    def _attach(self, client: socket.socket, config_id: int) -> None:
+        # Hold the broadcast lock so no live packet slips in ahead of config_complete
+        with self._lock:
+            if client in self._clients:
+                self._clients.remove(client)
+            for frame in snapshot_frames(self.interface, config_id):
+                send_frame(client, frame)
+            self._clients.append(client)
+        logging.info(f"UI attached ({len(self._clients)} attached)")
+
+
+def on_daemon_receive(packet: Dict[str, Any], interface: Any) -> None:
+    """Persist received packets to the db while no UI is necessarily running."""
+    capture.record(packet)
+
+    with app_state.lock:
+        try:
+            if "decoded" not in packet:
+                return
+
+            if packet["decoded"]["portnum"] == "NODEINFO_APP":
+                if "user" in packet["decoded"] and "longName" in packet["decoded"]["user"]:
+                    maybe_store_nodeinfo_in_db(packet)
+
+            elif packet["decoded"]["portnum"] == "TEXT_MESSAGE_APP":
+                message_string = packet["decoded"]["payload"].decode("utf-8")
+
+                chunk = parse_chunk(message_string)
+                if chunk:
+                    # One part of a long message, stored once the rest are in as the UI would
+                    message_string = reassembler.add(None, interface_state.myNodeNum, packet, chunk)
+                    if message_string is None:
+                        return
+
+                save_text(packet, message_string)
+
+        except (KeyError, IndexError, UnicodeDecodeError) as e:
+            logging.error(f"Error storing packet: {e}")
+
+
+def save_text(packet: Dict[str, Any], message_string: str) -> None:
+    """Store a received text under the chat it belongs to. Called with app_state.lock held."""
+    if packet["to"] == interface_state.myNodeNum:
+        channel_id = packet["from"]
+        if is_chat_archived(channel_id):
+            update_node_info_in_db(channel_id, chat_archived=False)
+    else:
+        channel_id = ui_state.channel_list[packet.get("channel", 0)]
+
+    save_message_to_db(channel_id, packet["from"], message_string)
+
+
+def on_chunks_timeout(session: Any, packet: Dict[str, Any]) -> None:
+    """Store a long message whose missing parts never came."""
+    with app_state.lock:
+        save_text(packet, packet["decoded"]["payload"].decode("utf-8"))
+
+
+reassembler = Reassembler(on_chunks_timeout)
+
+
+def run_daemon(args: object) -> None:
+    """Run headless: hold the radio connection, store traffic and serve UIs until signalled."""
+    if not hasattr(socket, "AF_UNIX"):
+        print("Daemon mode needs Unix domain sockets, which this platform does not provide.")
+        sys.exit(1)
+
+    socket_path = args.daemon
+
+    logging.info("Initializing interface for daemon...")
+    interface_state.interface = initialize_interface(args)
+    if interface_state.interface is None:
+        print(f"Could not connect to a radio, see {config.log_file_path}")
+        sys.exit(1)
+
+    with app_state.lock:
+        interface_state.myNodeNum = get_nodeNum()
+        ui_state.channel_list = get_channels()
+        init_nodedb()
+    if args.capture:
+        capture.open(args.capture, interface_state.myNodeNum)
+    pub.subscribe(on_daemon_receive, "meshtastic.receive")
+
+    server = DaemonServer(interface_state.interface, socket_path)
+    try:
+        server.start()
+    except (OSError, RuntimeError) as e:
+        print(f"Could not start daemon: {e}")
+        interface_state.interface.close()
+        sys.exit(1)
+
+    print(f"Contact daemon listening on {socket_path}")
+
+    def on_connected(interface: Any) -> None:
+        with app_state.lock:
+            interface_state.interface = interface
+            interface_state.myNodeNum = get_nodeNum()
+            ui_state.channel_list = get_channels()
+            init_nodedb()
+        server.switch_interface(interface)
+
+    # Radio link drops are retried in the background, the socket and attached UIs stay up meanwhile
+    supervisor = ConnectionSupervisor(lambda: initialize_interface(args), on_connected, logging.info)
+    supervisor.watch(interface_state.interface)
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    try:
+        while not stop.wait(1):
+            pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logging.info("Daemon shutting down")
+        supervisor.stop()
+        server.close()
+        capture.close()
+        profiler.stop()
+        perf_stats.log_summary()
+        interface_state.interface.close()
@@ -0,0 +1,112 @@
+import logging
+import socket
+import struct
+import threading
+from typing import Optional
+
+from meshtastic.mesh_interface import MeshInterface
+from meshtastic.protobuf import mesh_pb2
+
+# Every frame on the daemon socket is a 4 byte big-endian length followed by a
+# serialized ToRadio (UI -> daemon) or FromRadio (daemon -> UI) protobuf.
+FRAME_HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE = 1 << 20
+
+
+def send_frame(sock: socket.socket, payload: bytes) -> None:
+    sock.sendall(FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            return None
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+
+def recv_frame(sock: socket.socket) -> Optional[bytes]:
+    """Read one frame, or return None once the other side has closed the socket."""
+    header = recv_exact(sock, FRAME_HEADER.size)
+    if header is None:
+        return None
+    (size,) = FRAME_HEADER.unpack(header)
+    if size > MAX_FRAME_SIZE:
+        raise OSError(f"Frame of {size} bytes exceeds the {MAX_FRAME_SIZE} byte limit")
+    return recv_exact(sock, size)
+
+
+def daemon_available(socket_path: str) -> bool:
+    """True if a contact daemon is accepting connections on `socket_path`."""
+    if not hasattr(socket, "AF_UNIX"):
+        return False
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+class DaemonInterface(MeshInterface):
+    """
+    A MeshInterface backed by a contact daemon instead of a radio.
+
+    The daemon answers want_config with its current view of the node (my info, channels, config
+    and node db) and then relays every FromRadio it receives, so packet decoding, the node db and
+    response handlers all work exactly as they do on a direct connection.
+    """
+
+    def __init__(self, socket_path: str, timeout: int = 300) -> None:
+        self.socket_path = socket_path
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(socket_path)
+        self._write_lock = threading.Lock()
+        self._closing = False
+
+        super().__init__(timeout=timeout)
+
+        self._reader = threading.Thread(target=self._read_loop, name="daemon-reader", daemon=True)
+        self._reader.start()
+        self._startConfig()
+        self._waitConnected()
+
+    def _read_loop(self) -> None:
+        try:
+            while True:
+                frame = recv_frame(self._socket)
+                if frame is None:
+                    break
+                try:
+                    self._handleFromRadio(frame)
+                except Exception as e:
+                    logging.error(f"Error handling frame from daemon: {e}")
+        except OSError as e:
+            if not self._closing:
+                logging.error(f"Lost connection to daemon at {self.socket_path}: {e}")
+
+        if not self._closing:
+            self._disconnected()
+
+    def _sendToRadioImpl(self, toRadio: mesh_pb2.ToRadio) -> None:
+        try:
+            with self._write_lock:
+                send_frame(self._socket, toRadio.SerializeToString())
+        except OSError as e:
+            logging.error(f"Failed to send to daemon at {self.socket_path}: {e}")
+
+    def close(self) -> None:
+        """Detach from the daemon. The daemon and its radio connection keep running."""
+        super().close()
+        self._closing = True
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._socket.close()
+        if self._reader is not threading.current_thread():
+            self._reader.join(timeout=2)
@@ -1,10 +1,12 @@
+import hashlib
 import sqlite3
 import time
 import logging
 from datetime import datetime
-from typing import Optional, Union, Dict
+from typing import Optional, Union, Dict, List, Tuple
 
 from contact.utilities.utils import decimal_to_hex
+from contact.utilities.perf import timed
 import contact.ui.default_config as config
 
 
@@ -18,7 +20,8 @@ def get_table_name(channel: str) -> str:
     return quoted_table_name
 
 
-def save_message_to_db(channel: str, user_id: str, message_text: str) -> Optional[int]:
+@timed
+def save_message_to_db(channel: str, user_id: str, message_text: str, ack_type: Optional[str] = None) -> Optional[int]:
     """Save messages to the database, ensuring the table exists."""
     try:
         quoted_table_name = get_table_name(channel)
@@ -40,7 +43,7 @@ def save_message_to_db(channel: str, user_id: str, message_text: str) -> Optiona
                 INSERT INTO {quoted_table_name} (user_id, message_text, timestamp, ack_type)
                 VALUES (?, ?, ?, ?)
             """
-            db_cursor.execute(insert_query, (user_id, message_text, timestamp, None))
+            db_cursor.execute(insert_query, (user_id, message_text, timestamp, ack_type))
             db_connection.commit()
 
             return timestamp
@@ -133,8 +136,10 @@ def load_messages_from_db() -> None:
                             ack_str = config.ack_implicit_str
                         elif ack_type == "Ack":
                             ack_str = config.ack_str
-                        elif ack_type == "Nak":
+                        elif ack_type in ("Nak", "Expired"):
                             ack_str = config.nak_str
+                        elif ack_type == "Queued":
+                            ack_str = config.queued_str
 
                         if user_id == str(interface_state.myNodeNum):
                             sanitized_message = message.replace("\x00", "")
@@ -160,34 +165,119 @@ def load_messages_from_db() -> None:
         logging.error(f"SQLite error in load_messages_from_db: {e}")
 
 
-def init_nodedb() -> None:
-    """Initialize the node database and update it with nodes from the interface."""
+def load_queued_messages() -> List[Tuple[Union[str, int], int, str]]:
+    """(channel, timestamp, text) of our messages that were queued but never sent, oldest first."""
+    queued = []
+    try:
+        with sqlite3.connect(config.db_file_path) as db_connection:
+            db_cursor = db_connection.cursor()
+            query = "SELECT name FROM sqlite_master WHERE type='table' AND name LIKE ?"
+            db_cursor.execute(query, (f"{str(interface_state.myNodeNum)}_%_messages",))
+            for (table_name,) in db_cursor.fetchall():
+                table_columns = [i[1] for i in db_cursor.execute(f'PRAGMA table_info("{table_name}")')]
+                if "ack_type" not in table_columns:
+                    continue
+
+                channel = table_name.split("_")[1]
+                channel = int(channel) if channel.isdigit() else channel
+                db_cursor.execute(
+                    f'SELECT timestamp, message_text FROM "{table_name}" WHERE ack_type = ? AND user_id = ?',
+                    ("Queued", str(interface_state.myNodeNum)),
+                )
+                queued.extend((channel, timestamp, text) for timestamp, text in db_cursor.fetchall())
+
+    except sqlite3.Error as e:
+        logging.error(f"SQLite error in load_queued_messages: {e}")
+    return sorted(queued, key=lambda row: row[1])
+
+
+def node_row(node: Dict[str, object]) -> Tuple:
+    """The nodedb columns (long_name through public_key) for a node from interface.nodes."""
+    user = node["user"]
+    return (
+        user.get("longName", ""),
+        user.get("shortName", ""),
+        user.get("hwModel", ""),
+        user.get("isLicensed", "0"),
+        user.get("role", "CLIENT"),
+        user.get("publicKey", ""),
+    )
+
+
+def row_hash(values: Tuple) -> str:
+    """Content hash of a node row, so unchanged nodes can be skipped without comparing every column."""
+    return hashlib.sha1("\x1f".join(str(value) for value in values).encode("utf-8")).hexdigest()
+
+
+def init_nodedb() -> Dict[str, float]:
+    """
+    Bring the node database in line with the nodes from the interface. Stored row hashes are
+    compared with the interface's nodes and only new or changed rows are written, in a single
+    transaction. Returns the number of rows inserted, updated and unchanged and the time taken.
+    """
+    stats = {"inserted": 0, "updated": 0, "unchanged": 0, "seconds": 0.0}
+    started = time.perf_counter()
 
     try:
         if not interface_state.interface.nodes:
-            return  # No nodes to initialize
+            return stats  # No nodes to initialize
 
         ensure_node_table_exists()  # Ensure the table exists before insertion
         nodes_snapshot = list(interface_state.interface.nodes.values())
 
-        # Insert or update all nodes
-        for node in nodes_snapshot:
-            update_node_info_in_db(
-                user_id=node["num"],
-                long_name=node["user"].get("longName", ""),
-                short_name=node["user"].get("shortName", ""),
-                hw_model=node["user"].get("hwModel", ""),
-                is_licensed=node["user"].get("isLicensed", "0"),
-                role=node["user"].get("role", "CLIENT"),
-                public_key=node["user"].get("publicKey", ""),
+        with sqlite3.connect(config.db_file_path) as db_connection:
+            db_cursor = db_connection.cursor()
+            table_name = f'"{interface_state.myNodeNum}_nodedb"'
+            ensure_node_columns(db_cursor, table_name)
+
+            stored = dict(db_cursor.execute(f"SELECT user_id, row_hash FROM {table_name}"))
+            inserts = []
+            updates = []
+            for node in nodes_snapshot:
+                if "user" not in node:
+                    continue  # Heard from, but no nodeinfo yet
+                user_id = str(node["num"])
+                values = node_row(node)
+                digest = row_hash(values)
+                if user_id not in stored:
+                    inserts.append((user_id, *values, 0, digest))
+                elif stored[user_id] != digest:
+                    updates.append((*values, digest, user_id))
+                else:
+                    stats["unchanged"] += 1
+                stored[user_id] = digest
+
+            db_cursor.executemany(
+                f"""
+                INSERT INTO {table_name}
+                    (user_id, long_name, short_name, hw_model, is_licensed, role, public_key, chat_archived, row_hash)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                inserts,
+            )
+            db_cursor.executemany(
+                f"""
+                UPDATE {table_name}
+                SET long_name = ?, short_name = ?, hw_model = ?, is_licensed = ?, role = ?, public_key = ?, row_hash = ?
+                WHERE user_id = ?
+                """,
+                updates,
             )
+            db_connection.commit()
 
-        logging.info("Node database initialized successfully.")
+        stats["inserted"] = len(inserts)
+        stats["updated"] = len(updates)
+        stats["seconds"] = time.perf_counter() - started
+        logging.info(
+            f"Node database synced: {stats['inserted']} inserted, {stats['updated']} updated, "
+            f"{stats['unchanged']} unchanged in {stats['seconds'] * 1000:.1f} ms"
+        )
 
     except sqlite3.Error as e:
         logging.error(f"SQLite error in init_nodedb: {e}")
     except Exception as e:
         logging.error(f"Unexpected error in init_nodedb: {e}")
+    return stats
 
 
 def maybe_store_nodeinfo_in_db(packet: Dict[str, object]) -> None:
@@ -227,10 +317,7 @@ def update_node_info_in_db(
             db_cursor = db_connection.cursor()
             table_name = f'"{interface_state.myNodeNum}_nodedb"'  # Quote in case of numeric names
 
-            table_columns = [i[1] for i in db_cursor.execute(f"PRAGMA table_info({table_name})")]
-            if "chat_archived" not in table_columns:
-                update_table_query = f"ALTER TABLE {table_name} ADD COLUMN chat_archived INTEGER"
-                db_cursor.execute(update_table_query)
+            ensure_node_columns(db_cursor, table_name)
 
             # Fetch existing values to preserve unchanged fields
             db_cursor.execute(f"SELECT * FROM {table_name} WHERE user_id = ?", (user_id,))
@@ -245,7 +332,7 @@ def update_node_info_in_db(
                     existing_role,
                     existing_public_key,
                     existing_chat_archived,
-                ) = existing_record[1:]
+                ) = existing_record[1:8]
 
                 long_name = long_name if long_name is not None else existing_long_name
                 short_name = short_name if short_name is not None else existing_short_name
@@ -263,10 +350,13 @@ def update_node_info_in_db(
             public_key = public_key if public_key is not None else ""
             chat_archived = chat_archived if chat_archived is not None else 0
 
+            digest = row_hash((long_name, short_name, hw_model, is_licensed, role, public_key))
+
             # Upsert logic
             upsert_query = f"""
-                INSERT INTO {table_name} (user_id, long_name, short_name, hw_model, is_licensed, role, public_key, chat_archived)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO {table_name}
+                    (user_id, long_name, short_name, hw_model, is_licensed, role, public_key, chat_archived, row_hash)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ON CONFLICT(user_id) DO UPDATE SET
                     long_name = excluded.long_name,
                     short_name = excluded.short_name,
@@ -274,10 +364,12 @@ def update_node_info_in_db(
                     is_licensed = excluded.is_licensed,
                     role = excluded.role,
                     public_key = excluded.public_key,
-                    chat_archived = excluded.chat_archived
+                    chat_archived = excluded.chat_archived,
+                    row_hash = excluded.row_hash
             """
             db_cursor.execute(
-                upsert_query, (user_id, long_name, short_name, hw_model, is_licensed, role, public_key, chat_archived)
+                upsert_query,
+                (user_id, long_name, short_name, hw_model, is_licensed, role, public_key, chat_archived, digest),
             )
             db_connection.commit()
 
@@ -298,11 +390,21 @@ def ensure_node_table_exists() -> None:
         is_licensed TEXT,
         role TEXT,
         public_key TEXT,
-        chat_archived INTEGER
+        chat_archived INTEGER,
+        row_hash TEXT
     """
     ensure_table_exists(table_name, schema)
 
 
+def ensure_node_columns(db_cursor: sqlite3.Cursor, table_name: str) -> None:
+    """Add the columns that node tables created by older versions are missing."""
+    table_columns = [i[1] for i in db_cursor.execute(f"PRAGMA table_info({table_name})")]
+    if "chat_archived" not in table_columns:
+        db_cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN chat_archived INTEGER")
+    if "row_hash" not in table_columns:
+        db_cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN row_hash TEXT")
+
+
 def ensure_table_exists(table_name: str, schema: str) -> None:
     """Ensure the given table exists in the database."""
     try:
@@ -317,6 +419,7 @@ def ensure_table_exists(table_name: str, schema: str) -> None:
         logging.error(f"Unexpected error in ensure_table_exists({table_name}): {e}")
 
 
+@timed
 def get_name_from_database(user_id: int, type: str = "long") -> str:
     """
     Retrieve a user's name (long or short) from the node database.
@@ -371,3 +474,92 @@ def is_chat_archived(user_id: int) -> int:
     except Exception as e:
         logging.error(f"Unexpected error in is_chat_archived: {e}")
         return "Unknown"
+
+
+def save_session_frames(connection: str, frames: List[bytes]) -> None:
+    """Replace the cached session for a connection (see contact.utilities.session_cache)."""
+    try:
+        ensure_table_exists("session_cache", "connection TEXT, seq INTEGER, frame BLOB")
+        with sqlite3.connect(config.db_file_path) as db_connection:
+            db_cursor = db_connection.cursor()
+            db_cursor.execute("DELETE FROM session_cache WHERE connection = ?", (connection,))
+            db_cursor.executemany(
+                "INSERT INTO session_cache (connection, seq, frame) VALUES (?, ?, ?)",
+                [(connection, seq, frame) for seq, frame in enumerate(frames)],
+            )
+            db_connection.commit()
+
+    except sqlite3.Error as e:
+        logging.error(f"SQLite error in save_session_frames: {e}")
+
+
+def load_session_frames(connection: str) -> List[bytes]:
+    """The cached session for a connection, or an empty list if there is none."""
+    try:
+        with sqlite3.connect(config.db_file_path) as db_connection:
+            db_cursor = db_connection.cursor()
+            db_cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='session_cache'")
+            if db_cursor.fetchone() is None:
+                return []
+            db_cursor.execute("SELECT frame FROM session_cache WHERE connection = ? ORDER BY seq", (connection,))
+            return [row[0] for row in db_cursor.fetchall()]
+
+    except sqlite3.Error as e:
+        logging.error(f"SQLite error in load_session_frames: {e}")
+        return []
+
+
+def save_topology_edges(edges: List[Tuple[int, int, Optional[float]]]) -> None:
+    """Store (from, to, snr) links heard by traceroute, keeping the last known SNR of a link heard without one."""
+    try:
+        table_name = f'"{interface_state.myNodeNum}_topology"'
+        schema = "from_node INTEGER, to_node INTEGER, snr REAL, last_heard INTEGER, PRIMARY KEY (from_node, to_node)"
+        ensure_table_exists(table_name, schema)
+        with sqlite3.connect(config.db_file_path) as db_connection:
+            db_cursor = db_connection.cursor()
+            now = int(time.time())
+            db_cursor.executemany(
+                f"""
+                INSERT INTO {table_name} (from_node, to_node, snr, last_heard) VALUES (?, ?, ?, ?)
+                ON CONFLICT (from_node, to_node)
+                DO UPDATE SET snr = COALESCE(excluded.snr, snr), last_heard = excluded.last_heard
+                """,
+                [(from_node, to_node, snr, now) for from_node, to_node, snr in edges],
+            )
+            db_connection.commit()
+
+    except sqlite3.Error as e:
+        logging.error(f"SQLite error in save_topology_edges: {e}")
+
+
+def load_topology_edges() -> List[Tuple[int, int, Optional[float], int]]:
+    """(from, to, snr, last_heard) of every link stored for this radio, most recently heard first."""
+    try:
+        with sqlite3.connect(config.db_file_path) as db_connection:
+            db_cursor = db_connection.cursor()
+            table_name = f"{interface_state.myNodeNum}_topology"
+            db_cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
+            if db_cursor.fetchone() is None:
+                return []
+            db_cursor.execute(
+                f'SELECT from_node, to_node, snr, last_heard FROM "{table_name}" ORDER BY last_heard DESC'
+            )
+            return db_cursor.fetchall()
+
+    except sqlite3.Error as e:
+        logging.error(f"SQLite error in load_topology_edges: {e}")
+        return []
+
+
+def topology_radios() -> List[int]:
+    """Node numbers of the radios with a topology table."""
+    try:
+        with sqlite3.connect(config.db_file_path) as db_connection:
+            db_cursor = db_connection.cursor()
+            db_cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+            names = [row[0][: -len("_topology")] for row in db_cursor.fetchall() if row[0].endswith("_topology")]
+            return [int(name) for name in names if name.isdigit()]
+
+    except sqlite3.Error as e:
+        logging.error(f"SQLite error in topology_radios: {e}")
+        return []
@@ -8,6 +8,7 @@ from contact.ui.colors import get_color
 from contact.ui.nav_utils import move_highlight, draw_arrows, wrap_text
 from contact.ui.dialog import dialog
 from contact.utilities.validation_rules import get_validation_for
+from contact.utilities.sessions import radio_sessions
 from contact.utilities.singleton import menu_state
 
 # Dialogs should be at most 80 cols, but shrink on small terminals
@@ -110,7 +111,8 @@ def get_text_input(prompt: str, selected_config: str, input_type: str) -> Option
             redraw_input_win()
 
         try:
-            key = input_win.get_wch()
+            with radio_sessions.waiting():
+                key = input_win.get_wch()
         except curses.error:
             continue
 
@@ -295,7 +297,8 @@ def get_admin_key_input(current_value: List[bytes]) -> Optional[List[str]]:
             admin_key_win.addstr(7, 2, invalid_input, get_color("settings_default", bold=True))
 
         admin_key_win.refresh()
-        key = admin_key_win.getch()
+        with radio_sessions.waiting():
+            key = admin_key_win.getch()
 
         if key == 27 or key == curses.KEY_LEFT:  # Escape or Left Arrow -> Cancel and return original
             admin_key_win.erase()
@@ -378,7 +381,8 @@ def get_repeated_input(current_value: List[str]) -> Optional[str]:
         redraw()
 
         try:
-            key = repeated_win.get_wch()
+            with radio_sessions.waiting():
+                key = repeated_win.get_wch()
         except curses.error:
             continue  # ignore timeout or input issues
 
@@ -447,7 +451,8 @@ def get_fixed32_input(current_value: int) -> int:
         redraw()
 
         try:
-            key = fixed32_win.get_wch()
+            with radio_sessions.waiting():
+                key = fixed32_win.get_wch()
         except curses.error:
             continue  # ignore timeout
 
@@ -545,7 +550,8 @@ def get_list_input(
             redraw_list_ui()
 
         try:
-            key = list_win.getch()
+            with radio_sessions.waiting():
+                key = list_win.getch()
         except curses.error:
             continue
 
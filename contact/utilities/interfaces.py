@@ -1,9 +1,39 @@
 import logging
 import meshtastic.serial_interface, meshtastic.tcp_interface, meshtastic.ble_interface
 
+import contact.ui.default_config as config
+from contact.utilities.capture import capture_node_num
+from contact.utilities.daemon_interface import DaemonInterface, daemon_available
+from contact.utilities.sim_interface import SimInterface
+
 
 def initialize_interface(args):
     try:
+        if getattr(args, "replay", None):
+            # An empty simulated node on the capture's node number, the packets come from the replay
+            return SimInterface(rate=0, node_count=0, my_node_num=capture_node_num(args.replay))
+
+        if getattr(args, "sim", False):
+            return SimInterface(
+                rate=args.sim_rate,
+                node_count=args.sim_nodes,
+                port_mix=args.sim_mix,
+                seed=args.sim_seed,
+                trace_file=args.sim_trace,
+            )
+
+        attach = getattr(args, "attach", None)
+        if attach is None and not getattr(args, "daemon", None) and not (args.ble or args.host or args.port):
+            # With no connection arguments, share the radio of a running daemon if there is one
+            if daemon_available(config.daemon_socket_path):
+                attach = config.daemon_socket_path
+
+        if attach:
+            try:
+                return DaemonInterface(attach)
+            except Exception as ex:
+                logging.error(f"Error attaching to daemon at {attach}. {ex}")
+                return None
 
         if args.ble:
             return meshtastic.ble_interface.BLEInterface(args.ble if args.ble != "any" else None)
@@ -0,0 +1,280 @@
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from contact.utilities.utils import decimal_to_hex
+
+# Filter tokens look like `hops:<=2`, `role:ROUTER`, `heard:<1h`, `hw:heltec` or `fav:yes`
+FILTER_TOKEN = re.compile(r"^(hops|role|heard|hw|fav):(.+)$", re.IGNORECASE)
+COMPARISON = re.compile(r"^(<=|>=|!=|<|>|=)?\s*(\d+(?:\.\d+)?)\s*([a-z]*)$", re.IGNORECASE)
+
+DURATION_UNITS = {"": 1, "s": 1, "m": 60, "min": 60, "h": 3600, "d": 86400, "w": 604800}
+
+# How much a match in each column counts towards the final rank
+FIELD_WEIGHTS = {
+    "long_name": 1.0,
+    "short_name": 1.0,
+    "hex_id": 0.9,
+    "hw_model": 0.6,
+    "role": 0.5,
+}
+
+OPERATORS: Dict[str, Callable[[float, float], bool]] = {
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "=": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+}
+
+
+def fuzzy_score(query: str, candidate: str) -> float:
+    """
+    Score how well a casefolded query matches a casefolded candidate.
+
+    Exact and prefix matches rank highest, then substrings, then in-order subsequences
+    with a penalty for gaps. Returns 0 when the query does not match at all.
+    """
+    if not query or not candidate:
+        return 0.0
+    if candidate == query:
+        return 100.0
+    if candidate.startswith(query):
+        return 90.0 - min(len(candidate) - len(query), 10) * 0.5
+
+    position = candidate.find(query)
+    if position != -1:
+        # Matches that start on a word boundary read as "prefix of a word"
+        boundary = not candidate[position - 1].isalnum()
+        return (75.0 if boundary else 60.0) - min(position, 20) * 0.5
+
+    # Subsequence match, e.g. "hlt" -> "heltec"
+    score = 40.0
+    index = 0
+    last_match = -1
+    for char in query:
+        index = candidate.find(char, index)
+        if index == -1:
+            return 0.0
+        if last_match != -1:
+            score -= min(index - last_match - 1, 5)
+        last_match = index
+        index += 1
+    return max(score, 1.0)
+
+
+def parse_duration(text: str) -> Optional[int]:
+    """Convert `90`, `15m`, `1h`, `2d` style durations to seconds."""
+    match = COMPARISON.match(text)
+    if not match or match.group(1):
+        return None
+    unit = match.group(3).lower()
+    if unit not in DURATION_UNITS:
+        return None
+    return int(float(match.group(2)) * DURATION_UNITS[unit])
+
+
+def parse_query(query: str) -> Tuple[str, List[Tuple[str, str, Any]]]:
+    """
+    Split a finder query into free text and filter tokens.
+
+    Tokens that look like filters but don't parse are kept as free text,
+    so a typo never silently hides every node.
+    """
+    text_parts = []
+    filters = []
+
+    for token in query.split():
+        match = FILTER_TOKEN.match(token)
+        if not match:
+            text_parts.append(token)
+            continue
+
+        key, value = match.group(1).lower(), match.group(2)
+
+        if key in ("hops", "heard"):
+            comparison = COMPARISON.match(value)
+            if not comparison:
+                text_parts.append(token)
+                continue
+            operator = comparison.group(1) or ("<=" if key == "heard" else "=")
+            if key == "hops":
+                if comparison.group(3):
+                    text_parts.append(token)
+                    continue
+                filters.append((key, operator, float(comparison.group(2))))
+            else:
+                seconds = parse_duration(comparison.group(2) + comparison.group(3))
+                if seconds is None:
+                    text_parts.append(token)
+                    continue
+                filters.append((key, operator, seconds))
+
+        elif key == "role":
+            filters.append((key, "in", {role.upper() for role in value.split(",") if role}))
+
+        elif key == "hw":
+            filters.append((key, "contains", value.casefold()))
+
+        elif key == "fav":
+            filters.append((key, "=", value.lower() in ("1", "y", "yes", "true")))
+
+    return " ".join(text_parts).casefold(), filters
+
+
+class NodeIndex:
+    """
+    Columnar snapshot of the node attributes the finder searches over.
+
+    Each attribute lives in its own list so filters and scoring walk flat arrays instead of
+    nested node dicts. `refresh` only rewrites the rows whose source node changed.
+    """
+
+    def __init__(self) -> None:
+        self.nums: List[int] = []
+        self.long_names: List[str] = []
+        self.short_names: List[str] = []
+        self.hex_ids: List[str] = []
+        self.hw_models: List[str] = []
+        self.roles: List[str] = []
+        self.hops: List[Optional[int]] = []
+        self.last_heard: List[int] = []
+        self.favorites: List[bool] = []
+
+        self._rows: Dict[int, int] = {}  # node num -> row
+        self._signatures: List[Tuple[Any, ...]] = []
+
+    def __len__(self) -> int:
+        return len(self.nums)
+
+    @staticmethod
+    def _signature(node: Dict[str, Any]) -> Tuple[Any, ...]:
+        user = node.get("user") or {}
+        return (
+            user.get("longName"),
+            user.get("shortName"),
+            user.get("hwModel"),
+            user.get("role"),
+            node.get("hopsAway"),
+            node.get("lastHeard"),
+            node.get("isFavorite"),
+        )
+
+    def _write_row(self, row: int, num: int, signature: Tuple[Any, ...]) -> None:
+        long_name, short_name, hw_model, role, hops, last_heard, favorite = signature
+        self.long_names[row] = (long_name or "").casefold()
+        self.short_names[row] = (short_name or "").casefold()
+        self.hex_ids[row] = decimal_to_hex(num)
+        self.hw_models[row] = (hw_model or "").casefold()
+        self.roles[row] = (role or "CLIENT").upper()
+        self.hops[row] = hops if isinstance(hops, int) else None
+        self.last_heard[row] = last_heard if isinstance(last_heard, int) else 0
+        self.favorites[row] = bool(favorite)
+        self._signatures[row] = signature
+
+    def _append_row(self, num: int, signature: Tuple[Any, ...]) -> None:
+        self._rows[num] = len(self.nums)
+        self.nums.append(num)
+        for column in self._columns():
+            column.append(None)
+        self._signatures.append(None)
+        self._write_row(self._rows[num], num, signature)
+
+    def _remove_row(self, num: int) -> None:
+        # Swap the last row into the hole so removal stays O(1)
+        row = self._rows.pop(num)
+        last = len(self.nums) - 1
+        columns = [self.nums, self._signatures] + self._columns()
+        if row != last:
+            for column in columns:
+                column[row] = column[last]
+            self._rows[self.nums[row]] = row
+        for column in columns:
+            column.pop()
+
+    def _columns(self) -> List[List[Any]]:
+        return [
+            self.long_names,
+            self.short_names,
+            self.hex_ids,
+            self.hw_models,
+            self.roles,
+            self.hops,
+            self.last_heard,
+            self.favorites,
+        ]
+
+    def refresh(self, nodes_by_num: Dict[int, Dict[str, Any]]) -> int:
+        """Bring the snapshot in line with `interface.nodesByNum`. Returns the number of rows touched."""
+        touched = 0
+
+        for num, node in list(nodes_by_num.items()):
+            signature = self._signature(node)
+            row = self._rows.get(num)
+            if row is None:
+                self._append_row(num, signature)
+                touched += 1
+            elif self._signatures[row] != signature:
+                self._write_row(row, num, signature)
+                touched += 1
+
+        if len(self.nums) > len(nodes_by_num):
+            for num in [num for num in self._rows if num not in nodes_by_num]:
+                self._remove_row(num)
+                touched += 1
+
+        return touched
+
+    def _passes(self, row: int, filters: List[Tuple[str, str, Any]], now: int) -> bool:
+        for key, operator, value in filters:
+            if key == "hops":
+                hops = self.hops[row]
+                if hops is None or not OPERATORS[operator](hops, value):
+                    return False
+            elif key == "heard":
+                if not self.last_heard[row] or not OPERATORS[operator](now - self.last_heard[row], value):
+                    return False
+            elif key == "role":
+                if self.roles[row] not in value:
+                    return False
+            elif key == "hw":
+                if value not in self.hw_models[row]:
+                    return False
+            elif key == "fav":
+                if self.favorites[row] != value:
+                    return False
+        return True
+
+    def search(self, query: str, now: Optional[int] = None, limit: Optional[int] = None) -> List[int]:
+        """Return node numbers matching the query, best match first."""
+        text, filters = parse_query(query)
+        now = int(time.time()) if now is None else now
+
+        ranked = []
+        for row in range(len(self.nums)):
+            if filters and not self._passes(row, filters, now):
+                continue
+
+            if text:
+                score = max(
+                    fuzzy_score(text, self.long_names[row]) * FIELD_WEIGHTS["long_name"],
+                    fuzzy_score(text, self.short_names[row]) * FIELD_WEIGHTS["short_name"],
+                    fuzzy_score(text, self.hex_ids[row]) * FIELD_WEIGHTS["hex_id"],
+                    fuzzy_score(text, self.hw_models[row]) * FIELD_WEIGHTS["hw_model"],
+                    fuzzy_score(text, self.roles[row].casefold()) * FIELD_WEIGHTS["role"],
+                )
+                if score <= 0:
+                    continue
+            else:
+                score = 0.0
+
+            # Ties go to the most recently heard node
+            ranked.append((-score, -self.last_heard[row], self.nums[row]))
+
+        ranked.sort()
+        results = [num for _, _, num in ranked]
+        return results[:limit] if limit else results
+
+
+node_index = NodeIndex()
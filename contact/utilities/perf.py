@@ -0,0 +1,124 @@
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+# Latency histogram buckets are powers of two in microseconds: <1us, <2us, <4us ... up to ~8s
+BUCKETS = 24
+
+
+class Stat:
+    """Call count, total/max time and a log2 latency histogram for one instrumented function."""
+
+    __slots__ = ("count", "total_ns", "max_ns", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * BUCKETS
+
+    def add(self, elapsed_ns: int) -> None:
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.buckets[min(BUCKETS - 1, (elapsed_ns // 1000).bit_length())] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound in milliseconds of the bucket holding the given fraction of calls."""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= target:
+                return min((1 << index) / 1000, self.max_ns / 1e6)
+        return self.max_ns / 1e6
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ns / self.count / 1e6 if self.count else 0.0
+
+
+class PerfStats:
+    """Aggregated timings for the hot paths, shown by the Ctrl+K overlay and logged on exit."""
+
+    def __init__(self) -> None:
+        self.stats: Dict[str, Stat] = {}
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, name: str, elapsed_ns: int) -> None:
+        with self._lock:
+            stat = self.stats.get(name)
+            if stat is None:
+                stat = self.stats[name] = Stat()
+            stat.add(elapsed_ns)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stats.clear()
+            self.started = time.monotonic()
+
+    def summary(self) -> List[Tuple[str, Stat]]:
+        """Instrumented functions, most total time first."""
+        with self._lock:
+            return sorted(self.stats.items(), key=lambda item: item[1].total_ns, reverse=True)
+
+    def format_stat(self, name: str, stat: Stat) -> str:
+        return f"{name} {stat.count}x p50 {stat.percentile(0.5):.2f} p99 {stat.percentile(0.99):.2f}ms"
+
+    def overlay_text(self, width: int) -> str:
+        """One line of the heaviest functions, as many as fit in `width` columns."""
+        text = ""
+        for name, stat in self.summary():
+            part = self.format_stat(name, stat)
+            candidate = f"{text} | {part}" if text else part
+            if len(candidate) > width:
+                break
+            text = candidate
+        return text or "No timings recorded yet"
+
+    def log_summary(self) -> None:
+        summary = self.summary()
+        if not summary:
+            return
+        elapsed = time.monotonic() - self.started
+        logging.info(f"Performance summary over {elapsed:.0f}s:")
+        for name, stat in summary:
+            logging.info(
+                f"  {name}: {stat.count} calls, total {stat.total_ns / 1e9:.3f}s, mean {stat.mean_ms:.3f}ms, "
+                f"p50 {stat.percentile(0.5):.3f}ms, p99 {stat.percentile(0.99):.3f}ms, max {stat.max_ns / 1e6:.3f}ms"
+            )
+
+
+perf_stats = PerfStats()
+
+
+def timed(func: Callable) -> Callable:
+    """Decorator recording the run time of every call to `func` in perf_stats."""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            perf_stats.record(name, time.perf_counter_ns() - start)
+
+    return wrapper
+
+
+@contextmanager
+def timer(name: str) -> Iterator[None]:
+    """Context manager recording the run time of a block in perf_stats."""
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        perf_stats.record(name, time.perf_counter_ns() - start)
@@ -0,0 +1,113 @@
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Optional
+
+import contact.ui.default_config as config
+
+SAMPLE_INTERVAL = 0.005  # seconds between samples while profiling
+MAX_DEPTH = 128
+
+
+def frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse_stack(thread_name: str, frame: Optional[FrameType]) -> str:
+    """Render a thread's stack root-first in the collapsed format used by flamegraph tools."""
+    labels = []
+    while frame is not None and len(labels) < MAX_DEPTH:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    labels.append(thread_name)
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of every thread from a background thread while running, including the
+    meshtastic reader and pubsub publishing threads. Nothing runs while it is stopped.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL) -> None:
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._started = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self.samples = Counter()
+        self.sample_count = 0
+        self._stop.clear()
+        self._started = time.time()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        logging.info(f"Sampling profiler started ({self.interval * 1000:.0f}ms interval)")
+
+    def stop(self) -> Optional[str]:
+        """Stop sampling and write the collapsed stacks; returns the output path."""
+        if not self.running:
+            return None
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        return self.write()
+
+    def toggle(self) -> Optional[str]:
+        if self.running:
+            return self.stop()
+        self.start()
+        return None
+
+    def output_path(self) -> str:
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self._started))
+        return os.path.join(os.path.dirname(config.log_file_path), f"profile-{stamp}.folded")
+
+    def write(self) -> Optional[str]:
+        path = self.output_path()
+        try:
+            with open(path, "w", encoding="utf-8") as profile_file:
+                for stack, count in self.samples.most_common():
+                    profile_file.write(f"{stack} {count}\n")
+        except OSError as e:
+            logging.error(f"Could not write profile to {path}: {e}")
+            return None
+        logging.info(f"Sampling profiler wrote {self.sample_count} samples to {path}")
+        return path
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                self.samples[collapse_stack(names.get(thread_id, f"thread-{thread_id}"), frame)] += 1
+            self.sample_count += 1
+
+
+profiler = SamplingProfiler()
+
+
+def install_signal_toggle() -> None:
+    """Toggle the profiler on SIGUSR1 where the platform has it. Must be called from the main thread."""
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, handle_sigusr1)
+
+
+def handle_sigusr1(signum: int, frame: Optional[FrameType]) -> None:
+    profiler.toggle()
@@ -0,0 +1,210 @@
+"""
+contact provision: push one YAML profile (as written by Export Config File) to many nodes at once.
+
+    contact provision profile.yaml /dev/ttyUSB0 /dev/ttyUSB1 tcp:192.168.1.20
+"""
+
+import argparse
+import copy
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import meshtastic.serial_interface
+import meshtastic.tcp_interface
+
+from contact.utilities.config_io import apply_configuration, config_snapshot
+from contact.utilities.sim_interface import SimInterface
+
+# Settings that belong to one node rather than the fleet, left out unless --include-identity is given
+IDENTITY_KEYS = ["owner", "owner_short", "ownerShort", "location", "config.security"]
+
+_print_lock = threading.Lock()
+
+
+@dataclass
+class ProvisionResult:
+    target: str
+    status: str = "pending"  # updated, unchanged, failed, error or dry-run
+    changes: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    error: str = ""
+    seconds: float = 0.0
+
+
+def report(target: str, message: str) -> None:
+    with _print_lock:
+        print(f"[{target}] {message}", flush=True)
+
+
+def open_target(target: str) -> Any:
+    """
+    Connect to serial:PORT, tcp:HOST[:PORT], ble:ADDRESS or sim:SEED. Bare targets are ports if they
+    look like one, else hosts.
+    """
+    kind, _, value = target.partition(":")
+    if kind == "sim":
+        return SimInterface(rate=0, node_count=0, seed=int(value or 0))
+    if kind == "ble":
+        from meshtastic.ble_interface import BLEInterface  # bleak is slow to import and only needed here
+
+        return BLEInterface(value or None)
+    if kind == "tcp":
+        hostname, _, port = value.partition(":")
+        return meshtastic.tcp_interface.TCPInterface(
+            hostname, portNumber=int(port or meshtastic.tcp_interface.DEFAULT_TCP_PORT)
+        )
+    if kind == "serial":
+        return meshtastic.serial_interface.SerialInterface(value)
+    if target.startswith("/") or target.upper().startswith("COM"):
+        return meshtastic.serial_interface.SerialInterface(target)
+    return open_target(f"tcp:{target}")
+
+
+def strip_identity(profile: Dict[str, Any]) -> Dict[str, Any]:
+    profile = copy.deepcopy(profile)
+    for key in IDENTITY_KEYS:
+        section, _, name = key.partition(".")
+        if name:
+            profile.get(section, {}).pop(name, None)
+        else:
+            profile.pop(section, None)
+    return profile
+
+
+def flatten(value: Any, prefix: str = "") -> Dict[str, Any]:
+    """Dotted paths to leaf values, so two configs can be compared setting by setting."""
+    if not isinstance(value, dict):
+        return {prefix: value}
+    flat = {}
+    for key, item in value.items():
+        flat.update(flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+    return flat
+
+
+def config_changes(profile: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """Human-readable list of the settings in `profile` that differ from `current`."""
+    current_flat = flatten(current)
+    changes = []
+    for path, value in flatten(profile).items():
+        old = current_flat.get(path, "(unset)")
+        if old != value:
+            changes.append(f"{path}: {old} -> {value}")
+    return changes
+
+
+def minimal_profile(profile: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """The profile reduced to the top-level keys and config sections that differ from `current`."""
+    changed = {}
+    for key, value in profile.items():
+        if key in ("config", "module_config") and isinstance(value, dict):
+            current_sections = current.get(key, {})
+            sections = {
+                name: section for name, section in value.items() if config_changes({name: section}, current_sections)
+            }
+            if sections:
+                changed[key] = sections
+        elif config_changes({key: value}, current):
+            changed[key] = value
+    return changed
+
+
+def provision_node(
+    target: str,
+    profile: Dict[str, Any],
+    dry_run: bool = False,
+    connect: Callable[[str], Any] = open_target,
+) -> ProvisionResult:
+    result = ProvisionResult(target)
+    started = time.monotonic()
+    interface = None
+    try:
+        report(target, "connecting")
+        interface = connect(target)
+        current = config_snapshot(interface)
+        result.changes = config_changes(profile, current)
+
+        if not result.changes:
+            result.status = "unchanged"
+            report(target, "already matches the profile")
+            return result
+
+        for change in result.changes:
+            report(target, change)
+        if dry_run:
+            result.status = "dry-run"
+            return result
+
+        def progress(done: int, total: int, label: str) -> None:
+            report(target, f"{done}/{total} {label}")
+
+        result.failed = apply_configuration(interface, minimal_profile(profile, current), progress)
+        result.status = "failed" if result.failed else "updated"
+    except Exception as e:
+        logging.error(f"Provisioning {target} failed: {e}")
+        result.status = "error"
+        result.error = str(e)
+        report(target, f"error: {e}")
+    finally:
+        if interface is not None:
+            interface.close()
+        result.seconds = time.monotonic() - started
+    return result
+
+
+def provision(
+    profile: Dict[str, Any],
+    targets: List[str],
+    workers: int,
+    dry_run: bool = False,
+    connect: Callable[[str], Any] = open_target,
+) -> List[ProvisionResult]:
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(targets)))) as pool:
+        return list(pool.map(lambda target: provision_node(target, profile, dry_run, connect), targets))
+
+
+def print_summary(results: List[ProvisionResult]) -> None:
+    width = max([len(result.target) for result in results] + [6])
+    print()
+    print(f"{'Target':<{width}}  {'Status':<9}  {'Changes':>7}  {'Time':>6}  Notes")
+    for result in results:
+        notes = result.error or ", ".join(result.failed)
+        changes = len(result.changes)
+        print(f"{result.target:<{width}}  {result.status:<9}  {changes:>7}  {result.seconds:5.1f}s  {notes}")
+
+
+def setup_provision_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="contact provision", description="Apply a YAML config profile to several nodes at once."
+    )
+    parser.add_argument("profile", help="YAML profile, e.g. a file saved with Export Config File.")
+    parser.add_argument(
+        "targets",
+        nargs="+",
+        help="Nodes to configure: serial:PORT, tcp:HOST[:PORT], sim:SEED for a simulated node, or a bare port or host.",
+    )
+    parser.add_argument("--workers", type=int, default=8, help="Nodes configured concurrently (default: 8).")
+    parser.add_argument("--dry-run", action="store_true", help="Only show what would change on each node.")
+    parser.add_argument(
+        "--include-identity",
+        action="store_true",
+        help="Also apply owner names, fixed position and security keys from the profile.",
+    )
+    return parser
+
+
+def run_provision(argv: List[str], connect: Optional[Callable[[str], Any]] = None) -> int:
+    import yaml
+
+    args = setup_provision_parser().parse_args(argv)
+    with open(args.profile, encoding="utf8") as profile_file:
+        profile = yaml.safe_load(profile_file) or {}
+    if not args.include_identity:
+        profile = strip_identity(profile)
+
+    results = provision(profile, args.targets, args.workers, args.dry_run, connect or open_target)
+    print_summary(results)
+    return 0 if all(result.status in ("updated", "unchanged", "dry-run") for result in results) else 1
@@ -2,163 +2,309 @@ from meshtastic.protobuf import channel_pb2
 from google.protobuf.message import Message
 import logging
 import base64
-import time
+from typing import Any, Dict, List, Optional, Tuple
 
+from contact.utilities.admin_writes import ADMIN_WINDOW, collect_admin_messages, run_admin_transaction
 
-def save_changes(interface, modified_settings, menu_state):
+POSITION_FIELDS = ("latitude", "longitude", "altitude")
+
+
+def apply_settings(section: Message, settings: Dict[str, Any], config_category: str) -> None:
+    """Set edited menu values on a config section."""
+    for config_item, new_value in settings.items():
+        # Check if the config_item exists in the subcategory
+        if not hasattr(section, config_item):
+            logging.warning(f"Config item '{config_item}' not found in config category '{config_category}'.")
+            continue
+
+        field = getattr(section, config_item)
+        try:
+            if isinstance(field, (int, float, str, bool)):  # Direct field types
+                setattr(section, config_item, new_value)
+                logging.info(f"Updated {config_category}.{config_item} to {new_value}")
+            elif isinstance(field, Message):  # Handle protobuf sub-messages
+                if isinstance(new_value, dict):  # If new_value is a dictionary
+                    for sub_field, sub_value in new_value.items():
+                        if hasattr(field, sub_field):
+                            setattr(field, sub_field, sub_value)
+                            logging.info(f"Updated {config_category}.{config_item}.{sub_field} to {sub_value}")
+                        else:
+                            logging.warning(f"Sub-field '{sub_field}' not found in {config_category}.{config_item}")
+                else:
+                    logging.warning(f"Invalid value for {config_category}.{config_item}. Expected dict.")
+            else:
+                logging.warning(f"Unsupported field type for {config_category}.{config_item}.")
+        except (AttributeError, TypeError, ValueError) as e:
+            logging.error(f"Failed to update {config_category}.{config_item}: {e}")
+
+
+def config_section(node, config_category: str) -> Optional[Message]:
+    for container in (node.localConfig, node.moduleConfig):
+        if config_category in container.DESCRIPTOR.fields_by_name:
+            return getattr(container, config_category)
+    return None
+
+
+def config_writes(node, changes: Dict[str, Dict[str, Any]]) -> List[Tuple[str, Message]]:
     """
-    Save changes to the device based on modified settings.
-    :param interface: Meshtastic interface instance
-    :param menu_path: Current menu path
-    :param modified_settings: Dictionary of modified settings
+    Admin writes for edited config categories ({category: {field: value}}). Each category is
+    compared with the node's cached config after applying the edits and skipped if nothing changed.
+    The edited section stays in the cache for the writes built after it, see save_changes.
     """
-    try:
-        if not modified_settings:
-            logging.info("No changes to save. modified_settings is empty.")
-            return
+    writes = []
+    for config_category, settings in changes.items():
+        section = config_section(node, config_category)
+        if section is None:
+            logging.warning(f"Config category '{config_category}' not found in config.")
+            continue
 
-        node = interface.getNode("^local")
-        admin_key_backup = None
-        if "admin_key" in modified_settings:
-            # Get reference to security config
-            security_config = node.localConfig.security
-            admin_keys = modified_settings["admin_key"]
+        updated = type(section)()
+        updated.CopyFrom(section)
+        apply_settings(updated, settings, config_category)
+        if updated == section:
+            logging.info(f"No changes to {config_category}, nothing to write")
+            continue
 
-            # Filter out empty keys
-            valid_keys = [key for key in admin_keys if key and key.strip() and key != b""]
+        section.CopyFrom(updated)
+        with collect_admin_messages(node) as messages:
+            node.writeConfig(config_category)
+        writes.extend((config_category, message) for message in messages)
+    return writes
 
-            if not valid_keys:
-                logging.warning("No valid admin keys provided. Skipping admin key update.")
-            else:
-                # Clear existing keys if needed
-                if security_config.admin_key:
-                    logging.info("Clearing existing admin keys...")
-                    del security_config.admin_key[:]
-                    node.writeConfig("security")
-                    time.sleep(2)  # Give time for device to process
-
-                # Append new keys
-                for key in valid_keys:
-                    logging.info(f"Adding admin key: {key}")
-                    security_config.admin_key.append(key)
-                node.writeConfig("security")
-                logging.info("Admin keys updated successfully!")
-
-            # Backup 'admin_key' before removing it
-            admin_key_backup = modified_settings.get("admin_key", None)
-            # Remove 'admin_key' from modified_settings to prevent interference
-            del modified_settings["admin_key"]
-
-            # Return early if there are no other settings left to process
-            if not modified_settings:
-                return
-
-        if menu_state.menu_path[1] == "Radio Settings" or menu_state.menu_path[1] == "Module Settings":
-            config_category = menu_state.menu_path[2].lower()  # for radio and module configs
-
-            if {"latitude", "longitude", "altitude"} & modified_settings.keys():
-                lat = float(modified_settings.get("latitude", 0.0))
-                lon = float(modified_settings.get("longitude", 0.0))
-                alt = int(modified_settings.get("altitude", 0))
-
-                interface.localNode.setFixedPosition(lat, lon, alt)
-                logging.info(f"Updated {config_category} with Latitude: {lat} and Longitude {lon} and Altitude {alt}")
-                return
-
-        elif menu_state.menu_path[1] == "User Settings":  # for user configs
-            config_category = "User Settings"
-            long_name = modified_settings.get("longName")
-            short_name = modified_settings.get("shortName")
-            is_licensed = modified_settings.get("isLicensed")
-            is_licensed = is_licensed == "True" or is_licensed is True  # Normalize boolean
-
-            node.setOwner(long_name, short_name, is_licensed)
-
-            logging.info(
-                f"Updated {config_category} with Long Name: {long_name}, Short Name: {short_name}, Licensed Mode: {is_licensed}"
-            )
-
-            return
-
-        elif menu_state.menu_path[1] == "Channels":  # for channel configs
-            config_category = "Channels"
-
-            try:
-                channel = menu_state.menu_path[-1]
-                channel_num = int(channel.split()[-1]) - 1
-            except (IndexError, ValueError) as e:
-                channel_num = None
-
-            channel = node.channels[channel_num]
-            for key, value in modified_settings.items():
-                if key == "psk":  # Special case: decode Base64 for psk
-                    channel.settings.psk = base64.b64decode(value)
-                elif key == "position_precision":  # Special case: module_settings
-                    channel.settings.module_settings.position_precision = value
-                else:
-                    setattr(channel.settings, key, value)  # Use setattr for other fields
 
-            if channel_num == 0:
-                channel.role = channel_pb2.Channel.Role.PRIMARY
-            else:
-                channel.role = channel_pb2.Channel.Role.SECONDARY
+def admin_key_writes(node, admin_keys: List[Any]) -> List[Tuple[str, Message]]:
+    security_config = node.localConfig.security
+
+    # Filter out empty keys
+    valid_keys = [key for key in admin_keys if key and key.strip() and key != b""]
+    if not valid_keys:
+        logging.warning("No valid admin keys provided. Skipping admin key update.")
+        return []
+    if list(security_config.admin_key) == valid_keys:
+        logging.info("Admin keys unchanged, nothing to write")
+        return []
+
+    writes = []
+    with collect_admin_messages(node) as messages:
+        # Clear existing keys first, the node confirms this before the new keys are sent
+        if security_config.admin_key:
+            logging.info("Clearing existing admin keys...")
+            del security_config.admin_key[:]
+            node.writeConfig("security")
+
+        for key in valid_keys:
+            logging.info(f"Adding admin key: {key}")
+            security_config.admin_key.append(key)
+        node.writeConfig("security")
+    writes.extend(("admin keys", message) for message in messages)
+    return writes
+
+
+def fixed_position_writes(interface, node, settings: Dict[str, Any]) -> List[Tuple[str, Message]]:
+    lat = float(settings.get("latitude", 0.0))
+    lon = float(settings.get("longitude", 0.0))
+    alt = int(settings.get("altitude", 0))
+
+    position = (interface.getMyNodeInfo() or {}).get("position", {})
+    current = (position.get("latitude", 0.0), position.get("longitude", 0.0), position.get("altitude", 0))
+    if node.localConfig.position.fixed_position and (lat, lon, alt) == current:
+        logging.info("Fixed position unchanged, nothing to write")
+        return []
+
+    with collect_admin_messages(node) as messages:
+        node.setFixedPosition(lat, lon, alt)
+    logging.info(f"Updating position with Latitude: {lat} and Longitude {lon} and Altitude {alt}")
+    return [("fixed position", message) for message in messages]
+
 
-            node.writeChannel(channel_num)
+def owner_writes(interface, node, modified_settings: Dict[str, Any]) -> List[Tuple[str, Message]]:
+    long_name = modified_settings.get("longName")
+    short_name = modified_settings.get("shortName")
+    is_licensed = modified_settings.get("isLicensed")
+    is_licensed = is_licensed == "True" or is_licensed is True  # Normalize boolean
 
-            logging.info(f"Updated Channel {channel_num} in {config_category}")
-            logging.info(node.channels)
-            return
+    user = (interface.getMyNodeInfo() or {}).get("user", {})
+    if (long_name, short_name, is_licensed) == (
+        user.get("longName"),
+        user.get("shortName"),
+        bool(user.get("isLicensed", False)),
+    ):
+        logging.info("User settings unchanged, nothing to write")
+        return []
 
+    with collect_admin_messages(node) as messages:
+        node.setOwner(long_name, short_name, is_licensed)
+    logging.info(
+        f"Updated User Settings with Long Name: {long_name}, Short Name: {short_name}, Licensed Mode: {is_licensed}"
+    )
+    return [("user settings", message) for message in messages]
+
+
+def channel_writes(node, channel_num: int, modified_settings: Dict[str, Any]) -> List[Tuple[str, Message]]:
+    channel = node.channels[channel_num]
+    updated = channel_pb2.Channel()
+    updated.CopyFrom(channel)
+    for key, value in modified_settings.items():
+        if key == "psk":  # Special case: decode Base64 for psk
+            updated.settings.psk = base64.b64decode(value)
+        elif key == "position_precision":  # Special case: module_settings
+            updated.settings.module_settings.position_precision = value
         else:
-            config_category = None
-
-        for config_item, new_value in modified_settings.items():
-            # Check if the category exists in localConfig
-            if hasattr(node.localConfig, config_category):
-                config_subcategory = getattr(node.localConfig, config_category)
-            # Check if the category exists in moduleConfig
-            elif hasattr(node.moduleConfig, config_category):
-                config_subcategory = getattr(node.moduleConfig, config_category)
-            else:
-                logging.warning(f"Config category '{config_category}' not found in config.")
-                continue
-
-            # Check if the config_item exists in the subcategory
-            if hasattr(config_subcategory, config_item):
-                field = getattr(config_subcategory, config_item)
-
-                try:
-                    if isinstance(field, (int, float, str, bool)):  # Direct field types
-                        setattr(config_subcategory, config_item, new_value)
-                        logging.info(f"Updated {config_category}.{config_item} to {new_value}")
-                    elif isinstance(field, Message):  # Handle protobuf sub-messages
-                        if isinstance(new_value, dict):  # If new_value is a dictionary
-                            for sub_field, sub_value in new_value.items():
-                                if hasattr(field, sub_field):
-                                    setattr(field, sub_field, sub_value)
-                                    logging.info(f"Updated {config_category}.{config_item}.{sub_field} to {sub_value}")
-                                else:
-                                    logging.warning(
-                                        f"Sub-field '{sub_field}' not found in {config_category}.{config_item}"
-                                    )
-                        else:
-                            logging.warning(f"Invalid value for {config_category}.{config_item}. Expected dict.")
-                    else:
-                        logging.warning(f"Unsupported field type for {config_category}.{config_item}.")
-                except AttributeError as e:
-                    logging.error(f"Failed to update {config_category}.{config_item}: {e}")
-            else:
-                logging.warning(f"Config item '{config_item}' not found in config category '{config_category}'.")
+            setattr(updated.settings, key, value)  # Use setattr for other fields
+
+    if channel_num == 0:
+        updated.role = channel_pb2.Channel.Role.PRIMARY
+    else:
+        updated.role = channel_pb2.Channel.Role.SECONDARY
+
+    if updated == channel:
+        logging.info(f"Channel {channel_num} unchanged, nothing to write")
+        return []
+
+    channel.CopyFrom(updated)
+    with collect_admin_messages(node) as messages:
+        node.writeChannel(channel_num)
+    logging.info(f"Updated Channel {channel_num} in Channels")
+    return [(f"channel {channel_num}", message) for message in messages]
 
-        # Write the configuration changes to the node
+
+# Edits not yet written, by the menu they were made in: ("Radio Settings", "lora"), ("User Settings",)
+# or ("Channels", "Channel 1")
+PendingChanges = Dict[Tuple[str, ...], Dict[str, Any]]
+
+# Cached section changed by writes whose label is not the section's own
+WRITE_SECTIONS = {"admin keys": "security"}
+
+
+def pending_key(menu_path: List[str]) -> Optional[Tuple[str, ...]]:
+    if len(menu_path) > 2 and menu_path[1] in ("Radio Settings", "Module Settings", "Channels"):
+        return tuple(menu_path[1:3])
+    if len(menu_path) > 1 and menu_path[1] == "User Settings":
+        return ("User Settings",)
+    return None
+
+
+def merge_settings(target: Dict[str, Any], settings: Dict[str, Any]) -> None:
+    for name, value in settings.items():
+        if isinstance(value, dict) and isinstance(target.get(name), dict):
+            merge_settings(target[name], value)
+        else:
+            target[name] = value
+
+
+def add_pending(pending: PendingChanges, menu_path: List[str], modified_settings: Dict[str, Any]) -> None:
+    """Keep the edits made in the menu at `menu_path` until save_changes."""
+    key = pending_key(menu_path)
+    if key is not None and modified_settings:
+        merge_settings(pending.setdefault(key, {}), modified_settings)
+
+
+def cached_sections(node) -> Dict[str, Message]:
+    """The node's cached config, module config and channel sections, by the label of their writes."""
+    sections = {}
+    for container in (node.localConfig, node.moduleConfig):
+        for name, field in container.DESCRIPTOR.fields_by_name.items():
+            if field.message_type:  # Not e.g. LocalConfig.version
+                sections[name] = getattr(container, name)
+    for channel_num, channel in enumerate(node.channels or []):
+        sections[f"channel {channel_num}"] = channel
+    return sections
+
+
+def pending_writes(
+    interface, node, key: Tuple[str, ...], settings: Dict[str, Any]
+) -> Tuple[List[Tuple[str, Message]], bool]:
+    """The admin writes for one menu's edits, and whether they must go one at a time."""
+    settings = dict(settings)
+    writes = []
+    in_order = False
+
+    if "admin_key" in settings:
+        key_writes = admin_key_writes(node, settings.pop("admin_key"))
+        in_order = len(key_writes) > 1  # Keep the clear and the new keys strictly in order
+        writes.extend(key_writes)
+
+    if key[0] in ("Radio Settings", "Module Settings"):
+        config_category = key[1].lower()  # for radio and module configs
+        fixed_position = {}
+        for name in POSITION_FIELDS:
+            if name in settings:
+                fixed_position[name] = settings.pop(name)
+        if settings:
+            writes.extend(config_writes(node, {config_category: settings}))
+        if fixed_position:
+            # After the position section, as setting a fixed position also turns fixed_position on
+            writes.extend(fixed_position_writes(interface, node, fixed_position))
+
+    elif key[0] == "User Settings":  # for user configs
+        writes.extend(owner_writes(interface, node, settings))
+
+    elif key[0] == "Channels":  # for channel configs
         try:
-            node.writeConfig(config_category)
-            logging.info(f"Changes written to config category: {config_category}")
+            channel_num = int(key[1].split()[-1]) - 1
+        except (IndexError, ValueError) as e:
+            logging.error(f"Unknown channel {key[1]}: {e}")
+            return [], False
+        writes.extend(channel_writes(node, channel_num, settings))
+
+    return writes, in_order
+
+
+def save_changes(interface, pending: PendingChanges) -> List[str]:
+    """
+    Save the edits made in any number of menus to the device.
+    :param interface: Meshtastic interface instance
+    :param pending: Edits by menu, see add_pending
+
+    Only settings that differ from the node's cached config are written, all in one settings
+    transaction, each confirmed by ACK. The cache only takes the new values of the sections the
+    node confirmed. Returns the labels of writes that failed.
+    """
+    try:
+        if not pending:
+            logging.info("No changes to save. modified_settings is empty.")
+            return []
+
+        node = interface.getNode("^local")
+        sections = cached_sections(node)
+        before = {label: type(section)() for label, section in sections.items()}
+        for label, section in sections.items():
+            before[label].CopyFrom(section)
+
+        writes = []
+        window = ADMIN_WINDOW
+        try:
+            # Building each write updates the cached section it is made from, so later writes see earlier edits
+            for key, settings in pending.items():
+                key_writes, in_order = pending_writes(interface, node, key, settings)
+                if in_order:
+                    window = 1
+                writes.extend(key_writes)
+        finally:
+            edited = {}
+            for label, section in sections.items():
+                if section != before[label]:
+                    edited[label] = type(section)()
+                    edited[label].CopyFrom(section)
+                    section.CopyFrom(before[label])  # Until the node confirms it
+
+        if not writes:
+            logging.info("Settings match the node's config, nothing written")
+            return []
+
+        failed = run_admin_transaction(node, writes, window=window)
+        if failed:
+            logging.error(f"Failed to write: {', '.join(failed)}")
+        else:
+            logging.info(f"Changes written: {', '.join(label for label, _ in writes)}")
 
-            if admin_key_backup is not None:
-                modified_settings["admin_key"] = admin_key_backup
-        except Exception as e:
-            logging.error(f"Failed to write configuration for category '{config_category}': {e}")
+        if "begin transaction" not in failed and "commit transaction" not in failed:
+            failed_sections = {WRITE_SECTIONS.get(label, label) for label in failed}
+            for label, section in edited.items():
+                if label not in failed_sections:
+                    sections[label].CopyFrom(section)
+        return failed
 
     except Exception as e:
         logging.error(f"Error saving changes: {e}")
+        return ["settings"]
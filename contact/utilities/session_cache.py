@@ -0,0 +1,85 @@
+"""
+The last session's my info, channels, config and node db, kept in client.db as the FromRadio frames
+a radio sends in reply to want_config. On the next start the UI draws from these at once while the
+radio connects in the background.
+"""
+
+import logging
+from typing import Any, List, Optional
+
+from google.protobuf.message import DecodeError
+from meshtastic.mesh_interface import MeshInterface
+from meshtastic.protobuf import mesh_pb2
+
+import contact.ui.default_config as config
+from contact.utilities.daemon import snapshot_frames
+from contact.utilities.daemon_interface import daemon_available
+from contact.utilities.db_handler import load_session_frames, save_session_frames
+
+
+def connection_key(args: Any) -> Optional[str]:
+    """The radio `args` connect to, or None for connections that are ready at once anyway (sim, replay, daemon)."""
+    if getattr(args, "replay", None) or getattr(args, "sim", False) or getattr(args, "settings", False):
+        return None
+    if args.attach is not None:
+        return None
+    if args.ble:
+        return f"ble:{args.ble}"
+    if args.host:
+        return f"tcp:{args.host}"
+    if args.port:
+        return f"serial:{args.port}"
+    if daemon_available(config.daemon_socket_path):
+        return None
+    return "auto"
+
+
+class CachedInterface(MeshInterface):
+    """
+    Stands in for the radio until it has connected. The cached frames go through the usual FromRadio
+    handling, so nodes, channels and config look just as they did at the end of the last session.
+    Nothing is sent.
+    """
+
+    def __init__(self, frames: List[bytes]) -> None:
+        super().__init__()
+        self.nodes = {}
+        self.nodesByNum = {}
+        self._localChannels = []
+        for frame in frames:
+            self._handleFromRadio(frame)
+        self.localNode.setChannels(self._localChannels)
+
+    def _waitConnected(self, timeout: float = 30.0) -> None:
+        # Packets would otherwise wait for a connection that never comes before failing
+        raise MeshInterface.MeshInterfaceError("Not connected to the radio yet")
+
+    def _sendToRadio(self, toRadio: mesh_pb2.ToRadio) -> None:
+        logging.warning("Not connected to the radio yet, nothing sent")
+
+    def close(self) -> None:
+        pass
+
+
+def load_session(connection: Optional[str]) -> Optional[CachedInterface]:
+    if not connection:
+        return None
+    frames = load_session_frames(connection)
+    if not frames:
+        return None
+    try:
+        interface = CachedInterface(frames)
+    except (DecodeError, KeyError, ValueError) as e:
+        logging.error(f"Ignoring unreadable session cache for {connection}: {e}")
+        return None
+    if interface.myInfo is None:
+        return None
+    logging.info(f"Loaded cached session for {connection} with {len(interface.nodesByNum)} nodes")
+    return interface
+
+
+def save_session(interface: Any, connection: Optional[str]) -> None:
+    if not connection or interface is None or isinstance(interface, CachedInterface) or interface.myInfo is None:
+        return
+    # The trailing config_complete is left out, CachedInterface finishes the config itself
+    save_session_frames(connection, snapshot_frames(interface, 0)[:-1])
@@ -0,0 +1,176 @@
+"""
+Several radios in one client. The UI and the handlers work on the ui_state, interface_state and
+app_state singletons; each radio's share of that state lives in a RadioSession and is swapped into
+the singletons while the radio is shown, or briefly while a packet from it is handled.
+Callers hold app_state.lock around anything that swaps; the UI thread holds it while it handles keys
+and draws (ui_turn), and lets go only while it waits for a key or the radio (waiting).
+"""
+
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional
+
+from meshtastic import publishingThread
+
+from contact.ui.ui_state import RadioSession
+from contact.utilities.singleton import app_state, interface_state, ui_state
+
+# Where each RadioSession field lives while its radio is shown
+SHOWN_FIELDS = (
+    (interface_state, ("interface", "myNodeNum")),
+    (app_state, ("daemon_attached", "link_status")),
+    (
+        ui_state,
+        (
+            "channel_list",
+            "all_messages",
+            "notifications",
+            "packet_buffer",
+            "node_list",
+            "selected_channel",
+            "selected_message",
+            "selected_node",
+            "start_index",
+        ),
+    ),
+)
+
+
+class SessionManager:
+    def __init__(self) -> None:
+        self.sessions: List[RadioSession] = []
+        self.active: Optional[RadioSession] = None
+        self.swapped_in: Optional[RadioSession] = None  # a radio not shown, while shown() handles it
+        self._ui = threading.local()
+
+    def add(self, label: str) -> RadioSession:
+        """Add a radio. The first one added is the one shown, its state is whatever the singletons hold."""
+        session = RadioSession(label=label)
+        self.sessions.append(session)
+        if self.active is None:
+            self.active = session
+        return session
+
+    def store(self, session: RadioSession) -> None:
+        for holder, names in SHOWN_FIELDS:
+            for name in names:
+                setattr(session, name, getattr(holder, name))
+
+    def load(self, session: RadioSession) -> None:
+        for holder, names in SHOWN_FIELDS:
+            for name in names:
+                setattr(holder, name, getattr(session, name))
+
+    def interface_of(self, session: RadioSession) -> Any:
+        return interface_state.interface if session is self.active else session.interface
+
+    def session_for(self, interface: Any) -> Optional[RadioSession]:
+        if len(self.sessions) < 2:
+            return self.active
+        for session in self.sessions:
+            if self.interface_of(session) is interface:
+                return session
+        return None
+
+    def is_active(self, session: Optional[RadioSession]) -> bool:
+        # Packets from an interface no session knows (e.g. one just replaced) go to the radio shown
+        return session is None or session is self.active
+
+    def on_screen(self) -> bool:
+        """False while the state of a radio that isn't shown is swapped in, so nothing should be drawn."""
+        return self.swapped_in is None
+
+    def is_primary(self, session: Optional[RadioSession]) -> bool:
+        return session is None or not self.sessions or session is self.sessions[0]
+
+    def activate(self, session: RadioSession) -> None:
+        """Show `session` in the UI."""
+        if session is self.active:
+            return
+        self.store(self.active)
+        self.load(session)
+        self.active = session
+        session.unread = 0
+
+    @contextmanager
+    def shown(self, session: RadioSession) -> Iterator[None]:
+        """Swap `session` into the singletons for the duration, e.g. to handle a packet from a radio not shown."""
+        if session is self.active:
+            yield
+            return
+        self.store(self.active)
+        self.load(session)
+        self.swapped_in = session
+        try:
+            yield
+        finally:
+            self.swapped_in = None
+            self.store(session)
+            self.load(self.active)
+
+    @contextmanager
+    def ui_turn(self) -> Iterator[None]:
+        """Held by the UI thread while it handles keys and draws, so no other radio is swapped in under it."""
+        with app_state.lock:
+            self._ui.holding = True
+            try:
+                yield
+            finally:
+                self._ui.holding = False
+
+    @contextmanager
+    def waiting(self) -> Iterator[None]:
+        """Around a blocking wait for a key or the radio, lets packet handlers take app_state.lock meanwhile."""
+        if not getattr(self._ui, "holding", False):
+            yield
+            return
+        self._ui.holding = False
+        app_state.lock.release()
+        try:
+            yield
+        finally:
+            app_state.lock.acquire()
+            self._ui.holding = True
+
+    def current(self) -> Optional[RadioSession]:
+        """The session whose state the singletons hold."""
+        return self.swapped_in or self.active
+
+    def bind(self, handler: Callable[[Any], None], session: Optional[RadioSession] = None) -> Callable[[Any], None]:
+        """
+        Wrap a response callback to run on `session` (the current one by default), whichever is shown by then.
+        It runs on meshtastic's publishing thread, as received packets do: the reader thread that calls it
+        mustn't wait for app_state.lock, which a send waiting on that thread for the radio's queue may hold.
+        """
+        session = session or self.current()
+
+        def handle(packet: Any) -> None:
+            with app_state.lock, self.shown(session):
+                handler(packet)
+
+        @functools.wraps(handler)  # meshtastic only passes ACKs to callbacks named onAckNak
+        def run(packet: Any) -> None:
+            publishingThread.queueWork(lambda: handle(packet))
+
+        return run
+
+    def unread_elsewhere(self) -> int:
+        return sum(session.unread for session in self.sessions if session is not self.active)
+
+    def describe(self, session: RadioSession) -> str:
+        """One line for the radio picker."""
+        interface = self.interface_of(session)
+        name = ""
+        if interface is not None and getattr(interface, "myInfo", None) is not None:
+            name = ((interface.getMyNodeInfo() or {}).get("user") or {}).get("longName", "")
+        status = session.link_status if session is not self.active else app_state.link_status
+        text = f"{session.label} {name}".strip()
+        if status:
+            text += " (offline)"
+        if session.unread:
+            text += f" [{session.unread} new]"
+        return text
+
+
+radio_sessions = SessionManager()
@@ -9,6 +9,7 @@ import libsixel
 from io import BytesIO
 import os
 import sys
+from contact.utilities.sessions import radio_sessions
 from contact.utilities.singleton import ui_state
 import contact.utilities.db_handler as db_handler
 import array
@@ -172,4 +173,5 @@ def print_map(stdscr: curses.window) -> None:
         libsixel.sixel_output_unref(output)
 
     # Wait for keypress before we exit map mode
-    stdscr.getch()
+    with radio_sessions.waiting():
+        stdscr.getch()
@@ -0,0 +1,300 @@
+import json
+import logging
+import random
+import threading
+import time
+from typing import Any, Iterator, List, Optional, Tuple
+
+from google.protobuf.json_format import ParseDict
+from meshtastic import BROADCAST_NUM
+from meshtastic.mesh_interface import MeshInterface
+from meshtastic.protobuf import channel_pb2, config_pb2, mesh_pb2, portnums_pb2, telemetry_pb2
+
+SIM_NODE_BASE = 0x53000000  # Node numbers of the simulated mesh, the local node is the first
+DEFAULT_PORT_MIX = "text=4,position=3,telemetry=3,nodeinfo=1"
+
+PORTS = {
+    "text": portnums_pb2.PortNum.TEXT_MESSAGE_APP,
+    "position": portnums_pb2.PortNum.POSITION_APP,
+    "telemetry": portnums_pb2.PortNum.TELEMETRY_APP,
+    "nodeinfo": portnums_pb2.PortNum.NODEINFO_APP,
+}
+
+NAME_WORDS = "Ridge Harbor Summit Valley Beacon Cedar Falcon Granite Meadow Otter Pine Quartz River Tundra".split()
+CHAT_WORDS = (
+    "the mesh is up node relay check in copy that heading to ridge battery low signal good anyone on "
+    "net tonight weather clear packet heard loud and clear 73 roger thanks"
+).split()
+HW_MODELS = ["HELTEC_V3", "TBEAM", "RAK4631", "T_ECHO", "STATION_G2", "HELTEC_WSL_V3"]
+ROLES = ["CLIENT"] * 6 + ["CLIENT_MUTE", "ROUTER", "REPEATER", "TRACKER"]
+
+
+def parse_port_mix(spec: str) -> List[Tuple[str, int]]:
+    """Parse "text=4,position=3" into [(port, weight), ...]."""
+    mix = []
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip().lower()
+        if name not in PORTS:
+            raise ValueError(f"Unknown port '{name}' in --sim-mix, expected one of {', '.join(PORTS)}")
+        mix.append((name, int(weight or 1)))
+    return mix
+
+
+class SimInterface(MeshInterface):
+    """
+    A MeshInterface that simulates a mesh instead of talking to a radio.
+
+    The simulated local node is configured through the same FromRadio messages a radio sends,
+    so nodes, nodesByNum, getNode("^local"), sendText and sendData behave as on real hardware.
+    Traffic comes from a seeded generator (rate, node count and port mix) or a recorded trace
+    of JSON lines, one {"t": seconds, "packet": MeshPacket dict} per line. Outgoing packets that
+    want an ACK are acknowledged, and traceroutes get a route back.
+    """
+
+    def __init__(
+        self,
+        rate: float = 2.0,
+        node_count: int = 50,
+        port_mix: str = DEFAULT_PORT_MIX,
+        seed: int = 0,
+        trace_file: Optional[str] = None,
+        start_delay: float = 1.0,
+        my_node_num: int = SIM_NODE_BASE,
+    ) -> None:
+        self.rate = rate
+        self.node_count = max(0, node_count)
+        self.port_mix = parse_port_mix(port_mix)
+        self.trace_file = trace_file
+        self.start_delay = start_delay
+        self.rng = random.Random(seed)
+        self.reply_rng = random.Random(seed + 1)  # Replies come from other threads, keep them off the traffic stream
+        self.sent_packets: List[mesh_pb2.MeshPacket] = []
+        self.packets_generated = 0
+        self._stop = threading.Event()
+
+        super().__init__()
+
+        self.my_node_num = my_node_num
+        self.node_nums = [SIM_NODE_BASE + i for i in range(1, self.node_count + 1)]
+        self._startConfig()
+        self._traffic = threading.Thread(target=self._run_traffic, name="sim-traffic", daemon=True)
+        self._traffic.start()
+
+    # --- Radio side -------------------------------------------------------------------------
+
+    def _deliver(self, **fields: Any) -> None:
+        self._handleFromRadio(mesh_pb2.FromRadio(**fields).SerializeToString())
+
+    def _startConfig(self) -> None:
+        super()._startConfig()
+        self._send_config(self.configId)
+
+    def _send_config(self, config_id: int) -> None:
+        self._deliver(my_info=mesh_pb2.MyNodeInfo(my_node_num=self.my_node_num))
+        self._deliver(
+            metadata=mesh_pb2.DeviceMetadata(firmware_version="2.6.0.sim", hw_model=mesh_pb2.HardwareModel.PORTDUINO)
+        )
+
+        lora = mesh_pb2.FromRadio()
+        lora.config.lora.region = config_pb2.Config.LoRaConfig.RegionCode.US
+        lora.config.lora.modem_preset = config_pb2.Config.LoRaConfig.ModemPreset.LONG_FAST
+        lora.config.lora.use_preset = True
+        self._handleFromRadio(lora.SerializeToString())
+        device = mesh_pb2.FromRadio()
+        device.config.device.role = config_pb2.Config.DeviceConfig.Role.CLIENT
+        self._handleFromRadio(device.SerializeToString())
+
+        for index in range(8):
+            channel = channel_pb2.Channel(index=index, role=channel_pb2.Channel.Role.DISABLED)
+            if index == 0:
+                channel.role = channel_pb2.Channel.Role.PRIMARY
+            elif index == 1:
+                channel.role = channel_pb2.Channel.Role.SECONDARY
+                channel.settings.name = "Sim"
+            self._deliver(channel=channel)
+
+        self._deliver(node_info=self._node_info(self.my_node_num, hops=0))
+        for node_num in self.node_nums:
+            self._deliver(node_info=self._node_info(node_num, hops=self.rng.randint(0, 5)))
+
+        self._deliver(config_complete_id=config_id)
+
+    def _user(self, node_num: int) -> mesh_pb2.User:
+        index = node_num - SIM_NODE_BASE
+        word = NAME_WORDS[index % len(NAME_WORDS)]
+        return mesh_pb2.User(
+            id=f"!{node_num:08x}",
+            long_name=f"{word} {index:04d}" if index else "Sim Base",
+            short_name=f"{index % 10000:04d}" if index else "SIM",
+            hw_model=mesh_pb2.HardwareModel.Value(HW_MODELS[index % len(HW_MODELS)]),
+            role=config_pb2.Config.DeviceConfig.Role.Value(ROLES[index % len(ROLES)]),
+            public_key=bytes(32) if index % 3 else b"",
+        )
+
+    def _node_info(self, node_num: int, hops: int) -> mesh_pb2.NodeInfo:
+        node_info = mesh_pb2.NodeInfo(
+            num=node_num,
+            user=self._user(node_num),
+            last_heard=int(time.time()) - self.rng.randint(0, 7200),
+            snr=self.rng.uniform(-15, 10),
+            hops_away=hops,
+        )
+        node_info.position.CopyFrom(self._position())
+        return node_info
+
+    def _position(self) -> mesh_pb2.Position:
+        return mesh_pb2.Position(
+            latitude_i=int((45.5 + self.rng.uniform(-0.2, 0.2)) * 1e7),
+            longitude_i=int((-122.6 + self.rng.uniform(-0.2, 0.2)) * 1e7),
+            altitude=self.rng.randint(0, 1200),
+            time=int(time.time()),
+        )
+
+    def _packet(
+        self,
+        sender: int,
+        portnum: int,
+        payload: bytes,
+        to: int = BROADCAST_NUM,
+        channel: int = 0,
+        rng: Optional[random.Random] = None,
+    ) -> mesh_pb2.MeshPacket:
+        rng = rng or self.rng
+        hop_start = 3
+        packet = mesh_pb2.MeshPacket(
+            id=rng.getrandbits(32),
+            to=to,
+            channel=channel,
+            rx_time=int(time.time()),
+            rx_snr=rng.uniform(-15, 10),
+            rx_rssi=rng.randint(-120, -40),
+            hop_start=hop_start,
+            hop_limit=hop_start - rng.randint(0, hop_start),
+        )
+        setattr(packet, "from", sender)
+        packet.decoded.portnum = portnum
+        packet.decoded.payload = payload
+        return packet
+
+    def generate_packet(self) -> mesh_pb2.MeshPacket:
+        """Next packet from the seeded generator."""
+        names, weights = zip(*self.port_mix)
+        port = self.rng.choices(names, weights)[0]
+        sender = self.rng.choice(self.node_nums)
+
+        if port == "text":
+            text = " ".join(self.rng.choice(CHAT_WORDS) for _ in range(self.rng.randint(2, 30)))
+            if self.rng.random() < 0.1:
+                return self._packet(sender, PORTS[port], text.encode("utf-8"), to=self.my_node_num)
+            return self._packet(sender, PORTS[port], text.encode("utf-8"), channel=self.rng.randint(0, 1))
+        if port == "position":
+            return self._packet(sender, PORTS[port], self._position().SerializeToString())
+        if port == "telemetry":
+            telemetry = telemetry_pb2.Telemetry(time=int(time.time()))
+            telemetry.device_metrics.battery_level = self.rng.randint(5, 101)
+            telemetry.device_metrics.voltage = self.rng.uniform(3.3, 4.2)
+            telemetry.device_metrics.channel_utilization = self.rng.uniform(0, 40)
+            telemetry.device_metrics.air_util_tx = self.rng.uniform(0, 10)
+            telemetry.device_metrics.uptime_seconds = self.rng.randint(0, 10**6)
+            return self._packet(sender, PORTS[port], telemetry.SerializeToString())
+        return self._packet(sender, PORTS[port], self._user(sender).SerializeToString())
+
+    def iter_trace(self) -> Iterator[Tuple[float, mesh_pb2.MeshPacket]]:
+        with open(self.trace_file, "r", encoding="utf-8") as trace:
+            for line_number, line in enumerate(trace, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    packet = ParseDict(record["packet"], mesh_pb2.MeshPacket(), ignore_unknown_fields=True)
+                except (ValueError, KeyError) as e:
+                    logging.error(f"Skipping line {line_number} of trace {self.trace_file}: {e}")
+                    continue
+                yield float(record.get("t", 0)), packet
+
+    def _run_traffic(self) -> None:
+        # Give the app a moment to subscribe to meshtastic.receive before traffic starts
+        if self._stop.wait(self.start_delay):
+            return
+
+        try:
+            if self.trace_file:
+                started = time.monotonic()
+                for offset, packet in self.iter_trace():
+                    if self._stop.wait(max(0.0, started + offset - time.monotonic())):
+                        return
+                    self.inject(packet)
+                logging.info(f"Simulator finished trace {self.trace_file}")
+                return
+
+            while self.rate > 0 and self.node_nums and not self._stop.wait(self.rng.expovariate(self.rate)):
+                self.inject(self.generate_packet())
+        except Exception as e:
+            logging.error(f"Simulator traffic stopped: {e}")
+
+    def inject(self, packet: mesh_pb2.MeshPacket) -> None:
+        """Deliver a packet as if the radio had just received it."""
+        self.packets_generated += 1
+        self._deliver(packet=packet)
+
+    # --- App side ---------------------------------------------------------------------------
+
+    def _sendToRadioImpl(self, toRadio: mesh_pb2.ToRadio) -> None:
+        if not toRadio.HasField("packet"):
+            return
+        packet = toRadio.packet
+        self.sent_packets.append(packet)
+
+        if packet.to == self.my_node_num or packet.to == 0:
+            if packet.want_ack:
+                # The radio acknowledges admin messages to itself almost immediately
+                self._reply_later(self._ack(packet, local=True), self.reply_rng.uniform(0.01, 0.05))
+            return
+
+        if packet.decoded.portnum == portnums_pb2.PortNum.TRACEROUTE_APP and packet.decoded.want_response:
+            self._reply_later(self._traceroute_reply(packet))
+        elif packet.want_ack:
+            self._reply_later(self._ack(packet))
+
+    def _reply_later(self, reply: mesh_pb2.MeshPacket, delay: Optional[float] = None) -> None:
+        if delay is None:
+            delay = self.reply_rng.uniform(0.3, 2.0)
+        timer = threading.Timer(delay, self.inject, args=(reply,))
+        timer.daemon = True
+        timer.start()
+
+    def _ack(self, packet: mesh_pb2.MeshPacket, local: bool = False) -> mesh_pb2.MeshPacket:
+        # Broadcasts are acknowledged implicitly by hearing a rebroadcast, which the radio reports as coming from us
+        sender = self.my_node_num if local or packet.to == BROADCAST_NUM else packet.to
+        delivered = local or self.reply_rng.random() < 0.9
+        error = mesh_pb2.Routing.Error.NONE if delivered else mesh_pb2.Routing.Error.MAX_RETRANSMIT
+        routing = mesh_pb2.Routing(error_reason=error).SerializeToString()
+        reply = self._packet(sender, portnums_pb2.PortNum.ROUTING_APP, routing, to=self.my_node_num, rng=self.reply_rng)
+        reply.decoded.request_id = packet.id
+        return reply
+
+    def _traceroute_reply(self, packet: mesh_pb2.MeshPacket) -> mesh_pb2.MeshPacket:
+        rng = self.reply_rng
+        hops = rng.sample(self.node_nums, min(len(self.node_nums), rng.randint(0, 3)))
+        route = mesh_pb2.RouteDiscovery(
+            route=hops,
+            snr_towards=[rng.randint(-60, 40) for _ in range(len(hops) + 1)],
+            route_back=list(reversed(hops)),
+            snr_back=[rng.randint(-60, 40) for _ in range(len(hops) + 1)],
+        )
+        reply = self._packet(
+            packet.to, portnums_pb2.PortNum.TRACEROUTE_APP, route.SerializeToString(), to=self.my_node_num, rng=rng
+        )
+        reply.decoded.request_id = packet.id
+        return reply
+
+    def drop_connection(self) -> None:
+        """Simulate the link to the radio going down: traffic stops and meshtastic.connection.lost is published."""
+        self._stop.set()
+        self._disconnected()
+
+    def close(self) -> None:
+        self._stop.set()
+        super().close()
+
@@ -0,0 +1,108 @@
+import logging
+import random
+import threading
+from typing import Any, Callable, Iterator, Optional
+
+from pubsub import pub
+
+BACKOFF_INITIAL = 1.0  # seconds before the second attempt, doubling after each failure
+BACKOFF_MAX = 60.0
+BACKOFF_JITTER = 0.2  # +/- share of each delay, so several clients don't retry in lockstep
+
+
+def backoff_delays(
+    initial: float = BACKOFF_INITIAL, maximum: float = BACKOFF_MAX, jitter: float = BACKOFF_JITTER
+) -> Iterator[float]:
+    delay = initial
+    while True:
+        yield delay * (1 + random.uniform(-jitter, jitter))
+        delay = min(delay * 2, maximum)
+
+
+class ConnectionSupervisor:
+    """
+    Keeps the app connected to its radio. When meshtastic.connection.lost is published for the
+    interface in use, that interface is closed and `connect` is retried with exponential backoff
+    until it returns a new one, which is handed to `on_connected`. Only the interface is replaced,
+    so the UI state, caches and database carry on as they were. `on_status` receives a line
+    describing the link while it is down.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        on_connected: Callable[[Any], None],
+        on_status: Callable[[str], None],
+        initial: float = BACKOFF_INITIAL,
+        maximum: float = BACKOFF_MAX,
+    ) -> None:
+        self.connect = connect
+        self.on_connected = on_connected
+        self.on_status = on_status
+        self.initial = initial
+        self.maximum = maximum
+        self.interface: Any = None
+        self.attempts = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        pub.subscribe(self.on_connection_lost, "meshtastic.connection.lost")
+
+    def watch(self, interface: Any) -> None:
+        """Supervise `interface`, the connection now in use."""
+        with self._lock:
+            self.interface = interface
+
+    def on_connection_lost(self, interface: Any) -> None:
+        if interface is not self.interface:
+            return  # e.g. the interface a reconnect just replaced
+        logging.warning("Connection to the radio lost")
+        self.on_status("Link to the radio lost, reconnecting...")
+        self.reconnect(interface)
+
+    def reconnect(self, lost: Any = None) -> None:
+        """Connect in the background, closing `lost` first. Does nothing if a reconnect is already running."""
+        with self._lock:
+            if self._stop.is_set() or (self._thread and self._thread.is_alive()):
+                return
+            self.interface = None
+            self._thread = threading.Thread(target=self._run, args=(lost,), name="reconnect", daemon=True)
+            self._thread.start()
+
+    def _run(self, lost: Any) -> None:
+        if lost is not None:
+            try:
+                lost.close()
+            except Exception as e:
+                logging.error(f"Error closing the lost connection: {e}")
+
+        delays = backoff_delays(self.initial, self.maximum)
+        self.attempts = 0
+        while not self._stop.is_set():
+            self.attempts += 1
+            try:
+                interface = self.connect()
+            except SystemExit:  # meshtastic exits when no serial device is found
+                interface = None
+            except Exception as e:
+                logging.error(f"Reconnect attempt {self.attempts} failed: {e}")
+                interface = None
+
+            if interface is not None:
+                if self._stop.is_set():
+                    interface.close()
+                    return
+                self.watch(interface)
+                logging.info(f"Connected to the radio after {self.attempts} attempts")
+                self.on_connected(interface)
+                return
+
+            delay = next(delays)
+            self.on_status(f"No link to the radio, retrying in {delay:.0f}s (attempt {self.attempts})")
+            if self._stop.wait(delay):
+                return
+            self.on_status(f"No link to the radio, reconnecting (attempt {self.attempts + 1})...")
+
+    def stop(self) -> None:
+        self._stop.set()
+        pub.unsubscribe(self.on_connection_lost, "meshtastic.connection.lost")
@@ -0,0 +1,260 @@
+"""
+Traceroute sweeps: one traceroute to each of a set of nodes (all within N hops, or the favorites),
+spaced by SWEEP_INTERVAL since the firmware drops traceroutes sent more often. Each reply is matched
+to its request by id, and the links along its route, with the SNR heard over each, go to the
+`<myNodeNum>_topology` table. Nothing is added to the messages, so a sweep of the whole mesh doesn't
+bury the chats.
+
+    contact topology sweep TARGET [--hops N | --favorites]
+    contact topology show [--dot]
+"""
+
+import argparse
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from meshtastic import BROADCAST_NUM
+from meshtastic.protobuf import mesh_pb2, portnums_pb2
+
+from contact.message_handlers.tx_queue import RETRY_DELAY, radio_has_room
+from contact.utilities.db_handler import (
+    get_name_from_database,
+    load_topology_edges,
+    save_topology_edges,
+    topology_radios,
+)
+from contact.utilities.sessions import radio_sessions
+from contact.utilities.singleton import app_state, interface_state
+from contact.utilities.utils import decimal_to_hex
+
+SWEEP_INTERVAL = 30.0  # seconds between traceroutes, the firmware's limit
+UNKNOWN_SNR = -128  # as sent for a hop that didn't measure it
+MAX_HOP_LIMIT = 7
+
+
+def hop_edges(path: List[int], snrs: List[int]) -> List[Tuple[int, int, Optional[float]]]:
+    """(from, to, snr) for each hop of `path`. snrs[i] is in quarter dB, as heard by path[i + 1]."""
+    valid = len(snrs) == len(path) - 1
+    edges = []
+    for index, (from_node, to_node) in enumerate(zip(path, path[1:])):
+        if BROADCAST_NUM in (from_node, to_node):
+            continue  # A relay that didn't add itself to the route
+        snr = snrs[index] / 4 if valid and snrs[index] != UNKNOWN_SNR else None
+        edges.append((from_node, to_node, snr))
+    return edges
+
+
+def route_edges(packet: Dict[str, Any]) -> List[Tuple[int, int, Optional[float]]]:
+    """The links in a traceroute reply: out from us to the node replying, and back if the reply carries it."""
+    route = mesh_pb2.RouteDiscovery()
+    route.ParseFromString(packet["decoded"]["payload"])
+    edges = hop_edges([packet["to"], *route.route, packet["from"]], list(route.snr_towards))
+    # Older firmware sends no route back, newer firmware sets hopStart when it does
+    if "hopStart" in packet and len(route.snr_back) == len(route.route_back) + 1:
+        edges += hop_edges([packet["from"], *route.route_back, packet["to"]], list(route.snr_back))
+    return edges
+
+
+def sweep_targets(interface: Any, max_hops: Optional[int] = None, favorites: bool = False) -> List[int]:
+    """Nodes to trace, nearest first: the favorites, or those heard within `max_hops` hops."""
+    my_node_num = interface.myInfo.my_node_num
+    targets = []
+    for node_num, node in (interface.nodesByNum or {}).items():
+        if node_num == my_node_num or node.get("isIgnored"):
+            continue
+        if favorites and not node.get("isFavorite"):
+            continue
+        if max_hops is not None and node.get("hopsAway", max_hops + 1) > max_hops:
+            continue
+        targets.append(node_num)
+    return sorted(targets, key=lambda node_num: interface.nodesByNum[node_num].get("hopsAway", MAX_HOP_LIMIT))
+
+
+class TracerouteSweep:
+    """
+    Traces `targets` one at a time from one radio in a background thread. `on_result` gets each
+    node and what became of it: "ok", "no reply", or the routing error the mesh sent back.
+    """
+
+    def __init__(self, interval: float = SWEEP_INTERVAL) -> None:
+        self.interval = interval
+        self.on_result: Optional[Callable[[int, str], None]] = None
+        self.session: Any = None
+        self.targets: List[int] = []
+        self.results: Dict[int, str] = {}
+        self.sent = 0
+        self._requests: Dict[int, int] = {}  # packet id -> node traced
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, session: Any, targets: List[int]) -> None:
+        """Sweep `targets` from the radio of `session`, stopping any sweep still running."""
+        self.stop()
+        with self._lock:
+            self.session = session
+            self.targets = list(targets)
+            self.results = {}
+            self.sent = 0
+            self._requests = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self.run, args=(self._stop,), name="traceroute-sweep", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self, stop: threading.Event) -> None:
+        for node_num in self.targets:
+            while not self.send(node_num):
+                if stop.wait(RETRY_DELAY):
+                    return
+            # The wait for the next send is also the time this node has to reply
+            if stop.wait(self.interval):
+                return
+            with self._lock:
+                unanswered = node_num not in self.results
+                if unanswered:
+                    self.results[node_num] = "no reply"
+            if unanswered:
+                with app_state.lock:
+                    self.report(node_num, "no reply")
+        logging.info(f"Traceroute sweep done: {self.progress()}")
+
+    def send(self, node_num: int) -> bool:
+        """Send the traceroute to `node_num`, or False if the radio can't take it yet."""
+        with app_state.lock, radio_sessions.shown(self.session):
+            interface = interface_state.interface
+            if app_state.link_status or not interface.isConnected.is_set() or not radio_has_room(interface):
+                return False
+            hops_away = (interface.nodesByNum or {}).get(node_num, {}).get("hopsAway", 2)
+            packet = interface.sendData(
+                mesh_pb2.RouteDiscovery(),
+                destinationId=node_num,
+                portNum=portnums_pb2.PortNum.TRACEROUTE_APP,
+                wantResponse=True,
+                onResponse=radio_sessions.bind(self.on_response, self.session),
+                channelIndex=0,
+                hopLimit=min(MAX_HOP_LIMIT, max(3, hops_away + 1)),
+            )
+            # Still under app_state.lock, which the reply's handler waits for
+            with self._lock:
+                self._requests[packet.id] = node_num
+                self.sent += 1
+        return True
+
+    def on_response(self, packet: Dict[str, Any]) -> None:
+        decoded = packet["decoded"]
+        with self._lock:
+            node_num = self._requests.pop(decoded.get("requestId"), None)
+        if node_num is None:
+            return  # From an earlier sweep, or a reply repeated
+
+        if decoded.get("portnum") == "TRACEROUTE_APP":
+            save_topology_edges(route_edges(packet))
+            result = "ok"
+        else:
+            result = decoded.get("routing", {}).get("errorReason", "no reply")
+        with self._lock:
+            self.results[node_num] = result
+        self.report(node_num, result)
+
+    def report(self, node_num: int, result: str) -> None:
+        # Called with app_state.lock held, as replies are
+        if self.on_result is not None:
+            try:
+                self.on_result(node_num, result)
+            except Exception as e:
+                logging.error(f"Error reporting traceroute sweep progress: {e}")
+
+    def progress(self) -> str:
+        with self._lock:
+            traced = sum(1 for result in self.results.values() if result == "ok")
+            return f"Sweep {self.sent}/{len(self.targets)}, {traced} traced"
+
+
+topology_sweep = TracerouteSweep()
+
+
+def node_name(node_num: int) -> str:
+    name = get_name_from_database(node_num, "short")
+    return name if name and name != "Unknown" else decimal_to_hex(node_num)  # No node table for this radio yet
+
+
+def describe_edges(edges: List[Tuple[int, int, Optional[float], int]], dot: bool = False) -> List[str]:
+    """The stored links as text lines, or as a Graphviz digraph."""
+    if dot:
+        nodes = {node_num for edge in edges for node_num in edge[:2]}
+        lines = ["digraph mesh {"]
+        lines += [f'  "{decimal_to_hex(node_num)}" [label="{node_name(node_num)}"];' for node_num in sorted(nodes)]
+    else:
+        lines = []
+    for from_node, to_node, snr, last_heard in edges:
+        snr_text = "?" if snr is None else f"{snr:g}"
+        if dot:
+            lines.append(f'  "{decimal_to_hex(from_node)}" -> "{decimal_to_hex(to_node)}" [label="{snr_text} dB"];')
+        else:
+            heard = datetime.fromtimestamp(last_heard).strftime("%Y-%m-%d %H:%M")
+            lines.append(f"{node_name(from_node):>10} -> {node_name(to_node):<10} {snr_text:>6} dB  {heard}")
+    if dot:
+        lines.append("}")
+    return lines
+
+
+def setup_topology_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="contact topology", description="Traceroute sweeps and the mesh links found.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sweep = commands.add_parser("sweep", help="Trace a set of nodes and store the links along each route.")
+    sweep.add_argument("target", help="serial:PORT, tcp:HOST[:PORT], ble:ADDRESS, sim:SEED, or a bare port or host.")
+    chosen = sweep.add_mutually_exclusive_group()
+    chosen.add_argument("--hops", type=int, default=None, help="Only nodes heard within this many hops.")
+    chosen.add_argument("--favorites", action="store_true", help="Only favorite nodes.")
+    sweep.add_argument("--interval", type=float, default=SWEEP_INTERVAL, help="Seconds between traceroutes.")
+
+    show = commands.add_parser("show", help="List the stored links of every radio.")
+    show.add_argument("--dot", action="store_true", help="Print a Graphviz digraph instead.")
+    return parser
+
+
+def run_topology_command(argv: List[str]) -> int:
+    args = setup_topology_parser().parse_args(argv)
+
+    if args.command == "show":
+        for node_num in topology_radios():
+            interface_state.myNodeNum = node_num
+            edges = load_topology_edges()
+            if not args.dot:
+                print(f"[{node_name(node_num)}] {len(edges)} links")
+            for line in describe_edges(edges, args.dot):
+                print(line)
+        return 0
+
+    from contact.utilities.provision import open_target  # Slow to import, and the UI's sweeps don't need it
+
+    try:
+        interface = open_target(args.target)
+    except Exception as e:
+        print(f"[{args.target}] error: {e}")
+        return 1
+    try:
+        interface_state.interface = interface
+        interface_state.myNodeNum = interface.myInfo.my_node_num
+        targets = sweep_targets(interface, args.hops, args.favorites)
+        print(f"[{args.target}] tracing {len(targets)} nodes, one every {args.interval:g}s")
+
+        sweep = TracerouteSweep(args.interval)
+        sweep.on_result = lambda node_num, result: print(f"{node_name(node_num):>10}  {result}")
+        sweep.start(None, targets)
+        while sweep.running():
+            time.sleep(0.5)
+        print(sweep.progress())
+        return 0 if not targets or "ok" in sweep.results.values() else 1
+    finally:
+        interface.close()
@@ -7,6 +7,7 @@ from meshtastic import protocols
 from meshtastic.protobuf import config_pb2, mesh_pb2, portnums_pb2
 import contact.ui.default_config as config
 from contact.utilities.singleton import ui_state, interface_state
+from contact.utilities.perf import timed
 import contact.utilities.telemetry_beautifier as tb
 
 
@@ -72,6 +73,7 @@ def get_node_list():
     return []
 
 
+@timed
 def refresh_node_list():
     new_node_list = get_node_list()
     if new_node_list != ui_state.node_list:
@@ -170,6 +172,7 @@ def add_new_message(channel_id, prefix, message):
     ui_state.all_messages[channel_id].append((prefix, message))
 
 
+@timed
 def parse_protobuf(packet: dict) -> Union[str, dict]:
     """Attempt to parse a decoded payload using the registered protobuf handler."""
     try:
@@ -0,0 +1,94 @@
+import time
+
+from contact.message_handlers.ack_tracker import AckTracker, TimerWheel, TrackedMessage
+
+IDLE = 600  # seconds the wheel sat unused since it was made, e.g. at import
+
+
+def stale(wheel: TimerWheel) -> TimerWheel:
+    wheel._current -= int(IDLE / wheel.tick)
+    return wheel
+
+
+def message(packet_id: int) -> TrackedMessage:
+    return TrackedMessage(
+        packet_id=packet_id, session=None, channel_id="Primary", text="hi", timestamp=0, entry=("", "")
+    )
+
+
+def ticks(start: float, seconds: float) -> list:
+    """The times the expiry thread would wake at over `seconds` from `start`, one tick apart."""
+    return [start + offset for offset in range(1, int(seconds) + 1)]
+
+
+def expired_by(advance, start: float, seconds: float) -> list:
+    return [key for now in ticks(start, seconds) for key in advance(now)]
+
+
+def test_timer_added_after_idle_waits_its_full_delay():
+    wheel = stale(TimerWheel())
+    now = time.monotonic()
+    wheel.add(1, 90)
+
+    assert expired_by(wheel.advance, now, 88) == []
+    assert expired_by(wheel.advance, now + 88, 4) == [1]
+    assert len(wheel) == 0
+
+
+def test_timer_further_out_than_one_turn():
+    wheel = TimerWheel(tick=1.0, slots=8)
+    now = time.monotonic()
+    wheel.add(1, 20)
+
+    assert expired_by(wheel.advance, now, 18) == []
+    assert expired_by(wheel.advance, now + 18, 4) == [1]
+
+
+def test_cancelled_timer_does_not_expire():
+    wheel = TimerWheel()
+    now = time.monotonic()
+    wheel.add(1, 5)
+    wheel.cancel(1)
+
+    assert wheel.advance(now + 10) == []
+
+
+def test_resolve_returns_the_tracked_message_once():
+    tracker = AckTracker(lambda message: None)
+    sent = message(7)
+    tracker.track(sent)
+
+    assert tracker.resolve(7, "Ack") is sent
+    assert tracker.resolve(7, "Ack") is None
+    assert tracker.pending() == 0
+    assert tracker.counters["acked"] == 1
+
+
+def test_expires_after_the_timeout_even_after_idle():
+    tracker = AckTracker(lambda message: None)
+    stale(tracker._wheel)
+    now = time.monotonic()
+    sent = message(7)
+    tracker.track(sent)
+
+    assert expired_by(tracker.expire, now, tracker.timeout - 2) == []
+    assert expired_by(tracker.expire, now + tracker.timeout - 2, 4) == [sent]
+    assert tracker.resolve(7, "Ack") is None
+    assert tracker.counters["expired"] == 1
+
+
+def test_resend_keeps_the_message_id():
+    tracker = AckTracker(lambda message: None)
+    sent = message(7)
+    tracker.track(sent)
+    first_id = sent.message_id
+    assert expired_by(tracker.expire, time.monotonic(), tracker.timeout + 2) == [sent]
+
+    sent.packet_id = 8
+    tracker.track(sent)
+
+    assert sent.message_id == first_id
+    assert sent.resends == 1
+    assert tracker.counters["resent"] == 1
+    assert tracker.resolve(8, "Nak") is sent
+    assert tracker.counters["nakd"] == 1
@@ -0,0 +1,43 @@
+import time
+
+from contact.message_handlers.chunking import CHUNK_TIMEOUT, Reassembler, parse_chunk, split_message
+
+IDLE = 600  # seconds since the reassembler was made at import
+
+
+def text_packet(text: str) -> dict:
+    return {"from": 0x5678, "to": 0xFFFFFFFF, "channel": 0, "decoded": {"payload": text.encode("utf-8")}}
+
+
+def test_parts_after_idle_wait_the_full_timeout():
+    reassembler = Reassembler(lambda session, packet: None)
+    reassembler._wheel._current -= int(IDLE / reassembler._wheel.tick)
+    parts = split_message("word " * 100, "5f0a")
+    now = time.monotonic()
+    assert reassembler.add(None, 1, text_packet(parts[0]), parse_chunk(parts[0])) is None
+
+    expired = [partial for offset in range(1, int(CHUNK_TIMEOUT) - 1) for partial in reassembler.expire(now + offset)]
+    assert expired == []
+    assert reassembler.pending() == 1
+
+    # The rest still complete the message
+    text = None
+    for part in parts[1:]:
+        text = reassembler.add(None, 1, text_packet(part), parse_chunk(part))
+    assert text == "word " * 100
+    assert reassembler.pending() == 0
+
+
+def test_incomplete_message_expires_after_the_timeout():
+    reassembler = Reassembler(lambda session, packet: None)
+    reassembler._wheel._current -= int(IDLE / reassembler._wheel.tick)
+    parts = split_message("word " * 100, "5f0a")
+    now = time.monotonic()
+    reassembler.add(None, 1, text_packet(parts[0]), parse_chunk(parts[0]))
+
+    expired = [partial for offset in range(1, int(CHUNK_TIMEOUT) + 2) for partial in reassembler.expire(now + offset)]
+
+    assert len(expired) == 1
+    assert f"[part 2/{len(parts)} missing]" in expired[0].text()
+    # A part arriving late is dropped, the message was stored already
+    assert reassembler.add(None, 1, text_packet(parts[1]), parse_chunk(parts[1])) is None
@@ -0,0 +1,63 @@
+import threading
+import time
+
+import pytest
+
+import contact.ui.default_config  # noqa: F401  (sets up the config paths the utilities import)
+from contact.message_handlers.chunking import Reassembler, split_message
+from contact.utilities import daemon
+from contact.utilities.singleton import app_state, interface_state, ui_state
+
+MY_NODE = 0x1234
+SENDER = 0x5678
+
+
+@pytest.fixture
+def saved(monkeypatch):
+    """The (channel, from, text) rows the daemon stores, with a fresh reassembler."""
+    rows = []
+    monkeypatch.setattr(app_state, "lock", threading.Lock())
+    monkeypatch.setattr(interface_state, "myNodeNum", MY_NODE)
+    monkeypatch.setattr(ui_state, "channel_list", ["Primary"])
+    monkeypatch.setattr(daemon, "save_message_to_db", lambda *row: rows.append(row))
+    monkeypatch.setattr(daemon, "reassembler", Reassembler(daemon.on_chunks_timeout, timeout=0.5))
+    return rows
+
+
+def text_packet(text: str) -> dict:
+    return {
+        "from": SENDER,
+        "to": 0xFFFFFFFF,
+        "channel": 0,
+        "decoded": {"portnum": "TEXT_MESSAGE_APP", "payload": text.encode("utf-8")},
+    }
+
+
+def test_stores_a_long_message_once_every_part_is_in(saved):
+    text = "word " * 100
+    parts = split_message(text, "5f0a")
+    assert len(parts) > 1
+
+    for part in reversed(parts):
+        daemon.on_daemon_receive(text_packet(part), None)
+
+    assert saved == [("Primary", SENDER, text)]
+
+
+def test_stores_a_plain_message_straight_away(saved):
+    daemon.on_daemon_receive(text_packet("hello"), None)
+
+    assert saved == [("Primary", SENDER, "hello")]
+
+
+def test_stores_an_incomplete_message_after_the_timeout(saved):
+    parts = split_message("word " * 100, "5f0a")
+    daemon.on_daemon_receive(text_packet(parts[0]), None)
+    assert saved == []
+
+    deadline = time.monotonic() + 5
+    while not saved and time.monotonic() < deadline:
+        time.sleep(0.1)
+
+    assert len(saved) == 1
+    assert f"[part 2/{len(parts)} missing]" in saved[0][2]
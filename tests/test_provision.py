@@ -0,0 +1,64 @@
+import copy
+
+import yaml
+
+import contact.ui.default_config  # noqa: F401  (sets up the config paths the utilities import)
+from contact.utilities.config_io import config_snapshot
+from contact.utilities.provision import open_target, provision, run_provision, strip_identity
+
+
+def sim_profile() -> dict:
+    interface = open_target("sim:1")
+    try:
+        return strip_identity(config_snapshot(interface))
+    finally:
+        interface.close()
+
+
+def write_profile(tmp_path, profile: dict) -> str:
+    path = tmp_path / "profile.yaml"
+    path.write_text(yaml.dump(profile), encoding="utf8")
+    return str(path)
+
+
+def test_provision_updates_only_targets_that_differ():
+    current = sim_profile()
+    changed = copy.deepcopy(current)
+    changed["config"]["lora"]["hopLimit"] = 5
+
+    updated = provision(changed, ["sim:1", "sim:2"], workers=2)[0]
+    unchanged = provision(current, ["sim:3"], workers=1)[0]
+
+    assert updated.status == "updated"
+    assert updated.changes == ["config.lora.hopLimit: (unset) -> 5"]
+    assert not updated.failed
+    assert unchanged.status == "unchanged"
+    assert not unchanged.changes
+
+
+def test_run_provision_exit_status(tmp_path, capsys):
+    current = sim_profile()
+    assert run_provision([write_profile(tmp_path, current), "sim:1", "sim:2"]) == 0
+
+    changed = copy.deepcopy(current)
+    changed["config"]["lora"]["hopLimit"] = 5
+    assert run_provision([write_profile(tmp_path, changed), "sim:1", "sim:2"]) == 0
+    assert run_provision([write_profile(tmp_path, changed), "--dry-run", "sim:1"]) == 0
+
+    # sim:x can't be opened, so that target errors and the run fails while sim:1 is still updated
+    assert run_provision([write_profile(tmp_path, changed), "sim:1", "sim:x"]) == 1
+    summary = capsys.readouterr().out
+    assert "sim:1" in summary and "updated" in summary
+    assert "sim:x" in summary and "error" in summary
+
+
+def test_failing_connection_is_reported_per_target():
+    def connect(target):
+        if target == "sim:9":
+            raise ConnectionError("no route to host")
+        return open_target(target)
+
+    results = provision(sim_profile(), ["sim:1", "sim:9"], workers=2, connect=connect)
+
+    assert [result.status for result in results] == ["unchanged", "error"]
+    assert results[1].error == "no route to host"
@@ -0,0 +1,21 @@
+import threading
+
+import contact.ui.default_config  # noqa: F401  (sets up the config paths the utilities import)
+from contact.utilities.sessions import radio_sessions
+from contact.utilities.singleton import app_state
+
+
+def test_bound_response_does_not_hold_up_the_reader_thread(monkeypatch):
+    monkeypatch.setattr(app_state, "lock", threading.Lock())
+    handled = threading.Event()
+
+    def onAckNak(packet):
+        handled.set()
+
+    bound = radio_sessions.bind(onAckNak)
+    assert bound.__name__ == "onAckNak"
+
+    with app_state.lock:  # As the UI holds it while a send waits on the reader thread
+        bound({"decoded": {}})  # Returns at once rather than waiting for the lock
+        assert not handled.wait(0.2)
+    assert handled.wait(5)
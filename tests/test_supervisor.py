@@ -0,0 +1,93 @@
+import threading
+
+from pubsub import pub
+
+import contact.ui.default_config  # noqa: F401  (sets up the config paths the utilities import)
+from contact.utilities.sim_interface import SimInterface
+from contact.utilities.supervisor import ConnectionSupervisor
+
+
+def sim() -> SimInterface:
+    return SimInterface(rate=0, node_count=0)
+
+
+def drop(interface: SimInterface) -> None:
+    """Drop the link and wait until every listener heard, as meshtastic publishes it from a thread of its own."""
+    delivered = threading.Event()
+
+    def on_lost(interface: SimInterface) -> None:
+        if interface is lost:
+            delivered.set()
+
+    lost = interface
+    pub.subscribe(on_lost, "meshtastic.connection.lost")  # After the supervisor's, so called after it
+    try:
+        interface.drop_connection()
+        assert delivered.wait(5)
+    finally:
+        pub.unsubscribe(on_lost, "meshtastic.connection.lost")
+
+
+def test_reconnects_with_backoff_after_the_link_drops():
+    first = sim()
+    replacement = sim()
+    attempts = []
+    statuses = []
+    connected = []
+    reconnected = threading.Event()
+
+    def connect():
+        attempts.append(len(attempts) + 1)
+        if len(attempts) < 3:
+            raise ConnectionError("radio not back yet")
+        return replacement
+
+    def on_connected(interface):
+        connected.append(interface)
+        reconnected.set()
+
+    supervisor = ConnectionSupervisor(connect, on_connected, statuses.append, initial=0.01, maximum=0.04)
+    supervisor.watch(first)
+    try:
+        drop(first)
+        assert reconnected.wait(5)
+
+        assert connected == [replacement]
+        assert supervisor.interface is replacement
+        assert supervisor.attempts == 3
+        assert statuses[0] == "Link to the radio lost, reconnecting..."
+        assert sum("retrying in" in status for status in statuses) == 2
+    finally:
+        supervisor.stop()
+        replacement.close()
+
+
+def test_ignores_connections_it_does_not_watch():
+    watched = sim()
+    other = sim()
+    connected = []
+    supervisor = ConnectionSupervisor(sim, connected.append, lambda status: None, initial=0.01)
+    supervisor.watch(watched)
+    try:
+        drop(other)
+        assert supervisor.interface is watched
+        assert supervisor._thread is None
+        assert connected == []
+    finally:
+        supervisor.stop()
+        watched.close()
+        other.close()
+
+
+def test_stop_ends_the_retries():
+    first = sim()
+    statuses = []
+    supervisor = ConnectionSupervisor(lambda: None, lambda interface: None, statuses.append, initial=0.01)
+    supervisor.watch(first)
+    drop(first)
+    supervisor.stop()
+    supervisor._thread.join(5)
+
+    assert not supervisor._thread.is_alive()
+    assert supervisor.interface is None
+    assert statuses[0] == "Link to the radio lost, reconnecting..."